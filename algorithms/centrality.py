@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from collections import deque
+from heapq import heappop, heappush
+from math import ceil, floor, log, log2
+from multiprocessing import Pool
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.components import connected_components
+from algorithms.traversal import bfs_distances, bfs_path_counts, UNREACHED
+from compact_graph import CompactGraph
+
+DEFAULT_EPSILON = 0.01
+DEFAULT_DELTA = 0.1
+RK_CONSTANT = 0.5
+PARTS_PER_WORKER = 4
+
+
+def degree_centrality(graph: CompactGraph) -> np.ndarray:
+    if graph.node_count <= 1:
+        return np.ones(graph.node_count, dtype=np.float64)
+    return graph.degree() / (graph.node_count - 1)
+
+
+def betweenness_centrality(graph: CompactGraph, normalized=True, weighted=False,
+                           workers=1) -> np.ndarray:
+    # Brandes' dependency accumulation, over BFS shortest paths or, with
+    # 'weighted', over Dijkstra shortest paths. With more than one worker the
+    # sources are dealt out to a process pool that holds one read-only copy
+    # of the adjacency per worker, and the partial sums are added up.
+    node_count = graph.node_count
+    weights = graph.weights if weighted else None
+    if weighted and weights is None:
+        raise ValueError("Weighted betweenness needs a weighted graph.")
+
+    if workers > 1 and node_count > workers:
+        parts = [range(start, node_count, workers * PARTS_PER_WORKER)
+                 for start in range(workers * PARTS_PER_WORKER)]
+        with Pool(workers, initializer=share_adjacency,
+                  initargs=(graph.indptr, graph.indices, weights)) as pool:
+            result = np.sum(pool.map(shared_dependencies, parts), axis=0)
+    else:
+        result = dependencies(graph.indptr.tolist(), graph.indices.tolist(),
+                              None if weights is None else weights.tolist(),
+                              range(node_count))
+
+    if normalized:
+        if node_count > 2:
+            result *= 1 / ((node_count - 1) * (node_count - 2))
+    elif not graph.directed:
+        result *= 0.5
+    return result
+
+
+shared = {}
+
+
+def share_adjacency(indptr: np.ndarray, indices: np.ndarray, weights: Optional[np.ndarray]):
+    shared['indptr'] = indptr.tolist()
+    shared['indices'] = indices.tolist()
+    shared['weights'] = None if weights is None else weights.tolist()
+
+
+def shared_dependencies(sources: Iterable[int]) -> np.ndarray:
+    return dependencies(shared['indptr'], shared['indices'], shared['weights'], sources)
+
+
+def dependencies(indptr: List[int], indices: List[int], weights: Optional[List[float]],
+                 sources: Iterable[int]) -> np.ndarray:
+    node_count = len(indptr) - 1
+    betweenness = [0.0] * node_count
+    for source in sources:
+        if weights is None:
+            order, predecessors, paths = shortest_paths_bfs(indptr, indices, source)
+        else:
+            order, predecessors, paths = shortest_paths_dijkstra(indptr, indices, weights, source)
+
+        dependency = [0.0] * node_count
+        while order:
+            node = order.pop()
+            coefficient = (1 + dependency[node]) / paths[node]
+            for predecessor in predecessors[node]:
+                dependency[predecessor] += paths[predecessor] * coefficient
+            if node != source:
+                betweenness[node] += dependency[node]
+    return np.array(betweenness, dtype=np.float64)
+
+
+def shortest_paths_bfs(indptr: List[int], indices: List[int], source: int) -> \
+        Tuple[List[int], List[List[int]], List[int]]:
+    node_count = len(indptr) - 1
+    order = []
+    predecessors = [[] for _ in range(node_count)]
+    paths = [0] * node_count
+    paths[source] = 1
+    distance = [-1] * node_count
+    distance[source] = 0
+    queue = deque((source,))
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        next_distance = distance[node] + 1
+        for position in range(indptr[node], indptr[node + 1]):
+            neighbour = indices[position]
+            if distance[neighbour] < 0:
+                distance[neighbour] = next_distance
+                queue.append(neighbour)
+            if distance[neighbour] == next_distance:
+                paths[neighbour] += paths[node]
+                predecessors[neighbour].append(node)
+    return order, predecessors, paths
+
+
+def shortest_paths_dijkstra(indptr: List[int], indices: List[int], weights: List[float],
+                            source: int) -> Tuple[List[int], List[List[int]], List[int]]:
+    # Same tie handling as networkx: a path only counts when its length is
+    # exactly equal to the settled distance.
+    node_count = len(indptr) - 1
+    order = []
+    predecessors = [[] for _ in range(node_count)]
+    paths = [0] * node_count
+    paths[source] = 1
+    distance = [-1.0] * node_count
+    seen = {source: 0.0}
+    heap = [(0.0, 0, source, source)]
+    counter = 1
+    while heap:
+        node_distance, _, predecessor, node = heappop(heap)
+        if distance[node] >= 0:
+            continue
+        paths[node] += paths[predecessor] if predecessor != node else 0
+        order.append(node)
+        distance[node] = node_distance
+        for position in range(indptr[node], indptr[node + 1]):
+            neighbour = indices[position]
+            neighbour_distance = node_distance + weights[position]
+            if distance[neighbour] < 0 and \
+                    (neighbour not in seen or neighbour_distance < seen[neighbour]):
+                seen[neighbour] = neighbour_distance
+                heappush(heap, (neighbour_distance, counter, node, neighbour))
+                counter += 1
+                paths[neighbour] = 0
+                predecessors[neighbour] = [node]
+            elif neighbour_distance == seen.get(neighbour):
+                paths[neighbour] += paths[node]
+                predecessors[neighbour].append(node)
+    return order, predecessors, paths
+
+
+def vertex_diameter_bound(graph: CompactGraph) -> int:
+    # Upper bound on the number of nodes of any shortest path. For undirected
+    # graphs twice the eccentricity of one node of the largest component (plus
+    # one), and the size of any other component; directed graphs fall back to
+    # the size of the largest weak component.
+    labels = connected_components(graph)
+    if len(labels) == 0:
+        return 0
+    sizes = np.sort(np.bincount(labels))[::-1]
+    if graph.directed:
+        return int(sizes[0])
+    largest = int(np.argmax(np.bincount(labels)))
+    distances = bfs_distances(graph.indptr, graph.indices, int(np.flatnonzero(labels == largest)[0]))
+    bound = min(int(sizes[0]), 2 * int(distances.max()) + 1)
+    return max(bound, int(sizes[1]) if len(sizes) > 1 else 0)
+
+
+def betweenness_sample_size(vertex_diameter: int, epsilon: float, delta: float) -> int:
+    # Riondato and Kornaropoulos: this many sampled shortest paths give every
+    # node's betweenness within 'epsilon' with probability 1 - 'delta'.
+    if vertex_diameter < 3:
+        return 0
+    return ceil(RK_CONSTANT / epsilon ** 2 * (floor(log2(vertex_diameter - 2)) + 1 + log(1 / delta)))
+
+
+def approximate_betweenness_centrality(graph: CompactGraph, epsilon: float = DEFAULT_EPSILON,
+                                       delta: float = DEFAULT_DELTA,
+                                       seed: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    # Samples uniform node pairs and one uniform shortest path between them,
+    # crediting the inner nodes of the path. The sample size adapts to a bound
+    # on the vertex diameter, so the guarantee holds for the normalized values
+    # (scaled as networkx does) with epsilon widened by n / (n - 2).
+    node_count = graph.node_count
+    result = np.zeros(node_count, dtype=np.float64)
+    samples = betweenness_sample_size(vertex_diameter_bound(graph), epsilon, delta)
+    if node_count < 3 or samples == 0:
+        return result, 0
+
+    rng = np.random.default_rng(seed)
+    in_indptr = graph.in_indptr
+    in_indices = graph.in_indices
+    for _ in range(samples):
+        source, target = rng.choice(node_count, size=2, replace=False)
+        distances, paths = bfs_path_counts(graph.indptr, graph.indices, int(source), int(target))
+        if distances[target] == UNREACHED:
+            continue
+        node = int(target)
+        while True:
+            predecessors = in_indices[in_indptr[node]:in_indptr[node + 1]]
+            predecessors = predecessors[distances[predecessors] == distances[node] - 1]
+            weights = paths[predecessors]
+            node = int(predecessors[rng.choice(len(predecessors), p=weights / weights.sum())])
+            if node == source:
+                break
+            result[node] += 1
+
+    return result * (node_count / (samples * (node_count - 2))), samples
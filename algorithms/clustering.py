@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+# Upper bound on the wedges checked at once.
+WEDGE_CHUNK = 1 << 22
+
+
+def arc_keys(graph: CompactGraph) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Sorted source * n + target of every arc, self-loops left out, and the
+    # weights in the same order; undirected edges give both arcs.
+    sources = np.repeat(np.arange(graph.node_count, dtype=np.int64), np.diff(graph.indptr))
+    targets = np.asarray(graph.indices, dtype=np.int64)
+    keys = sources * graph.node_count + targets
+    order = np.argsort(keys[sources != targets], kind='stable')
+    weights = None if graph.weights is None else np.asarray(graph.weights, dtype=np.float64)[sources != targets][order]
+    return keys[sources != targets][order], weights
+
+
+def contains(keys: np.ndarray, queries: np.ndarray) -> np.ndarray:
+    positions = np.minimum(np.searchsorted(keys, queries), max(len(keys) - 1, 0))
+    return keys[positions] == queries if len(keys) else np.zeros(len(queries), dtype=bool)
+
+
+def triangles(graph: CompactGraph) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    # Every triangle of the underlying simple undirected graph once. Edges
+    # point from the lower to the higher (degree, index) rank, so no node has
+    # more than sqrt(2m) forward neighbours, and every forward wedge u -> v,
+    # u -> w is closed by a lookup of the edge between v and w.
+    node_count = graph.node_count
+    keys, _ = arc_keys(graph)
+    sources, targets = keys // max(node_count, 1), keys % max(node_count, 1)
+    edges = np.unique(np.minimum(sources, targets) * node_count + np.maximum(sources, targets))
+    sources, targets = edges // max(node_count, 1), edges % max(node_count, 1)
+    degree = np.bincount(np.concatenate((sources, targets)), minlength=node_count)
+    rank = np.empty(node_count, dtype=np.int64)
+    rank[np.lexsort((np.arange(node_count), degree))] = np.arange(node_count)
+    forward = rank[sources] < rank[targets]
+    forward_keys = np.sort(np.where(forward, sources * node_count + targets, targets * node_count + sources))
+    low, high = forward_keys // max(node_count, 1), forward_keys % max(node_count, 1)
+    indptr = np.searchsorted(low, np.arange(node_count + 1))
+    counts = np.diff(indptr)
+    wedge_counts = counts * (counts - 1) // 2
+
+    found = ([], [], [])
+    bounds = np.searchsorted(np.cumsum(wedge_counts), np.arange(0, wedge_counts.sum(), WEDGE_CHUNK), 'right')
+    for start, end in zip(bounds, np.append(bounds[1:], node_count)):
+        # Positions p < q within the forward list of each node in the chunk.
+        positions = np.arange(indptr[start], indptr[end])
+        per_position = indptr[low[positions] + 1] - 1 - positions
+        first = np.repeat(positions, per_position)
+        offsets = np.arange(len(first)) - np.repeat(np.cumsum(per_position) - per_position, per_position)
+        second = first + offsets + 1
+        u, v, w = low[first], high[first], high[second]
+        closed = rank[v] < rank[w]
+        query = np.where(closed, v * node_count + w, w * node_count + v)
+        closed = contains(forward_keys, query)
+        for found_nodes, nodes_of in zip(found, (u, v, w)):
+            found_nodes.append(nodes_of[closed])
+    return tuple(np.concatenate(nodes) if nodes else np.empty(0, dtype=np.int64) for nodes in found)
+
+
+class Triangles:
+    # Triangles of a graph, enumerated once and shared by the local
+    # clustering, its average and transitivity, all defined as in networkx.
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+        self.nodes = triangles(graph)
+        self._keys, self._weights = arc_keys(graph)
+
+    def arcs(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        return contains(self._keys, sources * self.graph.node_count + targets)
+
+    def arc_weights(self, sources: np.ndarray, targets: np.ndarray) -> np.ndarray:
+        # Weights scaled by the largest weight (self-loops included), as
+        # networkx does; 0 for a missing arc.
+        if self._weights is None:
+            raise ValueError("Weighted clustering needs a weighted graph.")
+        scale = float(np.max(self.graph.weights, initial=0)) or 1.0
+        queries = sources * self.graph.node_count + targets
+        result = np.zeros(len(queries), dtype=np.float64)
+        found = contains(self._keys, queries)
+        result[found] = self._weights[np.searchsorted(self._keys, queries[found])] / scale
+        return result
+
+    def counts(self) -> np.ndarray:
+        # Triangles through every node, directions ignored.
+        return np.bincount(np.concatenate(self.nodes), minlength=self.graph.node_count)
+
+    def clustering(self, weighted=False) -> np.ndarray:
+        graph = self.graph
+        a, b, c = self.nodes
+        if graph.directed:
+            # Fagiolo (2007): triangles of A + A^T, weighted ones of
+            # W^(1/3) + (W^T)^(1/3), over the total degree less the reciprocal
+            # pairs.
+            def side(source: np.ndarray, target: np.ndarray) -> np.ndarray:
+                if weighted:
+                    return np.cbrt(self.arc_weights(source, target)) + np.cbrt(self.arc_weights(target, source))
+                return self.arcs(source, target).astype(np.float64) + self.arcs(target, source)
+
+            products = side(a, b) * side(b, c) * side(c, a)
+            sources, targets = self._keys // max(graph.node_count, 1), self._keys % max(graph.node_count, 1)
+            total = np.bincount(np.concatenate((sources, targets)), minlength=graph.node_count)
+            reciprocal = np.bincount(sources[self.arcs(targets, sources)], minlength=graph.node_count)
+            denominator = total * (total - 1) - 2 * reciprocal
+        else:
+            if weighted:
+                products = np.cbrt(self.arc_weights(a, b) * self.arc_weights(b, c) * self.arc_weights(c, a))
+            else:
+                products = np.ones(len(a), dtype=np.float64)
+            products = 2 * products
+            degree = np.bincount(self._keys // max(graph.node_count, 1), minlength=graph.node_count)
+            denominator = degree * (degree - 1)
+        numerator = np.bincount(np.concatenate((a, b, c)), np.tile(products, 3), minlength=graph.node_count)
+        result = np.zeros(graph.node_count, dtype=np.float64)
+        np.divide(numerator, denominator, out=result, where=numerator > 0)
+        return result
+
+    def transitivity(self) -> float:
+        # Uses out-neighbourhoods for directed graphs, like networkx does: a
+        # triangle counts once per ordering (v, o, w) with v -> o, v -> w and
+        # o -> w.
+        graph = self.graph
+        a, b, c = self.nodes
+        out_degree = np.bincount(self._keys // max(graph.node_count, 1), minlength=graph.node_count)
+        triads = int((out_degree * (out_degree - 1)).sum())
+        if graph.directed:
+            closed = sum(
+                int((self.arcs(v, o) & self.arcs(v, w) & self.arcs(o, w)).sum())
+                for v, o, w in ((a, b, c), (a, c, b), (b, a, c), (b, c, a), (c, a, b), (c, b, a))
+            )
+        else:
+            closed = 6 * len(a)
+        return 0.0 if closed == 0 else closed / triads
+
+
+def clustering(graph: CompactGraph, weighted=False, triangle_list: Optional[Triangles] = None) -> np.ndarray:
+    return (triangle_list or Triangles(graph)).clustering(weighted)
+
+
+def average_clustering(graph: CompactGraph, weighted=False, triangle_list: Optional[Triangles] = None) -> float:
+    if graph.node_count == 0:
+        return 0.0
+    return float(clustering(graph, weighted, triangle_list).mean())
+
+
+def transitivity(graph: CompactGraph, triangle_list: Optional[Triangles] = None) -> float:
+    return (triangle_list or Triangles(graph)).transitivity()
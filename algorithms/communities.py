@@ -0,0 +1,421 @@
+from __future__ import annotations
+
+from collections import deque
+from heapq import heapify, heappop, heappush
+from multiprocessing import Pool
+from os import getpid
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from algorithms.components import normalize_labels, union_find_labels
+from compact_graph import CompactGraph
+
+LEIDEN = 'leiden'
+GIRVAN_NEWMAN = 'girvan_newman'
+ALGORITHMS = (LEIDEN, GIRVAN_NEWMAN)
+DEFAULT_RESOLUTION = 1.0
+# Edge betweenness is compared at this many decimals, so float noise from the
+# summation order does not decide between edges with equal betweenness.
+BETWEENNESS_DECIMALS = 9
+PARTS_PER_WORKER = 4
+
+
+class Arcs:
+    # Weighted arcs in both orientations. An undirected edge is a pair of
+    # opposite arcs, so one (directed, Leicht-Newman) modularity gain covers
+    # both kinds of graphs.
+    def __init__(self, sources: np.ndarray, targets: np.ndarray, weights: np.ndarray,
+                 node_count: int):
+        order = np.lexsort((targets, sources))
+        sources, targets, weights = sources[order], targets[order], weights[order]
+        if len(sources):
+            # Parallel arcs, e.g. after aggregation, are merged.
+            first = np.ones(len(sources), dtype=bool)
+            first[1:] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+            starts = np.flatnonzero(first)
+            weights = np.add.reduceat(weights, starts)
+            sources, targets = sources[starts], targets[starts]
+        self.node_count = node_count
+        self.sources = sources
+        self.targets = targets
+        self.weights = weights
+        self.total = float(weights.sum())
+        self.out_strength = np.bincount(sources, weights, minlength=node_count)
+        self.in_strength = np.bincount(targets, weights, minlength=node_count)
+        self.out_indptr = np.searchsorted(sources, np.arange(node_count + 1))
+        transpose = np.lexsort((sources, targets))
+        self.in_sources = sources[transpose]
+        self.in_weights = weights[transpose]
+        self.in_indptr = np.searchsorted(targets[transpose], np.arange(node_count + 1))
+
+    @staticmethod
+    def from_graph(graph: CompactGraph, weighted: bool) -> Arcs:
+        sources, targets, weights = graph.edges()
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if weighted and weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+        else:
+            weights = np.ones(len(sources), dtype=np.float64)
+        if not graph.directed:
+            # A self-loop counts twice towards the degree, same as in networkx.
+            sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+            weights = np.concatenate((weights, weights))
+        return Arcs(sources, targets, weights, graph.node_count)
+
+    def aggregate(self, membership: np.ndarray, count: int) -> Arcs:
+        return Arcs(membership[self.sources], membership[self.targets], self.weights, count)
+
+    def neighbour_weights(self, node: int, communities: List[int],
+                          group: Optional[List[int]] = None) -> dict:
+        # Arc weight between 'node' and each neighbouring community, both
+        # orientations, without self-loops; optionally only over neighbours
+        # in the same 'group' as the node.
+        allowed = None if group is None else group[node]
+        weights = {}
+        for neighbours, arc_weights in (
+                (self._out_targets[node], self._out_weights[node]),
+                (self._in_neighbours[node], self._in_arc_weights[node])):
+            for neighbour, weight in zip(neighbours, arc_weights):
+                if neighbour == node or (group is not None and group[neighbour] != allowed):
+                    continue
+                community = communities[neighbour]
+                weights[community] = weights.get(community, 0.0) + weight
+        return weights
+
+    def prepare(self):
+        # Python lists per node, the local moving loop runs in the interpreter.
+        targets = self.targets.tolist()
+        weights = self.weights.tolist()
+        in_sources = self.in_sources.tolist()
+        in_weights = self.in_weights.tolist()
+        out_indptr = self.out_indptr.tolist()
+        in_indptr = self.in_indptr.tolist()
+        self._out_targets = [targets[out_indptr[node]:out_indptr[node + 1]]
+                             for node in range(self.node_count)]
+        self._out_weights = [weights[out_indptr[node]:out_indptr[node + 1]]
+                             for node in range(self.node_count)]
+        self._in_neighbours = [in_sources[in_indptr[node]:in_indptr[node + 1]]
+                               for node in range(self.node_count)]
+        self._in_arc_weights = [in_weights[in_indptr[node]:in_indptr[node + 1]]
+                                for node in range(self.node_count)]
+
+
+def move_nodes(arcs: Arcs, communities: List[int], order: List[int], resolution: float,
+               group: Optional[List[int]] = None, singletons_only=False) -> bool:
+    # Louvain local moving: every node joins the neighbouring community with
+    # the largest modularity gain, until a full pass moves nothing. With
+    # 'group' moves stay inside the node's group (Leiden refinement, where
+    # only nodes still on their own are merged).
+    total = arcs.total
+    out_strength = arcs.out_strength.tolist()
+    in_strength = arcs.in_strength.tolist()
+    community_out = [0.0] * arcs.node_count
+    community_in = [0.0] * arcs.node_count
+    sizes = [0] * arcs.node_count
+    for node, community in enumerate(communities):
+        community_out[community] += out_strength[node]
+        community_in[community] += in_strength[node]
+        sizes[community] += 1
+
+    moved = False
+    improved = True
+    while improved:
+        improved = False
+        for node in order:
+            current = communities[node]
+            if singletons_only and sizes[current] > 1:
+                continue
+            weights = arcs.neighbour_weights(node, communities, group)
+            node_out = out_strength[node]
+            node_in = in_strength[node]
+            community_out[current] -= node_out
+            community_in[current] -= node_in
+
+            def gain(community: int) -> float:
+                return weights.get(community, 0.0) / total - resolution * \
+                    (node_out * community_in[community] + node_in * community_out[community]) / total ** 2
+
+            best = current
+            best_gain = gain(current)
+            for community in weights:
+                community_gain = gain(community)
+                if community_gain > best_gain:
+                    best, best_gain = community, community_gain
+
+            community_out[best] += node_out
+            community_in[best] += node_in
+            if best != current:
+                sizes[current] -= 1
+                sizes[best] += 1
+                communities[node] = best
+                moved = improved = True
+        if singletons_only:
+            break
+    return moved
+
+
+def leiden(graph: CompactGraph, weighted=False, resolution: float = DEFAULT_RESOLUTION,
+           seed: Optional[int] = None) -> np.ndarray:
+    # Multilevel modularity optimization: Louvain local moving, a Leiden style
+    # refinement that merges nodes only within their community (so every
+    # community stays connected), then aggregation of the refined partition
+    # with the unrefined one as its starting point. Returns a label per node,
+    # communities numbered by decreasing size.
+    rng = np.random.default_rng(seed)
+    arcs = Arcs.from_graph(graph, weighted)
+    membership = np.arange(graph.node_count)
+    communities = list(range(graph.node_count))
+    if arcs.total == 0:
+        return community_order(membership)
+
+    while True:
+        arcs.prepare()
+        order = rng.permutation(arcs.node_count).tolist()
+        moved = move_nodes(arcs, communities, order, resolution)
+
+        refined = list(range(arcs.node_count))
+        move_nodes(arcs, refined, order, resolution, group=communities, singletons_only=True)
+        refined = normalize_labels(np.array(refined))
+        count = int(refined.max()) + 1
+        # Done once nothing moves and aggregating would not merge any node.
+        if not moved and count in (arcs.node_count, len(set(communities))):
+            break
+
+        aggregated_communities = np.zeros(count, dtype=np.int64)
+        aggregated_communities[refined] = communities
+        membership = refined[membership]
+        arcs = arcs.aggregate(refined, count)
+        communities = normalize_labels(aggregated_communities).tolist()
+
+    return community_order(np.array(communities)[membership])
+
+
+def community_order(labels: np.ndarray) -> np.ndarray:
+    # Relabels so that community 0 is the largest; ties go to the community
+    # holding the smaller node index.
+    labels = normalize_labels(labels)
+    sizes = np.bincount(labels)
+    first = np.full(len(sizes), len(labels), dtype=np.int64)
+    np.minimum.at(first, labels, np.arange(len(labels)))
+    ranking = np.lexsort((first, -sizes))
+    relabel = np.empty(len(sizes), dtype=np.int64)
+    relabel[ranking] = np.arange(len(sizes))
+    return relabel[labels]
+
+
+def modularity(graph: CompactGraph, labels: np.ndarray, weighted=False,
+               resolution: float = DEFAULT_RESOLUTION) -> float:
+    # Same value as networkx.algorithms.community.modularity for the
+    # partition given by 'labels'.
+    arcs = Arcs.from_graph(graph, weighted)
+    if arcs.total == 0:
+        return 0.0
+    inside = labels[arcs.sources] == labels[arcs.targets]
+    community_out = np.bincount(labels, arcs.out_strength)
+    community_in = np.bincount(labels, arcs.in_strength)
+    return float(arcs.weights[inside].sum() / arcs.total -
+                 resolution * (community_out * community_in).sum() / arcs.total ** 2)
+
+
+def community_members(labels: np.ndarray, count: Optional[int] = None) -> List[np.ndarray]:
+    order = np.argsort(labels, kind='stable')
+    bounds = np.searchsorted(labels[order], np.arange(int(labels.max(initial=-1)) + 2))
+    members = [order[start:end] for start, end in zip(bounds, bounds[1:])]
+    return members if count is None else members[:count]
+
+
+class Dendrogram:
+    # Girvan-Newman splits as the edges in removal order, those never removed
+    # last, and the number of components after each removal. A level is
+    # rebuilt by joining the edges removed after it, so any recorded community
+    # count can be read off without running the removals again.
+    def __init__(self, node_count: int, sources: np.ndarray, targets: np.ndarray,
+                 component_counts: np.ndarray, initial_count: int):
+        self.node_count = node_count
+        self.sources = sources
+        self.targets = targets
+        self.component_counts = component_counts
+        self.initial_count = initial_count
+
+    @property
+    def counts(self) -> List[int]:
+        # Community counts of the levels, as networkx girvan_newman yields them.
+        return sorted(set(self.component_counts.tolist()) - {self.initial_count})
+
+    def labels(self, count: int) -> np.ndarray:
+        # First level with at least 'count' communities; the first level is
+        # always past one split, as in networkx.
+        step = int(np.searchsorted(self.component_counts, max(count, self.initial_count + 1)))
+        if step == len(self.component_counts):
+            raise ValueError(f"The dendrogram only reaches {self.component_counts.max(initial=self.initial_count)} "
+                             f"communities, {count} were requested.")
+        return community_order(union_find_labels(self.sources[step + 1:], self.targets[step + 1:],
+                                                 self.node_count))
+
+
+def undirected_adjacency(graph: CompactGraph) -> Tuple[List[int], List[int], List[int], np.ndarray, np.ndarray]:
+    # Girvan-Newman ignores directions and self-loops, as networkx does. Edges
+    # are numbered in (smaller, larger) node order and every adjacency
+    # position carries the number of its edge.
+    sources, targets, _ = graph.edges()
+    low = np.minimum(sources, targets).astype(np.int64)
+    high = np.maximum(sources, targets).astype(np.int64)
+    keys = np.unique((low * graph.node_count + high)[low != high])
+    low, high = keys // max(graph.node_count, 1), keys % max(graph.node_count, 1)
+    edge_ids = np.arange(len(keys))
+    position_sources = np.concatenate((low, high))
+    position_targets = np.concatenate((high, low))
+    order = np.lexsort((position_targets, position_sources))
+    indptr = np.searchsorted(position_sources[order], np.arange(graph.node_count + 1))
+    return indptr.tolist(), position_targets[order].tolist(), \
+        np.concatenate((edge_ids, edge_ids))[order].tolist(), low, high
+
+
+def edge_dependencies(indptr: List[int], indices: List[int], edges: List[int], alive: List[bool],
+                      sources: Iterable[int]) -> np.ndarray:
+    # Brandes' accumulation onto edges, over the edges still alive.
+    betweenness = np.zeros(len(alive), dtype=np.float64)
+    for source in sources:
+        order = []
+        predecessors = {source: []}
+        paths = {source: 1}
+        distance = {source: 0}
+        queue = deque((source,))
+        while queue:
+            node = queue.popleft()
+            order.append(node)
+            next_distance = distance[node] + 1
+            for position in range(indptr[node], indptr[node + 1]):
+                edge = edges[position]
+                if not alive[edge]:
+                    continue
+                neighbour = indices[position]
+                if neighbour not in distance:
+                    distance[neighbour] = next_distance
+                    paths[neighbour] = 0
+                    predecessors[neighbour] = []
+                    queue.append(neighbour)
+                if distance[neighbour] == next_distance:
+                    paths[neighbour] += paths[node]
+                    predecessors[neighbour].append((node, edge))
+
+        dependency = dict.fromkeys(order, 0.0)
+        while order:
+            node = order.pop()
+            coefficient = (1 + dependency[node]) / paths[node]
+            for predecessor, edge in predecessors[node]:
+                credit = paths[predecessor] * coefficient
+                betweenness[edge] += credit
+                dependency[predecessor] += credit
+    return betweenness
+
+
+shared = {}
+
+
+def share_edges(indptr: List[int], indices: List[int], edges: List[int], edge_count: int):
+    shared['indptr'] = indptr
+    shared['indices'] = indices
+    shared['edges'] = edges
+    shared['alive'] = [True] * edge_count
+    shared['removed'] = 0
+
+
+def shared_edge_dependencies(task: Tuple[List[int], int, List[int]]) -> Tuple[int, int, np.ndarray]:
+    # Workers replay the removals they have not seen yet before the sweep;
+    # 'tail' holds the removals from position 'start' on. Returns the worker
+    # and how many removals it has replayed, so the next tail can be shorter.
+    sources, start, tail = task
+    alive = shared['alive']
+    for edge in tail[shared['removed'] - start:]:
+        alive[edge] = False
+    shared['removed'] = start + len(tail)
+    return getpid(), shared['removed'], \
+        edge_dependencies(shared['indptr'], shared['indices'], shared['edges'], alive, sources)
+
+
+def girvan_newman(graph: CompactGraph, communities: Optional[int] = None, workers=1) -> Dendrogram:
+    # Removes the edge of highest betweenness until 'communities' components
+    # exist (or no edge is left). Betweenness only changes inside the
+    # component that held the removed edge, so only that component is swept
+    # again, its sources dealt out to a process pool; every other edge keeps
+    # its entry in the priority queue. Queue entries are invalidated lazily
+    # by a version per edge. Ties go to the first edge in node order.
+    node_count = graph.node_count
+    indptr, indices, edges, low, high = undirected_adjacency(graph)
+    edge_count = len(low)
+    alive = [True] * edge_count
+    version = [0] * edge_count
+    labels = union_find_labels(low, high, node_count)
+    count = int(labels.max(initial=-1)) + 1
+    initial_count = count
+    removed = []
+    counts = []
+
+    pool = Pool(workers, initializer=share_edges, initargs=(indptr, indices, edges, edge_count)) \
+        if workers > 1 and node_count > workers else None
+
+    # Removals replayed per worker process; only those after the slowest
+    # worker's position are sent, not the whole list on every map.
+    replayed = {}
+
+    def sweep(sources: List[int]) -> np.ndarray:
+        if pool is None:
+            return edge_dependencies(indptr, indices, edges, alive, sources)
+        parts = [sources[start::workers * PARTS_PER_WORKER] for start in range(workers * PARTS_PER_WORKER)]
+        first = min(replayed.values()) if len(replayed) == workers else 0
+        tail = removed[first:]
+        results = pool.map(shared_edge_dependencies, [(part, first, tail) for part in parts])
+        for worker, count, _ in results:
+            replayed[worker] = count
+        return np.sum([dependencies for _, _, dependencies in results], axis=0)
+
+    def component(source: int) -> set:
+        seen = {source}
+        queue = deque((source,))
+        while queue:
+            node = queue.popleft()
+            for position in range(indptr[node], indptr[node + 1]):
+                neighbour = indices[position]
+                if alive[edges[position]] and neighbour not in seen:
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+        return seen
+
+    def queue_entries(betweenness: np.ndarray, changed: Iterable[int]) -> List[Tuple[float, int, int]]:
+        rounded = np.round(betweenness, BETWEENNESS_DECIMALS).tolist()
+        return [(-rounded[edge], edge, version[edge]) for edge in changed]
+
+    try:
+        heap = queue_entries(sweep(list(range(node_count))), range(edge_count))
+        heapify(heap)
+        while heap and (communities is None or count < communities or count == initial_count):
+            _, edge, edge_version = heappop(heap)
+            if not alive[edge] or edge_version != version[edge]:
+                continue
+            alive[edge] = False
+            removed.append(edge)
+            source, target = int(low[edge]), int(high[edge])
+            nodes = component(source)
+            if target not in nodes:
+                count += 1
+                nodes |= component(target)
+            nodes = sorted(nodes)
+            counts.append(count)
+
+            changed = [edges[position] for node in nodes for position in range(indptr[node], indptr[node + 1])
+                       if alive[edges[position]] and node < indices[position]]
+            for changed_edge in changed:
+                version[changed_edge] += 1
+            betweenness = sweep(nodes)
+            for entry in queue_entries(betweenness, changed):
+                heappush(heap, entry)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    order = np.array(removed + [edge for edge in range(edge_count) if alive[edge]], dtype=np.int64)
+    return Dendrogram(node_count, low[order], high[order], np.array(counts, dtype=np.int64), initial_count)
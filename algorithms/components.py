@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+
+def union_find_labels(sources: np.ndarray, targets: np.ndarray, node_count: int) -> np.ndarray:
+    # Shiloach-Vishkin style hooking: every round points the larger root of
+    # each crossing edge at the smaller one and then flattens the forest, so
+    # the number of rounds stays logarithmic instead of following the diameter.
+    parent = np.arange(node_count, dtype=np.int64)
+    sources = np.asarray(sources, dtype=np.int64)
+    targets = np.asarray(targets, dtype=np.int64)
+    while True:
+        source_roots = parent[sources]
+        target_roots = parent[targets]
+        crossing = source_roots != target_roots
+        if not crossing.any():
+            break
+        sources = sources[crossing]
+        targets = targets[crossing]
+        high = np.maximum(source_roots[crossing], target_roots[crossing])
+        low = np.minimum(source_roots[crossing], target_roots[crossing])
+        np.minimum.at(parent, high, low)
+        while True:
+            grandparent = parent[parent]
+            if np.array_equal(grandparent, parent):
+                break
+            parent = grandparent
+    return normalize_labels(parent)
+
+
+def normalize_labels(labels: np.ndarray) -> np.ndarray:
+    _, normalized = np.unique(labels, return_inverse=True)
+    return normalized.astype(np.int32).reshape(-1)
+
+
+def connected_components(graph: CompactGraph) -> np.ndarray:
+    # Weak components for directed graphs.
+    sources, targets, _ = graph.edges()
+    return union_find_labels(sources, targets, graph.node_count)
+
+
+def strongly_connected_components(graph: CompactGraph) -> np.ndarray:
+    if not graph.directed:
+        return connected_components(graph)
+
+    # Iterative Tarjan, the recursive version overflows the stack on long
+    # paths through road networks.
+    indptr = graph.indptr.tolist()
+    indices = graph.indices.tolist()
+    node_count = graph.node_count
+    index = [-1] * node_count
+    lowlink = [0] * node_count
+    on_stack = [False] * node_count
+    labels = [-1] * node_count
+    stack = []
+    counter = 0
+    component = 0
+
+    for root in range(node_count):
+        if index[root] != -1:
+            continue
+        work = [(root, indptr[root])]
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = True
+        while work:
+            node, position = work[-1]
+            end = indptr[node + 1]
+            while position < end:
+                neighbour = indices[position]
+                position += 1
+                if index[neighbour] == -1:
+                    work[-1] = (node, position)
+                    index[neighbour] = lowlink[neighbour] = counter
+                    counter += 1
+                    stack.append(neighbour)
+                    on_stack[neighbour] = True
+                    work.append((neighbour, indptr[neighbour]))
+                    break
+                elif on_stack[neighbour] and index[neighbour] < lowlink[node]:
+                    lowlink[node] = index[neighbour]
+            else:
+                work.pop()
+                if work and lowlink[node] < lowlink[work[-1][0]]:
+                    lowlink[work[-1][0]] = lowlink[node]
+                if lowlink[node] == index[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        labels[member] = component
+                        if member == node:
+                            break
+                    component += 1
+
+    return np.array(labels, dtype=np.int32)
+
+
+def largest_component(labels: np.ndarray) -> np.ndarray:
+    if len(labels) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(labels == np.argmax(np.bincount(labels)))
+
+
+def condensation(graph: CompactGraph, labels: np.ndarray) -> CompactGraph:
+    # One node per strong component and one arc per pair of components joined
+    # by an edge. Tarjan numbers components in reverse topological order, so
+    # every arc goes from a higher to a lower label.
+    sources, targets, _ = graph.edges()
+    sources = labels[sources].astype(np.int64)
+    targets = labels[targets].astype(np.int64)
+    count = int(labels.max(initial=-1)) + 1
+    keys = np.unique((sources * count + targets)[sources != targets])
+    return CompactGraph.from_edges(keys // max(count, 1), keys % max(count, 1), None, count, True)
+
+
+class ComponentIndex:
+    # Weak and strong component labels of every node, each computed once on
+    # first use and shared by every measure. Largest components are handed
+    # out as node masks over the whole graph, not as copied subgraphs.
+    # Undirected graphs have a single kind of component.
+    def __init__(self, graph: CompactGraph):
+        self.graph = graph
+        self._labels: Dict[bool, np.ndarray] = {}
+        self._sizes: Dict[bool, np.ndarray] = {}
+        self._largest: Dict[bool, np.ndarray] = {}
+        self._condensation: Optional[CompactGraph] = None
+
+    def labels(self, strong: bool) -> np.ndarray:
+        strong = strong and self.graph.directed
+        if strong not in self._labels:
+            self._labels[strong] = strongly_connected_components(self.graph) if strong \
+                else connected_components(self.graph)
+        return self._labels[strong]
+
+    def sizes(self, strong: bool) -> np.ndarray:
+        strong = strong and self.graph.directed
+        if strong not in self._sizes:
+            self._sizes[strong] = np.bincount(self.labels(strong))
+        return self._sizes[strong]
+
+    def count(self, strong: bool) -> int:
+        return len(self.sizes(strong))
+
+    def connected(self, strong: bool) -> bool:
+        return self.count(strong) <= 1
+
+    def largest_mask(self, strong: bool) -> np.ndarray:
+        strong = strong and self.graph.directed
+        if strong not in self._largest:
+            labels = self.labels(strong)
+            self._largest[strong] = labels == np.argmax(self.sizes(strong)) if len(labels) \
+                else np.zeros(0, dtype=bool)
+        return self._largest[strong]
+
+    @property
+    def condensation(self) -> CompactGraph:
+        if not self.graph.directed:
+            raise ValueError("Only directed graphs have a condensation.")
+        if self._condensation is None:
+            self._condensation = condensation(self.graph, self.labels(strong=True))
+        return self._condensation
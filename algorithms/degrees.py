@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Tuple, Union
+
+import numpy as np
+
+from compact_graph import CompactGraph
+
+IN = 'in'
+OUT = 'out'
+DIRECTIONS = (IN, OUT)
+# The four (source, target) degree pairs of directed assortativity.
+ASSORTATIVITY_VARIANTS = ((OUT, IN), (IN, IN), (OUT, OUT), (IN, OUT))
+
+
+def degree_distribution(degrees: np.ndarray) -> Dict[int, int]:
+    counts = np.bincount(degrees)
+    present = np.flatnonzero(counts)
+    return dict(zip(present.tolist(), counts[present].tolist()))
+
+
+class Degrees:
+    # In, out and total degree of every node, one bincount over the edge
+    # endpoints; a self-loop adds two to the total degree, as in networkx.
+    # Undirected edges are given once, so only the total degree means
+    # anything for them.
+    def __init__(self, sources: np.ndarray, targets: np.ndarray, node_count: int, directed: bool):
+        self.directed = directed
+        self.out_degree = np.bincount(sources, minlength=node_count)
+        self.in_degree = np.bincount(targets, minlength=node_count)
+        self.degree = self.out_degree + self.in_degree
+
+    @staticmethod
+    def from_graph(graph: CompactGraph) -> Degrees:
+        sources, targets, _ = graph.edges()
+        return Degrees(sources, targets, graph.node_count, graph.directed)
+
+    def of(self, direction: Optional[str]) -> np.ndarray:
+        if direction is None or not self.directed:
+            return self.degree
+        if direction not in DIRECTIONS:
+            raise ValueError(f"Invalid direction {direction}, expected any of {DIRECTIONS}.")
+        return self.in_degree if direction == IN else self.out_degree
+
+    def moment(self, order: int, direction: Optional[str] = None) -> float:
+        degrees = self.of(direction).astype(np.float64)
+        return float(np.mean(degrees ** order)) if len(degrees) else 0.0
+
+    @property
+    def average(self) -> Union[float, Tuple[float, float]]:
+        if self.directed:
+            return self.moment(1, IN), self.moment(1, OUT)
+        return self.moment(1)
+
+    @property
+    def distribution(self) -> Union[Dict[int, int], Tuple[Dict[int, int], Dict[int, int]]]:
+        if self.directed:
+            return degree_distribution(self.in_degree), degree_distribution(self.out_degree)
+        return degree_distribution(self.degree)
+
+
+def pearson(x: np.ndarray, y: np.ndarray) -> float:
+    # NaN when either side has no variance, like networkx.
+    x = x.astype(np.float64) - x.mean()
+    y = y.astype(np.float64) - y.mean()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return float((x * y).sum() / np.sqrt((x * x).sum() * (y * y).sum()))
+
+
+def degree_assortativity(graph: CompactGraph, x: str = OUT, y: str = IN,
+                         degrees: Optional[Degrees] = None) -> float:
+    # Pearson correlation of the degrees at both ends of every edge, as
+    # networkx degree_assortativity_coefficient: the 'x' degree of the source
+    # against the 'y' degree of the target for directed graphs, the total
+    # degree over both orientations of every edge for undirected ones.
+    degrees = degrees or Degrees.from_graph(graph)
+    sources = np.repeat(np.arange(graph.node_count), np.diff(graph.indptr))
+    targets = np.asarray(graph.indices)
+    return pearson(degrees.of(x)[sources], degrees.of(y)[targets])
+
+
+def directed_assortativity(graph: CompactGraph,
+                           degrees: Optional[Degrees] = None) -> Dict[Tuple[str, str], float]:
+    degrees = degrees or Degrees.from_graph(graph)
+    return {(x, y): degree_assortativity(graph, x, y, degrees) for x, y in ASSORTATIVITY_VARIANTS}
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+from heapq import heappop, heappush, heapreplace
+from multiprocessing import Pool
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from algorithms import components
+from algorithms.centrality import PARTS_PER_WORKER, share_adjacency, shared
+from algorithms.traversal import BATCH_BYTES, MAX_BATCH_WORDS, WORD_BITS, expand, multi_source_bfs, \
+    popcount, word_bits
+from compact_graph import CompactGraph
+
+BOUND_TOLERANCE = 1e-12
+# How edge weights become lengths in weighted_sweep: as they are, or as the
+# inverse of a connection strength (a heavier edge is a shorter one).
+WEIGHT_DISTANCE = 'distance'
+WEIGHT_STRENGTH = 'strength'
+WEIGHT_MODES = (WEIGHT_DISTANCE, WEIGHT_STRENGTH)
+
+
+class Sweep(NamedTuple):
+    # Per source node, over the nodes it reaches (itself excluded).
+    distance_sum: np.ndarray
+    reached: np.ndarray
+    efficiency: np.ndarray
+    # Largest distance to a node of 'component', -1 for sources outside it.
+    eccentricity: np.ndarray
+    # Per target node, over the nodes that reach it.
+    incoming_distance_sum: np.ndarray
+    incoming_reached: np.ndarray
+
+
+def sweep(graph: CompactGraph, component: Optional[np.ndarray] = None) -> Sweep:
+    # All-pairs BFS, hundreds of sources at a time, feeds every distance based
+    # measure at once: each level adds its distance to the sums of the
+    # sources (columns) and of the targets (rows) it reaches, so closeness
+    # needs no traversal of the reversed graph. 'component' is a node mask,
+    # by default the whole graph.
+    node_count = graph.node_count
+    if component is None:
+        component = np.ones(node_count, dtype=bool)
+    distance_sum = np.zeros(node_count, dtype=np.int64)
+    reached_count = np.zeros(node_count, dtype=np.int64)
+    efficiency = np.zeros(node_count, dtype=np.float64)
+    eccentricity = np.where(component, 0, -1).astype(np.int64)
+    incoming_distance_sum = np.zeros(node_count, dtype=np.int64)
+    incoming_reached = np.zeros(node_count, dtype=np.int64)
+
+    batch = WORD_BITS * max(1, min(MAX_BATCH_WORDS, BATCH_BYTES // (8 * max(node_count, 1))))
+    for start in range(0, node_count, batch):
+        sources = np.arange(start, min(start + batch, node_count))
+        for level, nodes, words in multi_source_bfs(graph.indptr, graph.indices, sources):
+            # Counted in 32 bits, which is faster, and widened before scaling.
+            per_target = popcount(words).astype(np.int64)
+            per_source = word_bits(words, len(sources)).sum(axis=0, dtype=np.int32).astype(np.int64)
+            incoming_distance_sum[nodes] += level * per_target
+            incoming_reached[nodes] += per_target
+            distance_sum[sources] += level * per_source
+            reached_count[sources] += per_source
+            efficiency[sources] += per_source / level
+            # Levels only grow, the last one reaching the component wins.
+            hit = np.bitwise_or.reduce(words[component[nodes]], axis=0)
+            in_component = word_bits(hit[None], len(sources))[0] & component[sources]
+            eccentricity[sources[in_component]] = level
+
+    return Sweep(distance_sum, reached_count, efficiency, eccentricity,
+                 incoming_distance_sum, incoming_reached)
+
+
+def edge_lengths(graph: CompactGraph, mode: str = WEIGHT_DISTANCE) -> np.ndarray:
+    if mode not in WEIGHT_MODES:
+        raise ValueError(f"Invalid weight mode {mode}, expected any of {WEIGHT_MODES}.")
+    if graph.weights is None:
+        raise ValueError("Weighted distances need a weighted graph.")
+    weights = np.asarray(graph.weights, dtype=np.float64)
+    if mode == WEIGHT_STRENGTH:
+        with np.errstate(divide='ignore'):
+            return np.reciprocal(weights)
+    return weights
+
+
+def dijkstra_distances(indptr: List[int], indices: List[int], lengths: List[float],
+                       source: int) -> List[float]:
+    # Binary heap Dijkstra on plain lists; stale heap entries are skipped
+    # instead of decreased. Unreached nodes stay at infinity.
+    distance = [float('inf')] * (len(indptr) - 1)
+    distance[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        node_distance, node = heappop(heap)
+        if node_distance > distance[node]:
+            continue
+        for position in range(indptr[node], indptr[node + 1]):
+            neighbour = indices[position]
+            neighbour_distance = node_distance + lengths[position]
+            if neighbour_distance < distance[neighbour]:
+                distance[neighbour] = neighbour_distance
+                heappush(heap, (neighbour_distance, neighbour))
+    return distance
+
+
+def dijkstra_sums(indptr: List[int], indices: List[int], lengths: List[float],
+                  sources: Iterable[int], component: np.ndarray) -> Tuple[np.ndarray, ...]:
+    # The Sweep fields of 'sources' (in their order) and their share of the
+    # incoming sums.
+    sources = list(sources)
+    node_count = len(indptr) - 1
+    distance_sum = np.zeros(len(sources), dtype=np.float64)
+    reached_count = np.zeros(len(sources), dtype=np.int64)
+    efficiency = np.zeros(len(sources), dtype=np.float64)
+    eccentricity = np.full(len(sources), -1.0, dtype=np.float64)
+    incoming_distance_sum = np.zeros(node_count, dtype=np.float64)
+    incoming_reached = np.zeros(node_count, dtype=np.int64)
+    for position, source in enumerate(sources):
+        distances = np.array(dijkstra_distances(indptr, indices, lengths, source))
+        finite = np.isfinite(distances)
+        finite[source] = False
+        reached = np.flatnonzero(finite)
+        lengths_reached = distances[reached]
+        distance_sum[position] = lengths_reached.sum()
+        reached_count[position] = len(reached)
+        positive = lengths_reached[lengths_reached > 0]
+        efficiency[position] = np.reciprocal(positive).sum()
+        if component[source]:
+            eccentricity[position] = distances[component & np.isfinite(distances)].max()
+        incoming_distance_sum[reached] += lengths_reached
+        incoming_reached[reached] += 1
+    return distance_sum, reached_count, efficiency, eccentricity, incoming_distance_sum, incoming_reached
+
+
+def shared_dijkstra_sums(task: Tuple[List[int], np.ndarray]) -> Tuple[np.ndarray, ...]:
+    sources, component = task
+    return dijkstra_sums(shared['indptr'], shared['indices'], shared['weights'], sources, component)
+
+
+def weighted_sweep(graph: CompactGraph, component: Optional[np.ndarray] = None,
+                   mode: str = WEIGHT_DISTANCE, workers=1) -> Sweep:
+    # The Sweep of sweep() with edge lengths from the weights, one Dijkstra
+    # per source. Sources are dealt out in interleaved batches to a process
+    # pool holding one copy of the adjacency per worker.
+    node_count = graph.node_count
+    if component is None:
+        component = np.ones(node_count, dtype=bool)
+    lengths = edge_lengths(graph, mode)
+    if workers > 1 and node_count > workers:
+        parts = [list(range(start, node_count, workers * PARTS_PER_WORKER))
+                 for start in range(workers * PARTS_PER_WORKER)]
+        with Pool(workers, initializer=share_adjacency,
+                  initargs=(graph.indptr, graph.indices, lengths)) as pool:
+            results = pool.map(shared_dijkstra_sums, [(part, component) for part in parts])
+    else:
+        parts = [list(range(node_count))]
+        results = [dijkstra_sums(graph.indptr.tolist(), graph.indices.tolist(), lengths.tolist(),
+                                 parts[0], component)]
+
+    distance_sum = np.zeros(node_count, dtype=np.float64)
+    reached_count = np.zeros(node_count, dtype=np.int64)
+    efficiency = np.zeros(node_count, dtype=np.float64)
+    eccentricity = np.full(node_count, -1.0, dtype=np.float64)
+    incoming_distance_sum = np.zeros(node_count, dtype=np.float64)
+    incoming_reached = np.zeros(node_count, dtype=np.int64)
+    for part, (part_sum, part_reached, part_efficiency, part_eccentricity,
+               part_incoming_sum, part_incoming_reached) in zip(parts, results):
+        distance_sum[part] = part_sum
+        reached_count[part] = part_reached
+        efficiency[part] = part_efficiency
+        eccentricity[part] = part_eccentricity
+        incoming_distance_sum += part_incoming_sum
+        incoming_reached += part_incoming_reached
+    return Sweep(distance_sum, reached_count, efficiency, eccentricity,
+                 incoming_distance_sum, incoming_reached)
+
+
+def average_shortest_path_length(graph: CompactGraph, result: Optional[Sweep] = None,
+                                 sources: Optional[np.ndarray] = None) -> float:
+    # Same definition as networkx 2.4 on a weakly connected component: the
+    # distances of the reachable pairs summed over all n(n - 1) ordered pairs
+    # of the component, so unreachable pairs lower the average of a directed
+    # graph. 'sources' is a node mask of that component.
+    if result is None:
+        result = sweep(graph)
+    if sources is None:
+        sources = np.ones(graph.node_count, dtype=bool)
+    count = int(sources.sum())
+    pairs = count * (count - 1)
+    return result.distance_sum[sources].sum().item() / pairs if pairs else 0.0
+
+
+def eccentricities(graph: CompactGraph, result: Optional[Sweep] = None) -> np.ndarray:
+    if result is None:
+        result = sweep(graph)
+    return result.eccentricity
+
+
+def diameter(graph: CompactGraph, result: Optional[Sweep] = None) -> int:
+    if graph.node_count == 0:
+        return 0
+    return eccentricities(graph, result).max().item()
+
+
+def global_efficiency(graph: CompactGraph, result: Optional[Sweep] = None) -> float:
+    node_count = graph.node_count
+    denominator = node_count * (node_count - 1)
+    if denominator == 0:
+        return 0.0
+    if result is None:
+        result = sweep(graph)
+    return float(result.efficiency.sum()) / denominator
+
+
+def closeness_centrality(graph: CompactGraph, result: Optional[Sweep] = None) -> np.ndarray:
+    # Same definition as networkx: incoming distances for directed graphs,
+    # scaled by the reachable fraction (Wasserman and Faust).
+    node_count = graph.node_count
+    closeness = np.zeros(node_count, dtype=np.float64)
+    if node_count < 2:
+        return closeness
+    if result is None:
+        result = sweep(graph)
+    total = result.incoming_distance_sum
+    reachable = result.incoming_reached
+    positive = total > 0
+    closeness[positive] = (reachable[positive] / total[positive]) * \
+        (reachable[positive] / (node_count - 1))
+    return closeness
+
+
+def top_closeness(graph: CompactGraph, k: int = 10, component_sizes: Optional[np.ndarray] = None) -> \
+        Tuple[np.ndarray, np.ndarray]:
+    # The k nodes of highest closeness (as in closeness_centrality, ties in
+    # node order) without a full BFS from every node. Candidates are taken in
+    # degree order; after every BFS level the closeness a node could still
+    # reach is bounded by placing the rest of its component as close as the
+    # level sizes allow, and the BFS stops once that bound falls below the
+    # current k-th score. 'component_sizes' are the weak component sizes per
+    # node, an upper bound on how many nodes can reach it.
+    node_count = graph.node_count
+    if node_count < 2:
+        return np.arange(min(k, node_count)), np.zeros(min(k, node_count))
+    if component_sizes is None:
+        labels = components.connected_components(graph)
+        component_sizes = np.bincount(labels)[labels]
+    indptr = graph.in_indptr
+    indices = graph.in_indices
+    degree = np.diff(indptr)
+    undirected = not graph.directed
+    scale = node_count - 1
+
+    scores = np.full(node_count, -1.0)
+    best: List[Tuple[float, int]] = []
+    threshold = 0.0
+    visited = np.zeros(node_count, dtype=bool)
+    for node in np.argsort(-degree, kind='stable').tolist():
+        reach_bound = int(component_sizes[node]) - 1
+        visited[node] = True
+        seen = [node]
+        frontier = np.array([node], dtype=np.int64)
+        reached = 0
+        total = 0
+        level = 0
+        pruned = False
+        while frontier.size:
+            level += 1
+            neighbours = expand(indptr, indices, frontier)
+            if len(best) == k:
+                # Nodes at the next level: at most the edges leaving the
+                # frontier, minus the edge each one was reached by.
+                next_bound = len(neighbours) - (len(frontier) if undirected and level > 1 else 0)
+                if closeness_bound(reached, total, level, next_bound, reach_bound, scale) < threshold:
+                    pruned = True
+                    break
+            neighbours = np.unique(neighbours[~visited[neighbours]])
+            visited[neighbours] = True
+            seen.append(neighbours)
+            reached += len(neighbours)
+            total += level * len(neighbours)
+            frontier = neighbours
+        visited[np.concatenate([np.atleast_1d(part) for part in seen])] = False
+        if pruned:
+            continue
+
+        score = (reached / total) * (reached / scale) if total > 0 else 0.0
+        scores[node] = score
+        if len(best) < k:
+            heappush(best, (score, -node))
+        elif (score, -node) > best[0]:
+            heapreplace(best, (score, -node))
+        if len(best) == k:
+            # Pruning is strict, so a node tying the k-th score still runs
+            # its full BFS and ties resolve in node order.
+            threshold = best[0][0] * (1 - BOUND_TOLERANCE)
+
+    top = sorted(((-score, -negative) for score, negative in best))
+    indices = np.array([node for _, node in top], dtype=np.int64)
+    return indices, scores[indices]
+
+
+def closeness_bound(reached: int, total: int, level: int, next_bound: int,
+                    reach_bound: int, scale: int) -> float:
+    # Largest closeness over the possible final reach r, where the remaining
+    # nodes fill level 'level' up to 'next_bound' and the rest sit one level
+    # further. On each linear piece of the distance sum, r^2 / sum is
+    # quasi-convex, so the maximum is at a piece end.
+    best = (reached / total) * (reached / scale) if total > 0 else 0.0
+    for reach in {reached, min(reached + next_bound, reach_bound), reach_bound}:
+        if reach <= reached:
+            continue
+        extra = reach - reached
+        near = min(extra, next_bound)
+        distance_sum = total + level * near + (level + 1) * (extra - near)
+        best = max(best, (reach / distance_sum) * (reach / scale))
+    return best
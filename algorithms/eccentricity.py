@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from algorithms.traversal import bfs_distances, UNREACHED
+from compact_graph import CompactGraph
+
+
+class Extremes(NamedTuple):
+    # Hops, or path lengths when taken from a weighted sweep.
+    diameter: Union[int, float]
+    radius: Union[int, float]
+    # Node indices, in increasing order.
+    center: np.ndarray
+    periphery: np.ndarray
+    # Number of eccentricities that were computed with a BFS.
+    sweeps: int
+
+
+def bounding_sweeps(graph: CompactGraph, component: Optional[np.ndarray] = None) -> Extremes:
+    # Eccentricity bounding (Takes and Kosters): every BFS from a node v
+    # bounds the eccentricity of all other nodes w by
+    #   max(d(w, v), e(v) - d(v, w)) <= e(w) <= d(w, v) + e(v),
+    # and a node stops being a BFS candidate once its eccentricity is known
+    # or it can be neither in the center nor in the periphery. Sources
+    # alternate between the largest upper and the smallest lower bound,
+    # which on sparse graphs settles the extremes after a handful of sweeps.
+    # Directed graphs must be strongly connected, eccentricities follow the
+    # out-edges. With a 'component' mask only that (strongly) connected
+    # component is swept, in place: no shortest path between two of its
+    # nodes leaves it.
+    nodes = np.arange(graph.node_count) if component is None else np.flatnonzero(component)
+    node_count = len(nodes)
+    if node_count == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return Extremes(0, 0, empty, empty, 0)
+
+    degree = graph.degree()[nodes]
+    lower = np.zeros(node_count, dtype=np.int64)
+    upper = np.full(node_count, np.iinfo(np.int64).max, dtype=np.int64)
+    candidates = np.ones(node_count, dtype=bool)
+    known = np.zeros(node_count, dtype=bool)
+    diameter_lower = 0
+    radius_upper = np.iinfo(np.int64).max
+    sweeps = 0
+    pick_upper = True
+
+    while candidates.any():
+        pool = np.flatnonzero(candidates)
+        if pick_upper:
+            # Largest upper bound, ties broken towards high degree.
+            order = np.lexsort((-degree[pool], -upper[pool]))
+        else:
+            order = np.lexsort((-degree[pool], lower[pool]))
+        source = int(pool[order[0]])
+        pick_upper = not pick_upper
+
+        forward = bfs_distances(graph.indptr, graph.indices, int(nodes[source]))[nodes].astype(np.int64)
+        if graph.directed:
+            backward = bfs_distances(graph.in_indptr, graph.in_indices, int(nodes[source]))[nodes].astype(np.int64)
+        else:
+            backward = forward
+        if (forward == UNREACHED).any() or (backward == UNREACHED).any():
+            raise ValueError("Graph is not (strongly) connected, eccentricities are infinite.")
+        sweeps += 1
+
+        eccentricity = int(forward.max())
+        lower = np.maximum(lower, np.maximum(backward, eccentricity - forward))
+        upper = np.minimum(upper, backward + eccentricity)
+        lower[source] = upper[source] = eccentricity
+
+        known |= lower == upper
+        diameter_lower = max(diameter_lower, int(lower.max()))
+        radius_upper = min(radius_upper, int(upper.min()))
+        # A node that can be neither peripheral nor central does not need its
+        # exact eccentricity.
+        undecided = (upper >= diameter_lower) | (lower <= radius_upper)
+        candidates &= ~known & undecided
+
+    eccentricities = np.where(known, lower, -1)
+    diameter = int(eccentricities.max())
+    radius = int(lower[known].min())
+    return Extremes(
+        diameter,
+        radius,
+        nodes[known & (lower == radius)],
+        nodes[known & (lower == diameter)],
+        sweeps,
+    )
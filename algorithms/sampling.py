@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+from functools import partial
+from statistics import NormalDist
+from time import perf_counter
+from typing import Callable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from algorithms.traversal import bfs_distances
+from compact_graph import CompactGraph
+
+DEFAULT_RELATIVE_ERROR = 0.01
+DEFAULT_CONFIDENCE = 0.95
+MIN_SOURCES = 32
+BATCH_SIZE = 16
+
+
+class Estimate(NamedTuple):
+    value: float
+    low: float
+    high: float
+    confidence: float
+    sources: int
+    population: int
+
+    @property
+    def exact(self) -> bool:
+        return self.sources == self.population
+
+    @property
+    def relative_error(self) -> float:
+        if self.value == 0:
+            return 0.0 if self.high == self.low else float('inf')
+        return (self.high - self.low) / 2 / abs(self.value)
+
+
+def ratio_interval(numerators: np.ndarray, denominators: np.ndarray, population: int,
+                   confidence: float) -> Tuple[float, float]:
+    # Ratio estimator sum(x) / sum(y) over a simple random sample of sources,
+    # with the delta method variance and the finite population correction, so
+    # the interval closes once every source is sampled.
+    count = len(numerators)
+    ratio = float(numerators.sum() / denominators.sum()) if denominators.sum() else 0.0
+    if count < 2 or denominators.sum() == 0:
+        return ratio, float('inf')
+    residuals = numerators - ratio * denominators
+    variance = residuals.var(ddof=1) / (count * denominators.mean() ** 2)
+    variance *= 1 - count / population
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    return ratio, z * float(np.sqrt(max(variance, 0.0)))
+
+
+def sampled_ratio(graph: CompactGraph, population: np.ndarray,
+                  statistic: Callable[[np.ndarray], Tuple[float, float]],
+                  relative_error: float = DEFAULT_RELATIVE_ERROR,
+                  time_budget: Optional[float] = None,
+                  confidence: float = DEFAULT_CONFIDENCE,
+                  seed: Optional[int] = None) -> Estimate:
+    # BFS from sources drawn without replacement from 'population' until the
+    # interval is within 'relative_error' of the estimate, the time budget
+    # (in seconds) runs out or every source has been used.
+    start = perf_counter()
+    order = np.random.default_rng(seed).permutation(population)
+    numerators = np.zeros(len(order), dtype=np.float64)
+    denominators = np.zeros(len(order), dtype=np.float64)
+    ratio, half_width = 0.0, float('inf')
+    used = 0
+    while used < len(order):
+        end = min(used + BATCH_SIZE, len(order))
+        for position in range(used, end):
+            distances = bfs_distances(graph.indptr, graph.indices, int(order[position]))
+            numerators[position], denominators[position] = statistic(distances)
+        used = end
+        if used < MIN_SOURCES and used < len(order):
+            continue
+        ratio, half_width = ratio_interval(numerators[:used], denominators[:used],
+                                           len(order), confidence)
+        if half_width <= relative_error * abs(ratio):
+            break
+        if time_budget is not None and perf_counter() - start >= time_budget:
+            break
+    if used == len(order):
+        half_width = 0.0
+    return Estimate(ratio, ratio - half_width, ratio + half_width, confidence, used, len(order))
+
+
+def path_length_statistic(distances: np.ndarray, targets: int) -> Tuple[float, float]:
+    # Over all 'targets' of the component, reachable or not.
+    lengths = distances[distances > 0]
+    return float(lengths.sum(dtype=np.int64)), float(targets)
+
+
+def efficiency_statistic(distances: np.ndarray) -> Tuple[float, float]:
+    lengths = distances[distances > 0]
+    return float(np.reciprocal(lengths, dtype=np.float64).sum()), 1.0
+
+
+def average_shortest_path_length(graph: CompactGraph, sources: Optional[np.ndarray] = None,
+                                 relative_error: float = DEFAULT_RELATIVE_ERROR,
+                                 time_budget: Optional[float] = None,
+                                 confidence: float = DEFAULT_CONFIDENCE,
+                                 seed: Optional[int] = None) -> Estimate:
+    # Same definition as distances.average_shortest_path_length, 'sources'
+    # is a node mask of the component to average over.
+    population = np.arange(graph.node_count) if sources is None else np.flatnonzero(sources)
+    return sampled_ratio(graph, population, partial(path_length_statistic, targets=len(population) - 1),
+                         relative_error, time_budget, confidence, seed)
+
+
+def global_efficiency(graph: CompactGraph,
+                      relative_error: float = DEFAULT_RELATIVE_ERROR,
+                      time_budget: Optional[float] = None,
+                      confidence: float = DEFAULT_CONFIDENCE,
+                      seed: Optional[int] = None) -> Estimate:
+    node_count = graph.node_count
+    if node_count < 2:
+        return Estimate(0.0, 0.0, 0.0, confidence, node_count, node_count)
+    estimate = sampled_ratio(graph, np.arange(node_count), efficiency_statistic,
+                             relative_error, time_budget, confidence, seed)
+    # Mean efficiency sum per source, divided by the n - 1 possible targets.
+    scale = 1 / (node_count - 1)
+    return estimate._replace(value=estimate.value * scale, low=estimate.low * scale,
+                             high=estimate.high * scale)
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+
+UNREACHED = -1
+WORD_BITS = 64
+# Bitset memory of one multi_source_bfs batch, bounds its number of words.
+BATCH_BYTES = 1 << 26
+MAX_BATCH_WORDS = 16
+
+
+def expand(indptr: np.ndarray, indices: np.ndarray, frontier: np.ndarray) -> np.ndarray:
+    # Concatenated neighbour lists of every frontier node, gathered with a
+    # single fancy-indexing call instead of one slice per node.
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=indices.dtype)
+    shifts = np.repeat(starts - np.cumsum(counts) + counts, counts)
+    return indices[shifts + np.arange(total)]
+
+
+def bfs_distances(indptr: np.ndarray, indices: np.ndarray, source: int) -> np.ndarray:
+    distances = np.full(len(indptr) - 1, UNREACHED, dtype=np.int32)
+    distances[source] = 0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size:
+        level += 1
+        neighbours = expand(indptr, indices, frontier)
+        neighbours = np.unique(neighbours[distances[neighbours] == UNREACHED])
+        distances[neighbours] = level
+        frontier = neighbours
+    return distances
+
+
+def bfs_path_counts(indptr: np.ndarray, indices: np.ndarray, source: int,
+                    target: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    # Distances and numbers of shortest paths from 'source'; with a target
+    # the search stops once the target's level is complete. Path counts are
+    # floats, they overflow integers on grid-like graphs.
+    distances = np.full(len(indptr) - 1, UNREACHED, dtype=np.int32)
+    paths = np.zeros(len(indptr) - 1, dtype=np.float64)
+    distances[source] = 0
+    paths[source] = 1.0
+    frontier = np.array([source], dtype=np.int64)
+    level = 0
+    while frontier.size and (target is None or distances[target] == UNREACHED):
+        level += 1
+        counts = indptr[frontier + 1] - indptr[frontier]
+        parents = np.repeat(frontier, counts)
+        neighbours = expand(indptr, indices, frontier)
+        fresh = (distances[neighbours] == UNREACHED) | (distances[neighbours] == level)
+        distances[neighbours[fresh]] = level
+        np.add.at(paths, neighbours[fresh], paths[parents[fresh]])
+        frontier = np.unique(neighbours[fresh])
+    return distances, paths
+
+
+def multi_source_bfs(indptr: np.ndarray, indices: np.ndarray, sources: np.ndarray) -> \
+        Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    # BFS from many sources at once over per-node bitsets: bit i of word j
+    # stands for sources[j * WORD_BITS + i]. Every level yields the nodes
+    # reached for the first time by at least one source and, per node, the
+    # words of those sources. Only the frontier is touched, so long thin
+    # graphs do not pay for the whole adjacency on every level.
+    word_count = -(-len(sources) // WORD_BITS)
+    positions = np.arange(len(sources))
+    seen = np.zeros((len(indptr) - 1, word_count), dtype=np.uint64)
+    seen[sources, positions // WORD_BITS] = np.left_shift(np.uint64(1), (positions % WORD_BITS).astype(np.uint64))
+    nodes = np.asarray(sources, dtype=np.int64)
+    words = seen[nodes]
+    level = 0
+    while nodes.size:
+        level += 1
+        counts = indptr[nodes + 1] - indptr[nodes]
+        neighbours = expand(indptr, indices, nodes)
+        if not neighbours.size:
+            break
+        # Words of the same neighbour are OR-ed as one sorted segment.
+        order = np.argsort(neighbours, kind='stable')
+        neighbours = neighbours[order]
+        starts = np.flatnonzero(np.concatenate(([True], neighbours[1:] != neighbours[:-1])))
+        targets = neighbours[starts]
+        reached = np.bitwise_or.reduceat(np.repeat(words, counts, axis=0)[order], starts, axis=0)
+        reached &= ~seen[targets]
+        fresh = reached.any(axis=1)
+        nodes, words = targets[fresh].astype(np.int64), reached[fresh]
+        seen[nodes] |= words
+        if nodes.size:
+            yield level, nodes, words
+
+
+BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1).astype(np.uint8)
+
+
+def word_bits(words: np.ndarray, width: int) -> np.ndarray:
+    # One row of bits per row of words, column i true when source i is set.
+    rows = words.reshape(len(words), -1).astype('<u8').view(np.uint8)
+    return np.unpackbits(rows, axis=1, bitorder='little')[:, :width].view(bool)
+
+
+def popcount(words: np.ndarray) -> np.ndarray:
+    # Set bits per row of words; numpy 2 counts them natively.
+    words = words.reshape(len(words), -1)
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int32)
+    rows = words.astype('<u8').view(np.uint8)
+    return BYTE_POPCOUNT[rows].sum(axis=1, dtype=np.int32)
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import struct
+from pathlib import Path
+from typing import Optional, Tuple
+
+import numpy as np
+
+from readers.tokenizer import index_dtype
+
+ALIGNMENT = 64
+
+
+def build_csr(sources: np.ndarray, targets: np.ndarray,
+              weights: Optional[np.ndarray], node_count: int,
+              directed: bool) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+    # Undirected edges are stored in both directions. Repeated edges are
+    # collapsed keeping the last weight, which is what networkx does when the
+    # same edge is added twice.
+    if not directed:
+        loops = sources == targets
+        sources, targets = \
+            np.concatenate((sources, targets[~loops])), \
+            np.concatenate((targets, sources[~loops]))
+        if weights is not None:
+            weights = np.concatenate((weights, weights[~loops]))
+
+    order = np.lexsort((targets, sources))
+    sources = sources[order]
+    targets = targets[order]
+    if weights is not None:
+        weights = weights[order]
+
+    if len(sources) > 1:
+        last = np.ones(len(sources), dtype=bool)
+        last[:-1] = (sources[1:] != sources[:-1]) | (targets[1:] != targets[:-1])
+        if not last.all():
+            sources = sources[last]
+            targets = targets[last]
+            if weights is not None:
+                weights = weights[last]
+
+    offsets = np.zeros(node_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=node_count), out=offsets[1:])
+    indices = targets.astype(index_dtype(node_count), copy=False)
+    if weights is not None:
+        weights = weights.astype(np.float64, copy=False)
+    return offsets, indices, weights
+
+
+class BinaryGraph:
+    MAGIC = b'UPZCSR\x00\x00'
+    VERSION = 1
+    FLAG_DIRECTED = 1
+    FLAG_WEIGHTED = 2
+    HEADER = struct.Struct('<8sIIQQQI')
+
+    def __init__(self, offsets: np.ndarray, indices: np.ndarray,
+                 weights: Optional[np.ndarray], labels: np.ndarray,
+                 directed: bool, path: Path = None):
+        self._offsets = offsets
+        self._indices = indices
+        self._weights = weights
+        self._labels = labels
+        self._directed = directed
+        self._path = path
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._offsets
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    @property
+    def weights(self) -> Optional[np.ndarray]:
+        return self._weights
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self._labels
+
+    @property
+    def directed(self) -> bool:
+        return self._directed
+
+    @property
+    def weighted(self) -> bool:
+        return self._weights is not None
+
+    @property
+    def path(self) -> Optional[Path]:
+        return self._path
+
+    @property
+    def node_count(self) -> int:
+        return len(self._offsets) - 1
+
+    def __reduce__(self):
+        # Worker processes re-map the file instead of receiving a pickled copy
+        # of every array.
+        if self._path is not None:
+            return BinaryGraph.load, (self._path,)
+        return BinaryGraph, (self._offsets, self._indices, self._weights,
+                             self._labels, self._directed)
+
+    def dump(self, path: Path):
+        flags = (self.FLAG_DIRECTED if self.directed else 0) | \
+                (self.FLAG_WEIGHTED if self.weighted else 0)
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, flags,
+                                  self.node_count, len(self.indices),
+                                  self.labels.dtype.itemsize,
+                                  self.indices.dtype.itemsize)
+
+        sections = [np.ascontiguousarray(self.offsets, dtype=np.int64),
+                    np.ascontiguousarray(self.indices)]
+        if self.weighted:
+            sections.append(np.ascontiguousarray(self.weights, dtype=np.float64))
+        sections.append(np.ascontiguousarray(self.labels))
+
+        # Written next to the target and renamed, so readers that map the file
+        # never observe a partially written graph.
+        temporary = path.with_name(f"{path.name}.tmp")
+        with temporary.open('wb') as file:
+            file.write(header)
+            for section in sections:
+                file.write(b'\x00' * (-file.tell() % ALIGNMENT))
+                file.write(section.tobytes())
+        temporary.replace(path)
+
+    @staticmethod
+    def load(path: Path) -> BinaryGraph:
+        path = Path(path)
+        with path.open('rb') as file:
+            magic, version, flags, node_count, entry_count, label_size, index_size = \
+                BinaryGraph.HEADER.unpack(file.read(BinaryGraph.HEADER.size))
+        if magic != BinaryGraph.MAGIC:
+            raise ValueError(f"'{path}' is not a binary graph file.")
+        if version != BinaryGraph.VERSION:
+            raise ValueError(f"Unsupported binary graph version {version}.")
+
+        position = BinaryGraph.HEADER.size
+
+        def section(dtype, count: int) -> np.ndarray:
+            nonlocal position
+            position += -position % ALIGNMENT
+            if count == 0:
+                array = np.empty(0, dtype=dtype)
+            else:
+                array = np.memmap(path, dtype=dtype, mode='r',
+                                  offset=position, shape=(count,))
+            position += count * np.dtype(dtype).itemsize
+            return array
+
+        offsets = section(np.int64, node_count + 1)
+        indices = section(np.dtype(f'<i{index_size}'), entry_count)
+        weights = section(np.float64, entry_count) \
+            if flags & BinaryGraph.FLAG_WEIGHTED else None
+        labels = section(np.dtype(f'S{label_size}'), node_count)
+        return BinaryGraph(offsets, indices, weights, labels,
+                           bool(flags & BinaryGraph.FLAG_DIRECTED), path)
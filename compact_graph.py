@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+from networkx import Graph, DiGraph, is_directed, is_weighted
+
+from binary_graph import BinaryGraph, build_csr
+from readers.tokenizer import index_dtype
+
+
+class CompactGraph:
+    __slots__ = ('_directed', '_labels', '_indptr', '_indices', '_weights',
+                 '_in_indptr', '_in_indices', '_in_weights', 'name')
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray,
+                 weights: Optional[np.ndarray] = None,
+                 labels: Optional[np.ndarray] = None, directed: bool = False):
+        self._directed = directed
+        self._indptr = indptr
+        self._indices = indices
+        self._weights = weights
+        self._labels = labels
+        self._in_indptr = None
+        self._in_indices = None
+        self._in_weights = None
+        self.name = ''
+
+    @property
+    def directed(self) -> bool:
+        return self._directed
+
+    @property
+    def weighted(self) -> bool:
+        return self._weights is not None
+
+    @property
+    def node_count(self) -> int:
+        return len(self._indptr) - 1
+
+    @property
+    def edge_count(self) -> int:
+        if self.directed:
+            return len(self._indices)
+        return (len(self._indices) + self.self_loop_count) // 2
+
+    @property
+    def self_loop_count(self) -> int:
+        sources = np.repeat(np.arange(self.node_count, dtype=self._indices.dtype),
+                            np.diff(self._indptr))
+        return int(np.count_nonzero(sources == self._indices))
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self._indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    @property
+    def weights(self) -> Optional[np.ndarray]:
+        return self._weights
+
+    @property
+    def in_indptr(self) -> np.ndarray:
+        if not self.directed:
+            return self._indptr
+        if self._in_indptr is None:
+            self._transpose()
+        return self._in_indptr
+
+    @property
+    def in_indices(self) -> np.ndarray:
+        if not self.directed:
+            return self._indices
+        if self._in_indices is None:
+            self._transpose()
+        return self._in_indices
+
+    @property
+    def in_weights(self) -> Optional[np.ndarray]:
+        if not self.directed:
+            return self._weights
+        if self._in_indptr is None:
+            self._transpose()
+        return self._in_weights
+
+    @property
+    def labels(self) -> np.ndarray:
+        if self._labels is None:
+            self._labels = np.arange(self.node_count)
+        return self._labels
+
+    def _transpose(self):
+        sources = np.repeat(np.arange(self.node_count, dtype=self._indices.dtype),
+                            np.diff(self._indptr))
+        order = np.argsort(self._indices, kind='stable')
+        self._in_indices = sources[order]
+        self._in_indptr = np.zeros(self.node_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self._indices, minlength=self.node_count),
+                  out=self._in_indptr[1:])
+        if self._weights is not None:
+            self._in_weights = np.asarray(self._weights)[order]
+
+    def label(self, node: int) -> Any:
+        return self.labels_of(np.array([node]))[0]
+
+    def labels_of(self, nodes: np.ndarray) -> List[Any]:
+        labels = np.asarray(self.labels)[np.asarray(nodes, dtype=np.int64)]
+        if labels.dtype.kind == 'S':
+            labels = np.char.decode(labels)
+        return labels.tolist()
+
+    def neighbors(self, node: int) -> np.ndarray:
+        return self._indices[self._indptr[node]:self._indptr[node + 1]]
+
+    def out_degree(self) -> np.ndarray:
+        return np.diff(self._indptr)
+
+    def in_degree(self) -> np.ndarray:
+        if not self.directed:
+            return self.out_degree()
+        return np.bincount(self._indices, minlength=self.node_count)
+
+    def degree(self) -> np.ndarray:
+        if self.directed:
+            return self.out_degree() + self.in_degree()
+        # Self-loops count twice towards the degree, same as in networkx.
+        degree = self.out_degree()
+        sources = np.repeat(np.arange(self.node_count, dtype=self._indices.dtype),
+                            degree)
+        loops = sources[sources == self._indices]
+        return degree + np.bincount(loops, minlength=self.node_count)
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        # Every edge once; undirected edges as (smaller, larger) index pairs.
+        sources = np.repeat(np.arange(self.node_count, dtype=self._indices.dtype),
+                            np.diff(self._indptr))
+        targets = np.asarray(self._indices)
+        weights = None if self._weights is None else np.asarray(self._weights)
+        if not self.directed:
+            upper = sources <= targets
+            sources = sources[upper]
+            targets = targets[upper]
+            if weights is not None:
+                weights = weights[upper]
+        return sources, targets, weights
+
+    def subgraph(self, nodes: np.ndarray) -> CompactGraph:
+        nodes = np.sort(np.asarray(nodes))
+        mapping = np.full(self.node_count, -1, dtype=np.int64)
+        mapping[nodes] = np.arange(len(nodes))
+        sources, targets, weights = self.edges()
+        keep = (mapping[sources] >= 0) & (mapping[targets] >= 0)
+        weights = None if weights is None else weights[keep]
+        subgraph = CompactGraph.from_edges(
+            mapping[sources[keep]], mapping[targets[keep]], weights,
+            len(nodes), self.directed, np.asarray(self.labels)[nodes]
+        )
+        subgraph.name = self.name
+        return subgraph
+
+    @staticmethod
+    def from_edges(sources: np.ndarray, targets: np.ndarray,
+                   weights: Optional[np.ndarray], node_count: int,
+                   directed: bool, labels: Optional[np.ndarray] = None) -> CompactGraph:
+        dtype = index_dtype(node_count)
+        indptr, indices, weights = build_csr(
+            np.asarray(sources, dtype=dtype), np.asarray(targets, dtype=dtype),
+            weights, node_count, directed
+        )
+        return CompactGraph(indptr, indices, weights, labels, directed)
+
+    @staticmethod
+    def from_binary(binary: BinaryGraph) -> CompactGraph:
+        return CompactGraph(binary.offsets, binary.indices, binary.weights,
+                            binary.labels, binary.directed)
+
+    @staticmethod
+    def from_networkx(graph: Union[Graph, DiGraph]) -> CompactGraph:
+        nodes = list(graph.nodes)
+        node_index = {node: index for index, node in enumerate(nodes)}
+        edge_count = graph.number_of_edges()
+        dtype = index_dtype(len(nodes))
+        sources = np.fromiter((node_index[source] for source, _ in graph.edges),
+                              dtype=dtype, count=edge_count)
+        targets = np.fromiter((node_index[target] for _, target in graph.edges),
+                              dtype=dtype, count=edge_count)
+        weights = None
+        if is_weighted(graph):
+            weights = np.fromiter((weight for _, _, weight in graph.edges.data('weight')),
+                                  dtype=np.float64, count=edge_count)
+        labels = np.empty(len(nodes), dtype=object)
+        labels[:] = nodes
+        compact = CompactGraph.from_edges(sources, targets, weights, len(nodes),
+                                          is_directed(graph), labels)
+        compact.name = graph.name
+        return compact
+
+    def to_binary(self) -> BinaryGraph:
+        labels = np.array([str(label).encode()
+                           for label in self.labels_of(np.arange(self.node_count))])
+        if len(labels) == 0:
+            labels = np.empty(0, dtype='S1')
+        return BinaryGraph(self._indptr, self._indices, self._weights,
+                           labels, self.directed)
+
+    def to_networkx(self) -> Union[Graph, DiGraph]:
+        graph = DiGraph() if self.directed else Graph()
+        graph.name = self.name
+        labels = self.labels_of(np.arange(self.node_count))
+        graph.add_nodes_from(labels)
+        sources, targets, weights = self.edges()
+        sources = (labels[source] for source in sources.tolist())
+        targets = (labels[target] for target in targets.tolist())
+        if weights is None:
+            graph.add_edges_from(zip(sources, targets))
+        else:
+            graph.add_weighted_edges_from(zip(sources, targets, weights.tolist()))
+        return graph
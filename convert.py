@@ -0,0 +1,137 @@
+import json
+from argparse import ArgumentParser
+from datetime import datetime
+from hashlib import sha256
+from multiprocessing import Pool
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, Optional
+
+from paths import raw, processed, processed_manifest, suffix_processed, suffix_csr
+from readers.compression import dataset_suffix, dataset_stem
+from utils import load_raw, load_raw_compact, dump_processed
+
+RAW_SUFFIXES = ('.mtx', '.edges')
+HASH_BLOCK_SIZE = 1 << 20
+
+STATUS_CONVERTED = 'converted'
+STATUS_SKIPPED = 'skipped'
+
+
+def content_hash(path: Path) -> str:
+    digest = sha256()
+    with path.open('rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(path: Path, previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    # Hashing multi-GB files is what a warm run must avoid, so the recorded
+    # hash is trusted while size and modification time are unchanged.
+    stat = path.stat()
+    if previous is not None and \
+            previous['size'] == stat.st_size and \
+            previous['mtime_ns'] == stat.st_mtime_ns:
+        return dict(previous)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash(path),
+    }
+
+
+def load_manifest(path: Path) -> Dict[str, Dict[str, Any]]:
+    if not path.exists():
+        return {}
+    with path.open('r') as file:
+        return json.load(file)
+
+
+def dump_manifest(manifest: Dict[str, Dict[str, Any]], path: Path):
+    temporary = path.with_name(f"{path.name}.tmp")
+    with temporary.open('w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    temporary.replace(path)
+
+
+def is_dataset(path: Path) -> bool:
+    try:
+        return path.is_file() and dataset_suffix(path) in RAW_SUFFIXES
+    except (ValueError, OSError):
+        return False
+
+
+def is_current(entry: Optional[Dict[str, Any]], raw_fingerprint: Dict[str, Any],
+               processed_path: Path) -> bool:
+    return entry is not None and \
+        processed_path.exists() and \
+        entry['raw']['sha256'] == raw_fingerprint['sha256']
+
+
+def convert(raw_path: Path, processed_path: Path) -> float:
+    start = perf_counter()
+    print(f"{datetime.now()} - Dataset {raw_path.name}: STARTED - conversion")
+    if processed_path.suffix == suffix_csr:
+        load_raw_compact(raw_path).to_binary().dump(processed_path)
+    else:
+        dump_processed(load_raw(raw_path), processed_path)
+    print(f"{datetime.now()} - Dataset {raw_path.name}: FINISHED - conversion")
+    return perf_counter() - start
+
+
+def convert_all(raw_dir: Path = raw, processed_dir: Path = processed,
+                suffix: str = suffix_processed, manifest_path: Path = None,
+                workers: int = None, force=False) -> Dict[str, str]:
+    # Manifest entries are keyed by processed file name, so every processed
+    # format is tracked on its own.
+    if manifest_path is None:
+        manifest_path = processed_dir / processed_manifest.name
+    manifest = load_manifest(manifest_path)
+    checked = datetime.now().isoformat()
+
+    statuses = {}
+    stale = []
+    for raw_path in sorted(raw_dir.iterdir()):
+        if not is_dataset(raw_path):
+            continue
+        processed_path = processed_dir / f"{dataset_stem(raw_path)}{suffix}"
+        entry = manifest.get(processed_path.name)
+        raw_fingerprint = fingerprint(raw_path, entry['raw'] if entry else None)
+        if not force and is_current(entry, raw_fingerprint, processed_path):
+            entry.update(raw=raw_fingerprint, status=STATUS_SKIPPED, checked=checked)
+            statuses[processed_path.name] = STATUS_SKIPPED
+        else:
+            stale.append((raw_path, processed_path, raw_fingerprint))
+
+    if workers == 1 or len(stale) <= 1:
+        durations = [convert(raw_path, processed_path) for raw_path, processed_path, _ in stale]
+    else:
+        with Pool(workers) as pool:
+            durations = pool.starmap(convert, [(raw_path, processed_path)
+                                               for raw_path, processed_path, _ in stale])
+
+    for (raw_path, processed_path, raw_fingerprint), duration in zip(stale, durations):
+        manifest[processed_path.name] = {
+            'raw_name': raw_path.name,
+            'raw': raw_fingerprint,
+            'status': STATUS_CONVERTED,
+            'checked': checked,
+            'duration': duration,
+        }
+        statuses[processed_path.name] = STATUS_CONVERTED
+
+    dump_manifest(manifest, manifest_path)
+    return statuses
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Convert raw datasets into processed graphs.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='conversion processes, defaults to the CPU count')
+    parser.add_argument('--force', action='store_true',
+                        help='convert every dataset even if it is current')
+    arguments = parser.parse_args()
+
+    for name, status in convert_all(workers=arguments.workers, force=arguments.force).items():
+        print(f"{name}\t{status}")
@@ -1,23 +1,23 @@
-from collections import Counter
 from heapq import nlargest
 from operator import itemgetter
-from statistics import mean
-from typing import Union, Tuple, Any, Dict
+from typing import Union, Tuple, Any, Callable, Dict, List, Optional
 
+import numpy as np
 from networkx import Graph, DiGraph
-from networkx import get_edge_attributes, average_shortest_path_length, diameter, eccentricity
-from networkx import closeness_centrality, betweenness_centrality, degree_centrality
-from networkx import degree_assortativity_coefficient
-from networkx import global_efficiency
-from networkx import is_weighted, is_directed, is_connected, is_weakly_connected
-from networkx import \
-    number_connected_components, connected_components, \
-    number_strongly_connected_components, strongly_connected_components, weakly_connected_components
-from networkx import transitivity, average_clustering
-from networkx.algorithms.community import girvan_newman, modularity
+from networkx import get_edge_attributes
+from networkx import degree_centrality
+from networkx import is_weighted, is_directed
 
 from networkx import all_pairs_shortest_path_length
 
+from algorithms import centrality, clustering, communities, components, degrees, distances, sampling
+from algorithms.degrees import Degrees
+from algorithms.eccentricity import Extremes, bounding_sweeps
+from compact_graph import CompactGraph
+from graph_source import GraphSource
+from measure_cache import MeasureCache, graph_fingerprint
+from readers.statistics import EdgeStatistics
+
 
 def global_efficiency_directional(graph: Union[DiGraph, Graph]):
     # Identical to original, however without raising NetworkxNotImplementedError
@@ -43,13 +43,53 @@ class MeasureError(AttributeError):
 
 
 class GraphMeasures:
-    def __init__(self, graph: Graph):
+    def __init__(self, graph: Union[Graph, DiGraph, CompactGraph, GraphSource],
+                 relative_error: float = sampling.DEFAULT_RELATIVE_ERROR,
+                 confidence: float = sampling.DEFAULT_CONFIDENCE,
+                 time_budget: Optional[float] = None, seed: Optional[int] = 0,
+                 betweenness_epsilon: Optional[float] = None,
+                 betweenness_delta: float = centrality.DEFAULT_DELTA,
+                 weighted_betweenness=False, workers=1,
+                 community_algorithm: str = communities.LEIDEN,
+                 distance_weights: Optional[str] = None,
+                 cache: Optional[MeasureCache] = None):
+        if distance_weights is not None and distance_weights not in distances.WEIGHT_MODES:
+            raise ValueError(f"Invalid distance weights {distance_weights}, "
+                             f"expected None or any of {distances.WEIGHT_MODES}.")
+        if community_algorithm not in communities.ALGORITHMS:
+            raise ValueError(f"Invalid community algorithm {community_algorithm}, "
+                             f"expected any of {communities.ALGORITHMS}.")
+        # Accuracy, time budget (seconds) and seed of the sampled estimates.
+        self.relative_error = relative_error
+        self.confidence = confidence
+        self.time_budget = time_budget
+        self.seed = seed
+        self.betweenness_epsilon = betweenness_epsilon
+        self.betweenness_delta = betweenness_delta
+        # Exact betweenness over Dijkstra paths and its process count.
+        self.weighted_betweenness = weighted_betweenness
+        self.workers = workers
+        # Girvan-Newman for results comparable with published ones, it also
+        # runs its betweenness sweeps on 'workers' processes.
+        self.community_algorithm = community_algorithm
+        # Distance measures over edge weights ('distance' or 'strength')
+        # instead of hop counts, on weighted graphs; Dijkstra runs on
+        # 'workers' processes.
+        self.distance_weights = distance_weights
+        # Expensive measures are loaded from and stored to this cache.
+        self.cache = cache
         self._graph = graph
+        self._source = graph if isinstance(graph, GraphSource) else None
+        self._compact = graph if isinstance(graph, CompactGraph) else None
+        self._networkx = None
+        self._statistics = None
+        self._fingerprint = None
         self._directed = None
         self._weighted = None
         self._connected = None
         self._weakly_connected = None
         self._strongly_connected = None
+        self._component_index = None
 
         self._node_count = None
         self._edge_count = None
@@ -57,46 +97,213 @@ class GraphMeasures:
         self._avg_strength = None
         self._component_count = None
         self._largest_component_measures = None
+        self._sweep = None
         self._shortest_path_length = None
+        self._extremes = None
         self._diameter = None
         self._eccentricity = None
+        self._radius = None
+        self._center = None
+        self._periphery = None
         self._global_efficiency = None
+        self._shortest_path_length_estimate = None
+        self._global_efficiency_estimate = None
+        self._triangles = None
         self._global_clustering_coefficient = None
         self._avg_clustering_coefficient = None
+        self._avg_weighted_clustering_coefficient = None
+        self._degree_arrays = None
         self._degree_assortativity = None
+        self._directed_degree_assortativity = None
         self._degree_distribution = None
         self._top10_central_degree = None
         self._top10_central_betweenness = None
         self._top10_central_closeness = None
+        self._closeness_centrality = None
         self._avg_closeness_centrality = None
         self._avg_betweenness_centrality = None
+        self._betweenness_centrality = None
+        self._betweenness_samples = None
+        self._dendrogram = None
+        self._community_labels = None
         self._top10_communities = None
         self._modularity = None
         self._top10_community_measures = None
 
+    @staticmethod
+    def from_statistics(statistics: EdgeStatistics) -> 'GraphMeasures':
+        # Only the seeded measures are available, everything else needs a graph.
+        measures = GraphMeasures(None)
+        measures.seed_statistics(statistics)
+        return measures
+
+    def seed_statistics(self, statistics: EdgeStatistics):
+        self._statistics = statistics
+        self._directed = statistics.directed
+        self._weighted = statistics.weighted
+        self._node_count = statistics.node_count
+        self._edge_count = statistics.edge_count
+        self._avg_edge_count = statistics.avg_edge_count
+        if statistics.weighted:
+            self._avg_strength = statistics.avg_strength
+        self._degree_distribution = statistics.degree_distribution
+        if not statistics.directed:
+            # Directed graphs count strong components, which need the graph.
+            self._component_count = statistics.weak_component_count
+            self._connected = self._component_count <= 1
+
+    def seed_measures(self, values: Dict[str, Any]):
+        # Measures computed elsewhere, by the scheduler's workers.
+        for measure, value in values.items():
+            if not hasattr(self, f"_{measure}"):
+                raise ValueError(f"Invalid measure {measure}.")
+            setattr(self, f"_{measure}", value)
+
+    def _child(self, graph: CompactGraph) -> 'GraphMeasures':
+        # Measures of a part of this graph, with the same settings.
+        return GraphMeasures(
+            graph, self.relative_error, self.confidence, self.time_budget, self.seed,
+            self.betweenness_epsilon, self.betweenness_delta, self.weighted_betweenness, self.workers,
+            self.community_algorithm, self.distance_weights, self.cache
+        )
+
+    def _seed_from_source(self):
+        # Degree level measures of a lazy source come from its edge
+        # statistics, so the adjacency is only loaded for traversals.
+        if self._source is not None and self._statistics is None:
+            self.seed_statistics(self._source.statistics)
+
     @property
-    def graph(self) -> Union[Graph, DiGraph]:
+    def graph(self) -> Union[Graph, DiGraph, CompactGraph, GraphSource]:
+        if self._graph is None:
+            raise MeasureError('Measure is not available from edge statistics alone.')
         return self._graph
 
+    @property
+    def source(self) -> Optional[GraphSource]:
+        return self._source
+
+    @property
+    def is_compact(self) -> bool:
+        return isinstance(self._graph, (CompactGraph, GraphSource))
+
+    @property
+    def compact(self) -> CompactGraph:
+        if self._compact is None:
+            if self._source is not None:
+                self._compact = self._source.compact
+            else:
+                self._compact = CompactGraph.from_networkx(self.graph)
+
+        return self._compact
+
+    @property
+    def networkx_graph(self) -> Union[Graph, DiGraph]:
+        if self._networkx is None:
+            if self._source is not None:
+                self._networkx = self._source.networkx
+            elif self.is_compact:
+                self._networkx = self.compact.to_networkx()
+            else:
+                self._networkx = self.graph
+
+        return self._networkx
+
+    @property
+    def statistics(self) -> EdgeStatistics:
+        if self._statistics is None:
+            if self._source is not None:
+                self._statistics = self._source.statistics
+            else:
+                self._statistics = EdgeStatistics.from_compact(self.compact)
+
+        return self._statistics
+
+    @property
+    def fingerprint(self) -> str:
+        # Lazy sources are fingerprinted by file, without loading the graph.
+        if self._fingerprint is None:
+            if self._source is not None and self.cache is not None:
+                self._fingerprint = self.cache.file_fingerprint(self._source.path)
+            else:
+                self._fingerprint = graph_fingerprint(self.compact)
+
+        return self._fingerprint
+
+    def _cached(self, measure: str, compute: Callable[[], Any], **parameters) -> Any:
+        # 'parameters' are the settings the measure depends on, besides the graph.
+        if self.cache is None:
+            return compute()
+        return self.cache.get_or_compute(self.fingerprint, measure, parameters, compute)
+
+    @property
+    def _distance_mode(self) -> Optional[str]:
+        return self.distance_weights if self.weighted_distances else None
+
+    @property
+    def _sampling_parameters(self) -> Dict[str, Any]:
+        return {'relative_error': self.relative_error, 'confidence': self.confidence,
+                'time_budget': self.time_budget, 'seed': self.seed}
+
+    @property
+    def degrees(self) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+        if self.directed:
+            return self.statistics.in_degree, self.statistics.out_degree
+        return self.statistics.degree
+
+    @property
+    def edge_weights(self) -> np.ndarray:
+        if not self.weighted:
+            raise MeasureError('Unweighted graphs cannot have strength.')
+        return self.statistics.edge_weights
+
+    def _top10(self, values: np.ndarray) -> List[Tuple[Any, float]]:
+        # Stable order keeps ties in node order, same as heapq.nlargest.
+        top = np.argsort(-values, kind='stable')[:10]
+        return list(zip(self.compact.labels_of(top), values[top].tolist()))
+
+    @property
+    def component_index(self) -> components.ComponentIndex:
+        # Weak and strong components, shared by every measure that needs them.
+        if self._component_index is None:
+            self._component_index = components.ComponentIndex(self.compact)
+
+        return self._component_index
+
+    def _component_labels(self, strong: bool) -> np.ndarray:
+        return self.component_index.labels(strong)
+
+    def _largest_component_mask(self, strong: bool) -> np.ndarray:
+        return self.component_index.largest_mask(strong)
+
     @property
     def directed(self) -> bool:
+        self._seed_from_source()
         if self._directed is None:
-            self._directed = is_directed(self.graph)
+            if self.is_compact:
+                self._directed = self.compact.directed
+            else:
+                self._directed = is_directed(self.graph)
 
         return self._directed
 
     @property
     def weighted(self) -> bool:
+        self._seed_from_source()
         if self._weighted is None:
-            self._weighted = is_weighted(self.graph)
+            if self.is_compact:
+                self._weighted = self.compact.weighted
+            else:
+                self._weighted = is_weighted(self.graph)
 
         return self._weighted
 
     @property
     def connected(self) -> bool:
+        self._seed_from_source()
         if self._connected is None:
             if not self.directed:
-                self._connected = is_connected(self.graph)
+                self._connected = self.component_index.connected(strong=False)
             else:
                 raise MeasureError('Directed graphs cannot be plainly connected, '
                                    'use \'weakly_connected\' or \'strongly_connected\' instead.')
@@ -106,7 +313,7 @@ class GraphMeasures:
     def weakly_connected(self) -> bool:
         if self._weakly_connected is None:
             if self.directed:
-                self._weakly_connected = is_weakly_connected(self.graph)
+                self._weakly_connected = self.component_index.connected(strong=False)
             else:
                 raise MeasureError('Undirected graphs cannot be weakly connected, '
                                    'use \'connected\' instead.')
@@ -117,7 +324,7 @@ class GraphMeasures:
     def strongly_connected(self) -> bool:
         if self._strongly_connected is None:
             if self.directed:
-                self._strongly_connected = is_weakly_connected(self.graph)
+                self._strongly_connected = self.component_index.connected(strong=True)
             else:
                 raise MeasureError('Undirected graphs cannot be strongly connected, '
                                    'use \'connected\' instead.')
@@ -126,14 +333,22 @@ class GraphMeasures:
 
     @property
     def node_count(self) -> int:
+        self._seed_from_source()
         if self._node_count is None:
-            self._node_count = self.graph.number_of_nodes()
+            if self.is_compact:
+                self._node_count = self.compact.node_count
+            else:
+                self._node_count = self.graph.number_of_nodes()
         return self._node_count
 
     @property
     def edge_count(self) -> Union[int, Tuple[int, int]]:
+        self._seed_from_source()
         if self._edge_count is None:
-            if self.directed:
+            if self.is_compact:
+                edge_count = self.compact.edge_count
+                self._edge_count = (edge_count, edge_count) if self.directed else edge_count
+            elif self.directed:
                 self._edge_count = (len(self.graph.in_edges), len(self.graph.out_edges))
             else:
                 self._edge_count = self.graph.number_of_edges()
@@ -142,28 +357,18 @@ class GraphMeasures:
 
     @property
     def avg_edge_count(self) -> Union[float, Tuple[float, float]]:
+        self._seed_from_source()
         if self._avg_edge_count is None:
-            if self.directed:
-                self._avg_edge_count = (
-                    mean([degree[1] for degree in self.graph.in_degree()]),
-                    mean([degree[1] for degree in self.graph.out_degree()])
-                )
-            else:
-                self._avg_edge_count = mean([degree[1] for degree in self.graph.degree()])
+            self._avg_edge_count = self.statistics.avg_edge_count
 
         return self._avg_edge_count
 
     @property
     def avg_strength(self) -> Union[float, Tuple[float, float]]:
+        self._seed_from_source()
         if self._avg_strength is None:
             if self.weighted:
-                if self.directed:
-                    self._avg_strength = \
-                        (mean(edge_in[2]['weight'] for edge_in in self.graph.in_edges().data()),
-                         (mean(edge_out[2]['weight'] for edge_out in self.graph.out_edges().data()))),
-                else:
-                    self._avg_strength = mean(edge[2]['weight'] for edge in self.graph.edges().data())
-
+                self._avg_strength = self.statistics.avg_strength
             else:
                 raise MeasureError('Unweighted graphs cannot have strength.')
 
@@ -171,195 +376,368 @@ class GraphMeasures:
 
     @property
     def component_count(self) -> int:
+        self._seed_from_source()
         if self._component_count is None:
-            if self.directed:
-                self._component_count = number_strongly_connected_components(self.graph)
-            else:
-                self._component_count = number_connected_components(self.graph)
+            self._component_count = self.component_index.count(self.directed)
 
         return self._component_count
 
     @property
     def largest_component_measures(self) -> 'GraphMeasures':
+        # The only measure that copies the component out of the graph, the
+        # others work on it in place through its node mask.
         if self._largest_component_measures is None:
-            if self.directed:
-                if self.strongly_connected:
-                    return self
+            if self.component_index.connected(self.directed):
+                return self
+            self._largest_component_measures = self._child(
+                self.compact.subgraph(np.flatnonzero(self._largest_component_mask(self.directed)))
+            )
 
-                largest_component: DiGraph = self.graph.subgraph(
-                    max(strongly_connected_components(self.graph), key=len)
-                ).copy()
-            else:
-                if self.connected:
-                    return self
-                largest_component: Graph = self.graph.subgraph(
-                    max(connected_components(self.graph), key=len)
-                ).copy()
+        return self._largest_component_measures
 
-            self._largest_component_measures = GraphMeasures(largest_component)
+    @property
+    def weighted_distances(self) -> bool:
+        return self.distance_weights is not None and self.weighted
 
-        return self._largest_component_measures
+    @property
+    def sweep(self) -> distances.Sweep:
+        # Every distance based measure is filled by this one all-pairs sweep,
+        # whichever of them is asked for first.
+        if self._sweep is None:
+            if self.weighted_distances:
+                self._sweep = self._cached('sweep', lambda: distances.weighted_sweep(
+                    self.compact, self._largest_component_mask(self.directed), self.distance_weights, self.workers
+                ), distance_weights=self._distance_mode)
+            else:
+                self._sweep = self._cached('sweep', lambda: distances.sweep(
+                    self.compact, self._largest_component_mask(self.directed)
+                ), distance_weights=None)
+
+        return self._sweep
 
     @property
     def shortest_path_length(self):
         if self._shortest_path_length is None:
-            if self.directed:
-                largest_component: DiGraph = self.graph.subgraph(
-                    max(weakly_connected_components(self.graph), key=len)
-                ).copy()
-            else:
-                largest_component: Graph = self.graph.subgraph(
-                    max(connected_components(self.graph), key=len)
-                ).copy()
-            self._shortest_path_length = average_shortest_path_length(largest_component)
+            self._shortest_path_length = distances.average_shortest_path_length(
+                self.compact, self.sweep, self._largest_component_mask(strong=False)
+            )
 
         return self._shortest_path_length
 
     @property
-    def diameter(self) -> int:
+    def extremes(self) -> Extremes:
+        # Diameter, radius, center and periphery of the largest (strongly)
+        # connected component, settled together by the same bounding sweeps.
+        if self._extremes is None and (self._sweep is not None or self.weighted_distances):
+            # Eccentricities are already known for the whole component, and
+            # the bounding sweeps only count hops.
+            component = self._largest_component_mask(self.directed)
+            eccentricities = self.sweep.eccentricity
+            values = eccentricities[component]
+            diameter = values.max().item() if values.size else 0
+            radius = values.min().item() if values.size else 0
+            self._extremes = Extremes(
+                diameter,
+                radius,
+                np.flatnonzero(component & (eccentricities == radius)),
+                np.flatnonzero(component & (eccentricities == diameter)),
+                0
+            )
+        if self._extremes is None:
+            self._extremes = self._cached('extremes', lambda: bounding_sweeps(
+                self.compact, self._largest_component_mask(self.directed)
+            ), distance_weights=None)
+
+        return self._extremes
+
+    @property
+    def diameter(self) -> Union[int, float]:
         if self._diameter is None:
-            if self.directed:
-                largest_component: DiGraph = self.graph.subgraph(
-                    max(strongly_connected_components(self.graph), key=len)
-                ).copy()
-            else:
-                largest_component: Graph = self.graph.subgraph(
-                    max(connected_components(self.graph), key=len)
-                ).copy()
-            self._diameter = diameter(largest_component)
+            self._diameter = self.extremes.diameter
 
         return self._diameter
 
     @property
     def eccentricity(self) -> Union[int, float]:
+        # Largest eccentricity, which is the diameter.
         if self._eccentricity is None:
-            if self.directed:
-                largest_component: DiGraph = self.graph.subgraph(
-                    max(strongly_connected_components(self.graph), key=len)
-                ).copy()
-            else:
-                largest_component: Graph = self.graph.subgraph(
-                    max(connected_components(self.graph), key=len)
-                ).copy()
-
-            self._eccentricity = max(eccentricity(largest_component).values())
+            self._eccentricity = self.extremes.diameter
 
         return self._eccentricity
 
+    @property
+    def radius(self) -> Union[int, float]:
+        if self._radius is None:
+            self._radius = self.extremes.radius
+
+        return self._radius
+
+    @property
+    def center(self) -> List[Any]:
+        if self._center is None:
+            self._center = self.compact.labels_of(self.extremes.center)
+
+        return self._center
+
+    @property
+    def periphery(self) -> List[Any]:
+        if self._periphery is None:
+            self._periphery = self.compact.labels_of(self.extremes.periphery)
+
+        return self._periphery
+
     @property
     def global_efficiency(self) -> float:
         if self._global_efficiency is None:
-            if self.directed:
-                self._global_efficiency = global_efficiency_directional(self.graph)
-            else:
-                self._global_efficiency = global_efficiency(self.graph)
+            self._global_efficiency = distances.global_efficiency(self.compact, self.sweep)
 
         return self._global_efficiency
 
+    @property
+    def shortest_path_length_estimate(self) -> sampling.Estimate:
+        # Exact once the sweep has run, sampled otherwise; sampling only
+        # counts hops.
+        if self._shortest_path_length_estimate is None:
+            if self._sweep is not None or self.weighted_distances:
+                value = self.shortest_path_length
+                sources = int(self._largest_component_mask(strong=False).sum())
+                self._shortest_path_length_estimate = sampling.Estimate(
+                    value, value, value, self.confidence, sources, sources
+                )
+            else:
+                self._shortest_path_length_estimate = self._cached(
+                    'shortest_path_length_estimate', lambda: sampling.average_shortest_path_length(
+                        self.compact, self._largest_component_mask(strong=False),
+                        self.relative_error, self.time_budget, self.confidence, self.seed
+                    ), **self._sampling_parameters
+                )
+
+        return self._shortest_path_length_estimate
+
+    @property
+    def global_efficiency_estimate(self) -> sampling.Estimate:
+        if self._global_efficiency_estimate is None:
+            if self._sweep is not None or self.weighted_distances:
+                value = self.global_efficiency
+                self._global_efficiency_estimate = sampling.Estimate(
+                    value, value, value, self.confidence, self.node_count, self.node_count
+                )
+            else:
+                self._global_efficiency_estimate = self._cached(
+                    'global_efficiency_estimate', lambda: sampling.global_efficiency(
+                        self.compact, self.relative_error, self.time_budget, self.confidence, self.seed
+                    ), **self._sampling_parameters
+                )
+
+        return self._global_efficiency_estimate
+
+    @property
+    def triangles(self) -> clustering.Triangles:
+        # Enumerated once for transitivity and both clustering averages.
+        if self._triangles is None:
+            self._triangles = clustering.Triangles(self.compact)
+
+        return self._triangles
+
     @property
     def global_clustering_coefficient(self) -> float:
         if self._global_clustering_coefficient is None:
-            self._global_clustering_coefficient = transitivity(self.graph)
+            self._global_clustering_coefficient = self._cached(
+                'global_clustering_coefficient', lambda: clustering.transitivity(self.compact, self.triangles)
+            )
 
         return self._global_clustering_coefficient
 
     @property
     def avg_clustering_coefficient(self) -> float:
         if self._avg_clustering_coefficient is None:
-            self._avg_clustering_coefficient = average_clustering(self.graph)
+            self._avg_clustering_coefficient = self._cached(
+                'avg_clustering_coefficient',
+                lambda: clustering.average_clustering(self.compact, triangle_list=self.triangles)
+            )
 
         return self._avg_clustering_coefficient
 
+    @property
+    def avg_weighted_clustering_coefficient(self) -> float:
+        if self._avg_weighted_clustering_coefficient is None:
+            if not self.weighted:
+                raise MeasureError('Unweighted graphs cannot have weighted clustering.')
+            self._avg_weighted_clustering_coefficient = self._cached(
+                'avg_weighted_clustering_coefficient',
+                lambda: clustering.average_clustering(self.compact, weighted=True, triangle_list=self.triangles)
+            )
+
+        return self._avg_weighted_clustering_coefficient
+
+    @property
+    def degree_arrays(self) -> Degrees:
+        # Degrees in compact graph order, shared by the assortativity variants.
+        if self._degree_arrays is None:
+            self._degree_arrays = Degrees.from_graph(self.compact)
+
+        return self._degree_arrays
+
     @property
     def degree_assortativity(self) -> float:
         if self._degree_assortativity is None:
-            self._degree_assortativity = degree_assortativity_coefficient(self.graph)
+            self._degree_assortativity = degrees.degree_assortativity(self.compact, degrees=self.degree_arrays)
 
         return self._degree_assortativity
 
+    @property
+    def directed_degree_assortativity(self) -> Dict[Tuple[str, str], float]:
+        # Keyed by the (source, target) degree directions, ('out', 'in') is
+        # degree_assortativity.
+        if self._directed_degree_assortativity is None:
+            if not self.directed:
+                raise MeasureError('Undirected graphs have a single degree assortativity, '
+                                   'use \'degree_assortativity\' instead.')
+            self._directed_degree_assortativity = degrees.directed_assortativity(self.compact, self.degree_arrays)
+
+        return self._directed_degree_assortativity
+
     @property
     def degree_distribution(self) -> Union[Dict[int, int], Tuple[Dict[int, int], Dict[int, int]]]:
+        self._seed_from_source()
         if self._degree_distribution is None:
-            if self.directed:
-                distribution = (
-                    dict(Counter(sorted([degree for node, degree in self.graph.in_degree()]))),
-                    dict(Counter(sorted([degree for node, degree in self.graph.out_degree()])))
-                )
-            else:
-                distribution = \
-                    dict(Counter(sorted([degree for node, degree in self.graph.degree()])))
-
-            self._degree_distribution = distribution
+            self._degree_distribution = self.statistics.degree_distribution
 
         return self._degree_distribution
 
     @property
     def top10_central_degree(self) -> Tuple[Any, Any, Any, Any, Any, Any, Any, Any, Any, Any]:
         if self._top10_central_degree is None:
-            dc = degree_centrality(self.graph)
-            self._top10_central_degree = nlargest(10, dc.items(), key=itemgetter(1))
+            if self.is_compact:
+                self._top10_central_degree = self._top10(centrality.degree_centrality(self.compact))
+            else:
+                dc = degree_centrality(self.graph)
+                self._top10_central_degree = nlargest(10, dc.items(), key=itemgetter(1))
 
         return self._top10_central_degree
 
+    @property
+    def betweenness_centrality(self) -> np.ndarray:
+        # Exact unless 'betweenness_epsilon' is set; both top 10 and average
+        # read this one vector.
+        if self._betweenness_centrality is None:
+            if self.betweenness_epsilon is None:
+                self._betweenness_centrality = self._cached(
+                    'betweenness_centrality', lambda: centrality.betweenness_centrality(
+                        self.compact, weighted=self.weighted_betweenness and self.weighted,
+                        workers=self.workers
+                    ), weighted=self.weighted_betweenness
+                )
+                self._betweenness_samples = None
+            else:
+                self._betweenness_centrality, self._betweenness_samples = self._cached(
+                    'approximate_betweenness_centrality', lambda: centrality.approximate_betweenness_centrality(
+                        self.compact, self.betweenness_epsilon, self.betweenness_delta, self.seed
+                    ), epsilon=self.betweenness_epsilon, delta=self.betweenness_delta, seed=self.seed
+                )
+
+        return self._betweenness_centrality
+
+    @property
+    def betweenness_samples(self) -> Optional[int]:
+        # Number of sampled shortest paths, None for exact values.
+        self.betweenness_centrality
+        return self._betweenness_samples
+
     @property
     def top10_central_betweenness(self) -> Tuple[Any, Any, Any, Any, Any, Any, Any, Any, Any, Any]:
         if self._top10_central_betweenness is None:
-            bc = betweenness_centrality(self.graph)
-            self._top10_central_betweenness = nlargest(10, bc.items(), key=itemgetter(1))
+            self._top10_central_betweenness = self._top10(self.betweenness_centrality)
 
         return self._top10_central_betweenness
 
     @property
     def top10_central_closeness(self) -> Tuple[Any, Any, Any, Any, Any, Any, Any, Any, Any, Any]:
         if self._top10_central_closeness is None:
-            cc = closeness_centrality(self.graph)
-            self._top10_central_closeness = nlargest(10, cc.items(), key=itemgetter(1))
+            if self._closeness_centrality is not None or self._sweep is not None or self.weighted_distances:
+                self._top10_central_closeness = self._top10(self.closeness_centrality)
+            else:
+                self._top10_central_closeness = self._cached('top10_central_closeness', self._top10_closeness,
+                                                             distance_weights=None)
 
         return self._top10_central_closeness
 
+    def _top10_closeness(self) -> List[Tuple[Any, float]]:
+        # Pruned BFS, most nodes never get a full traversal.
+        sizes = self.component_index.sizes(strong=False)[self._component_labels(strong=False)]
+        top, scores = distances.top_closeness(self.compact, 10, sizes)
+        return list(zip(self.compact.labels_of(top), scores.tolist()))
+
+    @property
+    def closeness_centrality(self) -> np.ndarray:
+        if self._closeness_centrality is None:
+            self._closeness_centrality = distances.closeness_centrality(self.compact, self.sweep)
+
+        return self._closeness_centrality
+
     @property
     def avg_closeness_centrality(self) -> float:
         if self._avg_closeness_centrality is None:
-            self._avg_closeness_centrality = mean([centrality for centrality in closeness_centrality(self.graph).values()])
+            self._avg_closeness_centrality = float(np.mean(self.closeness_centrality))
 
         return self._avg_closeness_centrality
 
     @property
     def avg_betweenness_centrality(self) -> float:
         if self._avg_betweenness_centrality is None:
-            self._avg_betweenness_centrality = mean([centrality for centrality in betweenness_centrality(self.graph).values()])
+            self._avg_betweenness_centrality = float(np.mean(self.betweenness_centrality))
 
         return self._avg_betweenness_centrality
 
     @property
-    def top10_communities(self) -> Tuple[Any, Any, Any, Any, Any, Any, Any, Any, Any, Any]:
+    def dendrogram(self) -> communities.Dendrogram:
+        # Girvan-Newman removals up to the first level with 10 communities.
+        if self._dendrogram is None:
+            self._dendrogram = self._cached(
+                'dendrogram', lambda: communities.girvan_newman(self.compact, 10, workers=self.workers)
+            )
+
+        return self._dendrogram
+
+    @property
+    def community_labels(self) -> np.ndarray:
+        # Community of every node, numbered by decreasing size, shared by the
+        # community measures below.
+        if self._community_labels is None:
+            if self.community_algorithm == communities.GIRVAN_NEWMAN:
+                self._community_labels = self.dendrogram.labels(10)
+            else:
+                self._community_labels = self._cached(
+                    'community_labels',
+                    lambda: communities.leiden(self.compact, weighted=self.weighted, seed=self.seed),
+                    algorithm=communities.LEIDEN, seed=self.seed
+                )
+
+        return self._community_labels
+
+    @property
+    def top10_communities(self) -> List[set]:
         if self._top10_communities is None:
-            generator = girvan_newman(self.graph)
-            communities = next(generator)
-            while len(communities) < 10:
-                communities = next(generator)
-            self._top10_communities = nlargest(10, communities, key=len)
+            self._top10_communities = [
+                set(self.compact.labels_of(members))
+                for members in communities.community_members(self.community_labels, 10)
+            ]
 
         return self._top10_communities
 
     @property
     def modularity(self) -> float:
         if self._modularity is None:
-            if self.weighted:
-                self._modularity = modularity(self.graph, tuple(self.graph.subgraph(community) for community in self.top10_communities), weight='weight')
-            else:
-                self._modularity = modularity(self.graph, tuple(self.graph.subgraph(community) for community in self.top10_communities))
+            self._modularity = communities.modularity(self.compact, self.community_labels, weighted=self.weighted)
 
         return self._modularity
 
     @property
-    def top10_community_measures(self) -> Tuple['GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures', 'GraphMeasures']:
+    def top10_community_measures(self) -> Tuple['GraphMeasures', ...]:
         if self._top10_community_measures is None:
-            self._top10_community_measures = tuple(GraphMeasures(self.graph.subgraph(community)) for community in self.top10_communities)
+            self._top10_community_measures = tuple(
+                self._child(self.compact.subgraph(members))
+                for members in communities.community_members(self.community_labels, 10)
+            )
 
         return self._top10_community_measures
-
-
-
-
-
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Callable, Dict, NamedTuple, Optional, Union
+
+from networkx import Graph, DiGraph
+
+from compact_graph import CompactGraph
+from paths import suffix_csr, suffix_graphml
+from readers.compression import dataset_stem, dataset_suffix
+from readers.statistics import EdgeStatistics
+from utils import load_raw, load_raw_compact, load_raw_statistics, load_compact, load_processed
+
+REPRESENTATION_STATISTICS = 'statistics'
+REPRESENTATION_COMPACT = 'compact'
+REPRESENTATION_NETWORKX = 'networkx'
+REPRESENTATIONS = (REPRESENTATION_STATISTICS, REPRESENTATION_COMPACT, REPRESENTATION_NETWORKX)
+RAW_SUFFIXES = ('.mtx', '.edges')
+MEBIBYTE = 1 << 20
+
+
+class LoadReport(NamedTuple):
+    representation: str
+    seconds: float
+    # Python heap growth, only when profiled; memory mapped sections are not
+    # counted. No peak when it stayed below one the caller's tracer saw earlier.
+    allocated: Optional[int] = None
+    peak: Optional[int] = None
+
+    def __str__(self):
+        report = f"{self.representation} in {self.seconds:.3f}s"
+        if self.allocated is not None:
+            report += f", {self.allocated / MEBIBYTE:.1f} MiB"
+        if self.peak is not None:
+            report += f" (peak {self.peak / MEBIBYTE:.1f} MiB)"
+        return report
+
+
+class GraphSource:
+    # A graph on disk, loaded only in the representation a measure asks for:
+    # edge statistics for counts and degrees, the compact graph for traversals
+    # and networkx only for what still runs on networkx. 'profile' traces
+    # the memory of every load, which slows loads down several times.
+    def __init__(self, path: Path,
+                 loaders: Optional[Dict[str, Callable[[Path], Any]]] = None,
+                 verbose=True, profile=False):
+        if loaders is not None and not set(loaders) <= set(REPRESENTATIONS):
+            raise ValueError(f"Invalid representations {tuple(set(loaders) - set(REPRESENTATIONS))}, "
+                             f"expected any of {REPRESENTATIONS}.")
+        self._path = Path(path)
+        self._loaders = dict(loaders or {})
+        self._verbose = verbose
+        self._profile = profile
+        self._statistics: Optional[EdgeStatistics] = None
+        self._compact: Optional[CompactGraph] = None
+        self._networkx: Optional[Union[Graph, DiGraph]] = None
+        self._reports: Dict[str, LoadReport] = {}
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def name(self) -> str:
+        return dataset_stem(self.path)
+
+    @property
+    def is_raw(self) -> bool:
+        return dataset_suffix(self.path) in RAW_SUFFIXES
+
+    @property
+    def reports(self) -> Dict[str, LoadReport]:
+        return dict(self._reports)
+
+    def loaded(self, representation: str) -> bool:
+        return representation in self._reports
+
+    @property
+    def statistics(self) -> EdgeStatistics:
+        if self._statistics is None:
+            self._statistics = self._load(REPRESENTATION_STATISTICS, self._load_statistics)
+
+        return self._statistics
+
+    @property
+    def compact(self) -> CompactGraph:
+        if self._compact is None:
+            self._compact = self._load(REPRESENTATION_COMPACT, self._load_compact)
+            self._compact.name = self.name
+
+        return self._compact
+
+    @property
+    def networkx(self) -> Union[Graph, DiGraph]:
+        if self._networkx is None:
+            self._networkx = self._load(REPRESENTATION_NETWORKX, self._load_networkx)
+
+        return self._networkx
+
+    def _load_statistics(self) -> EdgeStatistics:
+        # Raw files are streamed; processed files have no cheaper path than
+        # the compact graph, which is zero-copy for csr.
+        if self._compact is None and self.is_raw:
+            return load_raw_statistics(self.path)
+        return EdgeStatistics.from_compact(self.compact)
+
+    def _load_compact(self) -> CompactGraph:
+        if self.is_raw:
+            return load_raw_compact(self.path)
+        if self.path.suffix == suffix_graphml and self._networkx is not None:
+            return CompactGraph.from_networkx(self._networkx)
+        return load_compact(self.path)
+
+    def _load_networkx(self) -> Union[Graph, DiGraph]:
+        if self._compact is not None or self.path.suffix == suffix_csr:
+            return self.compact.to_networkx()
+        if self.is_raw:
+            return load_raw(self.path)
+        return load_processed(self.path)
+
+    def _load(self, representation: str, default: Callable[[], Any]) -> Any:
+        loader = self._loaders.get(representation)
+        # A tracer started by the caller is left as it is, its peak included.
+        tracing = tracemalloc.is_tracing()
+        if self._profile and not tracing:
+            tracemalloc.start()
+        profiling = tracemalloc.is_tracing()
+        before, peak_before = tracemalloc.get_traced_memory() if profiling else (0, 0)
+        start = perf_counter()
+        try:
+            value = default() if loader is None else loader(self.path)
+        finally:
+            seconds = perf_counter() - start
+            current, peak = tracemalloc.get_traced_memory() if profiling else (0, 0)
+            if profiling and not tracing:
+                tracemalloc.stop()
+
+        if not profiling:
+            report = LoadReport(representation, seconds)
+        else:
+            report = LoadReport(representation, seconds, max(current - before, 0),
+                                max(peak - before, 0) if peak > peak_before or not tracing else None)
+        self._reports[representation] = report
+        if self._verbose:
+            print(f"{datetime.now()} - Graph {self.name}: LOADED - {report}")
+        return value
@@ -1,18 +1,19 @@
 from datetime import datetime
-from multiprocessing import Process
 from pathlib import Path
 from os import getpid
+from typing import Tuple
 
 from matplotlib import pyplot as plt
 
+from algorithms.sampling import Estimate
 from graph_measures import GraphMeasures
+from graph_source import GraphSource
+from measure_cache import MeasureCache
+from scheduler import run_writers
 from paths import processed_openflights, processed_power, \
     processed_roadnet_ca, processed_roadmap_pa, \
     processed_usair97
 from paths import results
-from utils import load_graphml
-
-import networkx as nx
 
 graph_paths = {
     0: processed_openflights,
@@ -26,6 +27,13 @@ MAX_GRAPH_SIZE = 10**4
 UNAVAILABLE = 'N/A'
 
 HISTOGRAM_BINS = 100
+# Processes computing the measures of a graph, None for every CPU.
+WORKERS = None
+
+
+def approximate(estimate: Estimate) -> str:
+    return f"~{estimate.value}\t[{estimate.low}, {estimate.high}]\t" \
+           f"{estimate.sources}/{estimate.population} izvora"
 
 
 def write_basic(measures: GraphMeasures, name: str):
@@ -59,12 +67,18 @@ def write_basic(measures: GraphMeasures, name: str):
         else:
             file.write(f"Veličina najveće komponente\t{measures.largest_component_measures.node_count}\t{measures.largest_component_measures.edge_count}\n")
 
-        file.write(f"Prosječna duljina najkraćeg puta\t{measures.shortest_path_length if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
-        file.write(f"Dijametar\t{measures.diameter if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
-        file.write(f"Ekscentričnost\t{measures.eccentricity if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
-        file.write(f"Globalna učinkovitost\t{measures.global_efficiency if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
+        file.write(f"Prosječna duljina najkraćeg puta\t{measures.shortest_path_length if measures.node_count < MAX_GRAPH_SIZE else approximate(measures.shortest_path_length_estimate)}\n")
+        file.write(f"Dijametar\t{measures.diameter}\n")
+        file.write(f"Ekscentričnost\t{measures.eccentricity}\n")
+        file.write(f"Radijus\t{measures.radius}\n")
+        file.write(f"Globalna učinkovitost\t{measures.global_efficiency if measures.node_count < MAX_GRAPH_SIZE else approximate(measures.global_efficiency_estimate)}\n")
         file.write(f"Prosječni koeficijent grupiranje\t{measures.avg_clustering_coefficient}\n")
+        if measures.weighted:
+            file.write(f"Prosječni težinski koeficijent grupiranja\t{measures.avg_weighted_clustering_coefficient}\n")
         file.write(f"Asortativnost s obzirom na stupanj čvora\t{measures.degree_assortativity}\n")
+        if measures.directed:
+            for (x, y), assortativity in measures.directed_degree_assortativity.items():
+                file.write(f"Asortativnost s obzirom na stupanj čvora ({x}-{y})\t{assortativity}\n")
         file.write(f"Prosječna centralnost blizine\t{measures.avg_closeness_centrality if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
         file.write(f"Prosječna međupoloženost\t{measures.avg_betweenness_centrality if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
     print(f"{datetime.now()} - Graph {name}: FINISHED - basic measures")
@@ -79,7 +93,7 @@ def write_centrality(measures: GraphMeasures, name: str):
         for i in range(10):
             file.write(f"{measures.top10_central_degree[i][0]}\t"
                        f"{measures.top10_central_betweenness[i][0] if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\t"
-                       f"{measures.top10_central_closeness[i][0] if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
+                       f"{measures.top10_central_closeness[i][0]}\n")
     print(f"{datetime.now()} - Graph {name}: FINISHED - centrality")
 
 
@@ -87,21 +101,14 @@ def write_modularity(measures: GraphMeasures, name: str):
     print(f"{datetime.now()} - Graph {name}: STARTED - modularity")
     results_modularity: Path = results / f"{name}_modularity.txt"
     with results_modularity.open('w') as file:
-        try:
-            file.write(f"Modularnost\t{measures.modularity if measures.node_count < MAX_GRAPH_SIZE else UNAVAILABLE}\n")
-            file.write(f"Svojstva zajednica\n")
-            if measures.node_count > MAX_GRAPH_SIZE:
-                file.write("Greška: Preveliki graf.")
-                return
-            file.write(f"Broj čvorova\tBroj veza\n")
-            for c_measures in measures.top10_community_measures:
-                if measures.directed:
-                    file.write(f"{c_measures.node_count}\t{sum(c_measures.edge_count)}\n")
-                else:
-                    file.write(f"{c_measures.node_count}\t{c_measures.edge_count}\n")
-        except nx.algorithms.community.quality.NotAPartition:
-            print(f"{datetime.now()} - Graph {name}: FAILED - modularity")
-            file.write(f"FAILED")
+        file.write(f"Modularnost\t{measures.modularity}\n")
+        file.write(f"Svojstva zajednica\n")
+        file.write(f"Broj čvorova\tBroj veza\n")
+        for c_measures in measures.top10_community_measures:
+            if measures.directed:
+                file.write(f"{c_measures.node_count}\t{sum(c_measures.edge_count)}\n")
+            else:
+                file.write(f"{c_measures.node_count}\t{c_measures.edge_count}\n")
     print(f"{datetime.now()} - Graph {name}: FINISHED - modularity")
 
 
@@ -109,7 +116,7 @@ def write_histograms(measures: GraphMeasures, name: str):
     print(f"{datetime.now()} - Graph {name}: STARTED - histograms")
     if measures.directed:
         results_hist_degree_in: Path = results / f"{name}_hist_degree_in.png"
-        degrees_in = tuple(degree[1] for degree in measures.graph.in_degree())
+        degrees_in, degrees_out = measures.degrees
         plt.xlabel('Stupanj')
         plt.xlabel('Frekvencija')
         plt.hist(degrees_in, bins=HISTOGRAM_BINS)
@@ -117,14 +124,13 @@ def write_histograms(measures: GraphMeasures, name: str):
         plt.close()
 
         results_hist_degree_out: Path = results / f"{name}_hist_degree_out.png"
-        degrees_out = tuple(degree[1] for degree in measures.graph.out_degree())
         plt.xlabel('Stupanj')
         plt.xlabel('Frekvencija')
         plt.hist(degrees_out, bins=HISTOGRAM_BINS)
         plt.savefig(results_hist_degree_out.as_posix())
         plt.close()
     else:
-        degrees = tuple(degree[1] for degree in measures.graph.degree())
+        degrees = measures.degrees
         plt.xlabel('Stupanj')
         plt.xlabel('Frekvencija')
         results_hist_degree: Path = results / f"{name}_hist_degree.png"
@@ -137,7 +143,7 @@ def write_histograms(measures: GraphMeasures, name: str):
             results_hist_weight_in: Path = results / f"{name}_hist_weight_in.png"
             plt.xlabel('Snaga')
             plt.xlabel('Frekvencija')
-            weights = tuple(in_edge[2]['weight'] for in_edge in measures.graph.in_edges().data())
+            weights = measures.edge_weights
             plt.hist(weights, bins=HISTOGRAM_BINS)
             plt.savefig(results_hist_weight_in.as_posix())
             plt.close()
@@ -145,7 +151,7 @@ def write_histograms(measures: GraphMeasures, name: str):
             results_hist_weight_out: Path = results / f"{name}_hist_weight_out.png"
             plt.xlabel('Snaga')
             plt.xlabel('Frekvencija')
-            weights = tuple(out_edge[2]['weight'] for out_edge in measures.graph.out_edges().data())
+            weights = measures.edge_weights
             plt.hist(weights, bins=HISTOGRAM_BINS)
             plt.savefig(results_hist_weight_out.as_posix())
             plt.close()
@@ -153,30 +159,47 @@ def write_histograms(measures: GraphMeasures, name: str):
             results_hist_weight: Path = results / f"{name}_hist_weight.png"
             plt.xlabel('Snaga')
             plt.xlabel('Frekvencija')
-            weights = tuple(edge[2]['weight'] for edge in measures.graph.edges().data())
+            weights = measures.edge_weights
             plt.hist(weights, bins=HISTOGRAM_BINS)
             plt.savefig(results_hist_weight.as_posix())
             plt.close()
     print(f"{datetime.now()} - Graph {name}: FINISHED - histograms")
 
 
-stat_functions = (
-    write_basic,
-    write_histograms,
-    write_centrality,
-    write_modularity
-)
+def basic_measures(measures: GraphMeasures) -> Tuple[str, ...]:
+    if measures.node_count < MAX_GRAPH_SIZE:
+        distance = ('shortest_path_length', 'global_efficiency',
+                    'avg_closeness_centrality', 'avg_betweenness_centrality')
+    else:
+        distance = ('shortest_path_length_estimate', 'global_efficiency_estimate')
+    return distance + ('diameter', 'eccentricity', 'radius', 'avg_clustering_coefficient', 'degree_assortativity')
+
+
+def centrality_measures(measures: GraphMeasures) -> Tuple[str, ...]:
+    if measures.node_count < MAX_GRAPH_SIZE:
+        return 'top10_central_degree', 'top10_central_betweenness', 'top10_central_closeness'
+    return 'top10_central_degree', 'top10_central_closeness'
+
+
+# Every writer with the measures it reads, so that the scheduler computes
+# the ones they share only once.
+stat_functions = {
+    write_basic: basic_measures,
+    write_histograms: lambda measures: ('degrees',),
+    write_centrality: centrality_measures,
+    write_modularity: lambda measures: ('modularity', 'top10_community_measures'),
+}
 
 if __name__ == '__main__':
     '''
     path = graph_paths[4]
-    p = Process(target=write_modularity, args=(GraphMeasures(load_graphml(path)), path.stem))
-    p.start()
+    run_writers(GraphMeasures(GraphSource(path)), path.stem, {write_modularity: stat_functions[write_modularity]})
     '''
 
+    # Measures of unchanged graphs come from results/cache, drop them with
+    # 'python measure_cache.py' to recompute.
+    cache = MeasureCache()
     for graph_id in (0, 1, 2, 3, 4):
         path = graph_paths[graph_id]
-        graph_measures = GraphMeasures(load_graphml(path))
-        for func in stat_functions:
-            process = Process(target=func, args=(graph_measures, path.stem))
-            process.start()
+        graph_measures = GraphMeasures(GraphSource(path), cache=cache)
+        run_writers(graph_measures, path.stem, stat_functions, WORKERS)
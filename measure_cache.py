@@ -0,0 +1,243 @@
+import json
+import pickle
+from argparse import ArgumentParser
+from contextlib import contextmanager
+from datetime import datetime
+from hashlib import sha256
+from os import getpid
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import numpy as np
+
+from compact_graph import CompactGraph
+from convert import fingerprint as file_fingerprint
+from paths import measure_cache
+
+try:
+    from fcntl import flock, LOCK_EX, LOCK_UN
+except ImportError:
+    import msvcrt
+    flock = None
+
+DEFAULT_MAX_BYTES = 1 << 31
+INDEX_NAME = 'index.json'
+LOCK_NAME = 'index.lock'
+SUFFIX_ARRAY = '.npy'
+SUFFIX_PICKLE = '.pickle'
+
+
+def graph_fingerprint(graph: CompactGraph) -> str:
+    # Structure, weights and node labels; the per-node vectors in the cache
+    # are in compact graph order, so the labels are part of the content.
+    digest = sha256()
+    digest.update(f"{graph.directed}:{graph.node_count}:{graph.edge_count}".encode())
+    for array in (graph.indptr, graph.indices, graph.weights):
+        if array is not None:
+            digest.update(np.ascontiguousarray(array).view(np.uint8).data)
+    labels = np.asarray(graph.labels)
+    if labels.dtype.kind in 'biufSU':
+        digest.update(labels.dtype.str.encode())
+        digest.update(np.ascontiguousarray(labels).view(np.uint8).data)
+    else:
+        digest.update('\n'.join(map(repr, labels.tolist())).encode())
+    return digest.hexdigest()
+
+
+def entry_key(graph: str, measure: str, parameters: Dict[str, Any]) -> str:
+    return sha256(json.dumps([graph, measure, parameters], sort_keys=True).encode()).hexdigest()
+
+
+class MeasureCache:
+    # Measure values on disk under 'directory', keyed by graph fingerprint,
+    # measure name and the parameters the measure depends on. Plain arrays
+    # are stored as .npy files, everything else is pickled; the index keeps
+    # sizes and last use for eviction of the least recently used entries
+    # beyond 'max_bytes'. Processes share a directory safely: every update
+    # re-reads and rewrites the index under an exclusive file lock, and
+    # value files only appear or disappear while it is held.
+    def __init__(self, directory: Path = measure_cache, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+
+    @property
+    def index_path(self) -> Path:
+        return self.directory / INDEX_NAME
+
+    @contextmanager
+    def locked(self) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with (self.directory / LOCK_NAME).open('a+b') as file:
+            if flock is not None:
+                flock(file.fileno(), LOCK_EX)
+            else:
+                file.seek(0)
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if flock is not None:
+                    flock(file.fileno(), LOCK_UN)
+                else:
+                    file.seek(0)
+                    msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def load_index(self) -> Dict[str, Any]:
+        if not self.index_path.exists():
+            return {'entries': {}, 'files': {}, 'uses': 0}
+        with self.index_path.open('r') as file:
+            return json.load(file)
+
+    def dump_index(self, index: Dict[str, Any]):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Per process, writers sharing the directory must not clobber it.
+        temporary = self.index_path.with_name(f"{INDEX_NAME}.{getpid()}.tmp")
+        with temporary.open('w') as file:
+            json.dump(index, file, indent=2, sort_keys=True)
+        temporary.replace(self.index_path)
+
+    def file_fingerprint(self, path: Path) -> str:
+        # Content hash of a dataset file, rehashed only when its size or
+        # modification time changes.
+        path = Path(path).absolute()
+        previous = self.load_index()['files'].get(path.as_posix())
+        current = file_fingerprint(path, previous)
+        if current != previous:
+            with self.locked():
+                index = self.load_index()
+                index['files'][path.as_posix()] = current
+                self.dump_index(index)
+        return current['sha256']
+
+    @property
+    def size(self) -> int:
+        return sum(entry['size'] for entry in self.load_index()['entries'].values())
+
+    def __len__(self) -> int:
+        return len(self.load_index()['entries'])
+
+    def get(self, graph: str, measure: str, parameters: Dict[str, Any], default: Any = None) -> Any:
+        key = entry_key(graph, measure, parameters)
+        entry = self.load_index()['entries'].get(key)
+        if entry is None:
+            return default
+        # Read without the lock, large values would hold up every other
+        # process; an entry evicted meanwhile is a miss.
+        path = self.directory / entry['file']
+        try:
+            if path.suffix == SUFFIX_ARRAY:
+                value = np.load(path, allow_pickle=False)
+            else:
+                with path.open('rb') as file:
+                    value = pickle.load(file)
+        except FileNotFoundError:
+            return default
+        with self.locked():
+            index = self.load_index()
+            if key in index['entries']:
+                self.use(index, index['entries'][key])
+                self.dump_index(index)
+        return value
+
+    def put(self, graph: str, measure: str, parameters: Dict[str, Any], value: Any):
+        key = entry_key(graph, measure, parameters)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        array = isinstance(value, np.ndarray) and value.dtype != object
+        path = self.directory / f"{key}{SUFFIX_ARRAY if array else SUFFIX_PICKLE}"
+        temporary = path.with_name(f"{path.name}.{getpid()}.tmp")
+        with temporary.open('wb') as file:
+            if array:
+                np.save(file, value, allow_pickle=False)
+            else:
+                pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+        size = temporary.stat().st_size
+        if size > self.max_bytes:
+            temporary.unlink()
+            return
+
+        with self.locked():
+            temporary.replace(path)
+            index = self.load_index()
+            index['entries'][key] = entry = {
+                'graph': graph,
+                'measure': measure,
+                'parameters': parameters,
+                'file': path.name,
+                'size': size,
+                'created': datetime.now().isoformat(),
+            }
+            self.use(index, entry)
+            self.evict(index, keep=key)
+            self.dump_index(index)
+
+    def get_or_compute(self, graph: str, measure: str, parameters: Dict[str, Any],
+                       compute: Callable[[], Any]) -> Any:
+        missing = object()
+        value = self.get(graph, measure, parameters, missing)
+        if value is missing:
+            value = compute()
+            self.put(graph, measure, parameters, value)
+        return value
+
+    @staticmethod
+    def use(index: Dict[str, Any], entry: Dict[str, Any]):
+        # A counter rather than a clock, so the order of uses has no ties.
+        index['uses'] += 1
+        entry['used'] = index['uses']
+
+    def evict(self, index: Dict[str, Any], keep: Optional[str] = None):
+        # Called with the lock held.
+        self.remove_orphans(index)
+        entries = index['entries']
+        total = sum(entry['size'] for entry in entries.values())
+        for key in sorted(entries, key=lambda key: entries[key]['used']):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            total -= entries[key]['size']
+            self.remove(entries.pop(key))
+
+    def remove(self, entry: Dict[str, Any]):
+        path = self.directory / entry['file']
+        if path.exists():
+            path.unlink()
+
+    def remove_orphans(self, index: Dict[str, Any]):
+        # Value files the index does not know, left by a crashed process or an
+        # older unlocked version; called with the lock held.
+        files = {entry['file'] for entry in index['entries'].values()}
+        for path in self.directory.iterdir():
+            if path.suffix in (SUFFIX_ARRAY, SUFFIX_PICKLE) and path.name not in files:
+                path.unlink()
+
+    def invalidate(self, graph: Optional[str] = None, measure: Optional[str] = None) -> int:
+        # Drops every entry of 'graph' and/or 'measure', all entries when both
+        # are None; returns how many were dropped.
+        with self.locked():
+            index = self.load_index()
+            entries = index['entries']
+            dropped = [key for key, entry in entries.items()
+                       if (graph is None or entry['graph'] == graph) and
+                       (measure is None or entry['measure'] == measure)]
+            for key in dropped:
+                self.remove(entries.pop(key))
+            self.remove_orphans(index)
+            self.dump_index(index)
+        return len(dropped)
+
+    def clear(self) -> int:
+        return self.invalidate()
+
+
+if __name__ == '__main__':
+    parser = ArgumentParser(description='Invalidate cached graph measures.')
+    parser.add_argument('--graph', type=Path, default=None,
+                        help='dataset file whose measures are dropped, all datasets by default')
+    parser.add_argument('--measure', default=None,
+                        help='measure to drop, all measures by default')
+    arguments = parser.parse_args()
+
+    cache = MeasureCache()
+    graph_key = None if arguments.graph is None else cache.file_fingerprint(arguments.graph)
+    print(f"Dropped {cache.invalidate(graph_key, arguments.measure)} cached measures.")
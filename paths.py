@@ -2,6 +2,7 @@ from pathlib import Path
 from os import environ
 
 env_working_dir = 'WORKING_DIR_UPZ_PROJEKT'
+env_processed_format = 'PROCESSED_FORMAT_UPZ_PROJEKT'
 try:
     working_dir = Path(environ[env_working_dir])
 except KeyError:
@@ -16,10 +17,22 @@ raw_usair97 = raw / 'inf-USAir97.mtx'
 
 processed = working_dir / 'processed_data'
 suffix_graphml = '.graphml'
-processed_openflights = processed / f"{raw_openflights.stem}{suffix_graphml}"
-processed_power = processed / f"{raw_power.stem}{suffix_graphml}"
-processed_roadnet_ca = processed / f"{raw_roadnet_ca.stem}{suffix_graphml}"
-processed_roadmap_pa = processed / f"{raw_roadnet_pa.stem}{suffix_graphml}"
-processed_usair97 = processed / f"{raw_usair97.stem}{suffix_graphml}"
+suffix_csr = '.csr'
+processed_formats = {
+    'graphml': suffix_graphml,
+    'csr': suffix_csr,
+}
+try:
+    suffix_processed = processed_formats[environ.get(env_processed_format, 'graphml')]
+except KeyError:
+    raise ValueError(f"Invalid value of '{env_processed_format}', "
+                     f"expected one of {tuple(processed_formats)}.")
+processed_openflights = processed / f"{raw_openflights.stem}{suffix_processed}"
+processed_power = processed / f"{raw_power.stem}{suffix_processed}"
+processed_roadnet_ca = processed / f"{raw_roadnet_ca.stem}{suffix_processed}"
+processed_roadmap_pa = processed / f"{raw_roadnet_pa.stem}{suffix_processed}"
+processed_usair97 = processed / f"{raw_usair97.stem}{suffix_processed}"
+processed_manifest = processed / 'manifest.json'
 
 results = working_dir / 'results'
+measure_cache = results / 'cache'
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import lzma
+import tarfile
+from pathlib import Path
+from typing import BinaryIO, Optional, Union
+
+COMPRESSION_GZIP = 'gzip'
+COMPRESSION_BZIP2 = 'bz2'
+COMPRESSION_XZ = 'xz'
+MAGIC_BYTES = (
+    (b'\x1f\x8b', COMPRESSION_GZIP),
+    (b'BZh', COMPRESSION_BZIP2),
+    (b'\xfd7zXZ\x00', COMPRESSION_XZ),
+)
+COMPRESSION_SUFFIXES = ('.gz', '.bz2', '.xz')
+ARCHIVE_SUFFIXES = ('.tar', '.tgz', '.tbz2', '.txz')
+DATASET_SUFFIXES = ('.mtx', '.edges')
+
+openers = {
+    COMPRESSION_GZIP: gzip.open,
+    COMPRESSION_BZIP2: bz2.open,
+    COMPRESSION_XZ: lzma.open,
+}
+
+
+def detect_compression(path: Union[Path, str]) -> Optional[str]:
+    with open(path, 'rb') as file:
+        head = file.read(6)
+    for magic, compression in MAGIC_BYTES:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def logical_path(path: Union[Path, str]) -> Path:
+    # 'inf-power.mtx.gz' -> 'inf-power.mtx'
+    path = Path(path)
+    while path.suffix in COMPRESSION_SUFFIXES:
+        path = path.with_suffix('')
+    return path
+
+
+def is_archive(path: Union[Path, str]) -> bool:
+    return logical_path(path).suffix in ARCHIVE_SUFFIXES
+
+
+def is_compressed(path: Union[Path, str]) -> bool:
+    return is_archive(path) or detect_compression(path) is not None
+
+
+class ArchiveMember:
+    # First dataset member of a tar bundle, read straight from the
+    # (optionally compressed) archive stream without extracting it.
+    def __init__(self, path: Union[Path, str]):
+        self._archive = tarfile.open(path, mode='r|*')
+        self._member = None
+        for member in self._archive:
+            if member.isfile() and logical_path(member.name).suffix in DATASET_SUFFIXES:
+                self._member = self._archive.extractfile(member)
+                self.name = member.name
+                break
+        if self._member is None:
+            self._archive.close()
+            raise ValueError(f"No dataset found in archive '{path}'.")
+
+    def read(self, size: int = -1) -> bytes:
+        return self._member.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        return self._member.readline(size)
+
+    def __iter__(self):
+        return iter(self._member)
+
+    def close(self):
+        self._member.close()
+        self._archive.close()
+
+    def __enter__(self) -> ArchiveMember:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def open_raw(path: Union[Path, str]) -> BinaryIO:
+    if is_archive(path):
+        return ArchiveMember(path)
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, 'rb')
+    return openers[compression](path, 'rb')
+
+
+def dataset_suffix(path: Union[Path, str]) -> str:
+    logical = logical_path(path)
+    if logical.suffix in ARCHIVE_SUFFIXES:
+        with ArchiveMember(path) as member:
+            return logical_path(member.name).suffix
+    return logical.suffix
+
+
+def dataset_stem(path: Union[Path, str]) -> str:
+    # 'inf-power.mtx.gz' and 'inf-power.tar.gz' -> 'inf-power'
+    logical = logical_path(path)
+    if logical.suffix in ARCHIVE_SUFFIXES + DATASET_SUFFIXES:
+        return logical.stem
+    return logical.name
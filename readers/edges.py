@@ -1,15 +1,23 @@
 from __future__ import annotations
 
-from typing import Union, Tuple
+from typing import BinaryIO, Iterator, Optional, Union, Tuple
 
+import numpy as np
 from networkx import Graph, DiGraph
 from networkx import read_edgelist
 
+from compact_graph import CompactGraph
+from readers.compression import open_raw, is_compressed
+from readers.statistics import EdgeStatistics
+from readers.tokenizer import DEFAULT_CHUNK_SIZE, iter_chunks, parse_chunk, \
+    parse_parallel, prefetch, index_dtype
+
 
 def read_edges(path: str, comments='%', delimiter=None,
-               nodetype=None, encoding='utf-8') -> Union[Graph, DiGraph]:
+               nodetype=None, encoding='utf-8', fast=True, workers=1) -> Union[Graph, DiGraph]:
     reader = EdgesReader(comments=comments, delimiter=delimiter,
-                         node_type=nodetype, encoding=encoding)
+                         node_type=nodetype, encoding=encoding, fast=fast,
+                         workers=workers)
     return reader(path)
 
 
@@ -30,14 +38,21 @@ class EdgesReader:
     VALID_WEIGHT = (WEIGHT_UNWEIGHTED, WEIGHT_POSITIVE, WEIGHT_POSWEIGHTED,
                     WEIGHT_SIGNED, WEIGHT_MULTISIGNED, WEIGHT_WEIGHTED,
                     WEIGHT_MULTIWEIGHTED, WEIGHT_DYNAMIC, WEIGHT_MULTIPOSWEIGHTED)
+    WEIGHTED = (WEIGHT_POSWEIGHTED, WEIGHT_SIGNED, WEIGHT_MULTISIGNED,
+                WEIGHT_WEIGHTED, WEIGHT_MULTIWEIGHTED, WEIGHT_MULTIPOSWEIGHTED)
+    UNWEIGHTED = (WEIGHT_UNWEIGHTED, WEIGHT_POSITIVE, WEIGHT_DYNAMIC)
 
     def __init__(self, comments='#', delimiter=None,
-                 node_type=None, edge_key_type=None, encoding='utf-8'):
+                 node_type=None, edge_key_type=None, encoding='utf-8',
+                 fast=True, chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
         self._comments = comments
         self._delimiter = delimiter
         self._node_type = node_type
         self._encoding = encoding
         self._edge_key_type = edge_key_type
+        self._fast = fast
+        self._chunk_size = chunk_size
+        self._workers = workers
 
     @property
     def comments(self):
@@ -59,6 +74,18 @@ class EdgesReader:
     def edge_key_type(self):
         return self._edge_key_type
 
+    @property
+    def fast(self):
+        return self._fast
+
+    @property
+    def chunk_size(self):
+        return self._chunk_size
+
+    @property
+    def workers(self):
+        return self._workers
+
     def __call__(self, path: str) -> Union[Graph, DiGraph]:
         header, info = self.get_metadata(path)
 
@@ -72,32 +99,137 @@ class EdgesReader:
         else:
             raise ValueError(f"Invalid edges type '{edges}'")
 
-        if weight in (self.WEIGHT_POSWEIGHTED, self.WEIGHT_SIGNED,
-                      self.WEIGHT_MULTISIGNED, self.WEIGHT_WEIGHTED,
-                      self.WEIGHT_MULTIWEIGHTED, self.WEIGHT_MULTIPOSWEIGHTED):
+        if weight in self.WEIGHTED:
             data = (('weight', float),)
-        elif weight in (self.WEIGHT_UNWEIGHTED, self.WEIGHT_POSITIVE,
-                        self.WEIGHT_DYNAMIC):
+        elif weight in self.UNWEIGHTED:
             data = True
         else:
             raise ValueError(f"Invalid weight type '{weight}'")
 
-        return read_edgelist(
-            path,
-            comments=self.comments,
-            delimiter=self.delimiter,
-            create_using=create_using,
-            nodetype=self.node_type,
-            data=data,
-            edgetype=self.edge_key_type,
-            encoding=self.encoding
+        if self.fast and self.delimiter is None:
+            try:
+                sources, targets, weights = self.parse_body(path, weight)
+            except ValueError:
+                # Non-numeric node ids, left to the generic parser below;
+                # parse_chunk raises on them under numpy 1 as well, rather
+                # than returning the entries before the first one.
+                pass
+            else:
+                graph = create_using()
+                node_type = self.node_type or str
+                sources = map(node_type, sources.tolist())
+                targets = map(node_type, targets.tolist())
+                if weights is None:
+                    graph.add_edges_from(zip(sources, targets))
+                else:
+                    graph.add_weighted_edges_from(zip(sources, targets, weights.tolist()))
+                return graph
+
+        with open_raw(path) as file:
+            return read_edgelist(
+                file,
+                comments=self.comments,
+                delimiter=self.delimiter,
+                create_using=create_using,
+                nodetype=self.node_type,
+                data=data,
+                edgetype=self.edge_key_type,
+                encoding=self.encoding
+            )
+
+    def compact(self, path: str) -> CompactGraph:
+        header, info = self.get_metadata(path)
+        edges, weight = self.parse_header(header)
+        self.parse_info(info)
+
+        sources, targets, weights = self.parse_body(path, weight)
+        labels, endpoints = np.unique(np.concatenate((sources, targets)),
+                                      return_inverse=True)
+        endpoints = endpoints.reshape(-1).astype(index_dtype(len(labels)))
+        if (self.node_type or str) is str:
+            labels = labels.astype(str)
+        return CompactGraph.from_edges(
+            endpoints[:len(sources)], endpoints[len(sources):], weights,
+            len(labels), edges == self.EDGES_DIRECTED, labels
         )
 
+    def statistics(self, path: str) -> EdgeStatistics:
+        # Single streaming pass over the body, no graph is built.
+        header, info = self.get_metadata(path)
+        edges, weight = self.parse_header(header)
+        self.parse_info(info)
+
+        columns = self.body_columns(path)
+        statistics = EdgeStatistics(edges == self.EDGES_DIRECTED,
+                                    weight in self.WEIGHTED and columns is not None and columns > 2)
+        if columns is not None:
+            with open_raw(path) as file:
+                for block in self.stream_blocks(file, columns, is_compressed(path)):
+                    statistics.update(*self.split_block(block, weight))
+        return statistics.finish()
+
+    def parse_body(self, path: str, weight: str) -> \
+            Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        columns = self.body_columns(path)
+        if columns is None:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), None
+
+        compressed = is_compressed(path)
+        if self.workers > 1 and not compressed:
+            blocks = parse_parallel(path, 0, columns, self.workers, dtype=self.body_dtype(columns),
+                                    comments=self.comments.encode(), chunk_size=self.chunk_size)
+        else:
+            with open_raw(path) as file:
+                blocks = list(self.stream_blocks(file, columns, compressed))
+
+        if not blocks:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), None
+
+        body = np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+        return self.split_block(body, weight)
+
+    def body_columns(self, path: str) -> Optional[int]:
+        # KONECT bodies hold two node columns, then an optional weight and an
+        # optional timestamp column; the column count is taken from the first
+        # edge line and every line must match it.
+        comments = self.comments.encode()
+        columns = None
+        with open_raw(path) as file:
+            for line in file:
+                if line.strip() and not line.lstrip().startswith(comments):
+                    columns = len(line.split())
+                    break
+        if columns is not None and columns < 2:
+            raise ValueError(f"Expected at least 2 columns, got {columns}.")
+        return columns
+
     @staticmethod
-    def get_metadata(path: str) -> Tuple[str, str]:
-        with open(path, 'r') as file:
-            header = file.readline()
-            info = file.readline()
+    def body_dtype(columns: int) -> np.dtype:
+        return np.dtype(np.float64) if columns > 2 else np.dtype(np.int64)
+
+    def stream_blocks(self, file: BinaryIO, columns: int, overlap=False) -> Iterator[np.ndarray]:
+        chunks = iter_chunks(file, self.chunk_size)
+        if overlap:
+            chunks = prefetch(chunks)
+        for chunk in chunks:
+            yield parse_chunk(chunk, columns, dtype=self.body_dtype(columns),
+                              comments=self.comments.encode())
+
+    def split_block(self, block: np.ndarray, weight: str) -> \
+            Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        sources = block[:, 0].astype(np.int64)
+        targets = block[:, 1].astype(np.int64)
+        if np.issubdtype(block.dtype, np.floating) and \
+                (not np.array_equal(sources, block[:, 0]) or not np.array_equal(targets, block[:, 1])):
+            raise ValueError("Node ids must be integers.")
+        weights = block[:, 2].astype(np.float64) \
+            if weight in self.WEIGHTED and block.shape[1] > 2 else None
+        return sources, targets, weights
+
+    def get_metadata(self, path: str) -> Tuple[str, str]:
+        with open_raw(path) as file:
+            header = file.readline().decode(self.encoding)
+            info = file.readline().decode(self.encoding)
         return header, info
 
     def parse_header(self, header: str) -> Tuple[str, str]:
@@ -1,15 +1,26 @@
 from __future__ import annotations
 
-from io import TextIOBase
-from typing import List, Union, Tuple, Type
+from io import TextIOBase, BytesIO
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Union, Tuple, Type
 
+import numpy as np
 from networkx import NetworkXError, Graph, DiGraph
 
+from compact_graph import CompactGraph
 
-def read_mtx(path: str, node_type=str, edge_key_type=int) -> Union[Graph, DiGraph]:
+from readers.compression import open_raw, is_compressed
+from readers.statistics import EdgeStatistics
+from readers.tokenizer import DEFAULT_CHUNK_SIZE, iter_chunks, parse_chunk, \
+    parse_parallel, prefetch, index_dtype
+
+
+def read_mtx(path: str, node_type=str, edge_key_type=int,
+             streaming=True, workers=1) -> Union[Graph, DiGraph]:
     reader = MatrixMarketReader(
         node_type=node_type,
-        edge_key_type=edge_key_type
+        edge_key_type=edge_key_type,
+        streaming=streaming,
+        workers=workers
     )
     glist: List[Union[Graph, DiGraph]] = [reader(path=path)]
     if len(glist) == 0:
@@ -18,16 +29,23 @@ def read_mtx(path: str, node_type=str, edge_key_type=int) -> Union[Graph, DiGrap
 
 
 class MatrixMarketReader:
-    def __init__(self, node_type=str, edge_key_type=int):
+    def __init__(self, node_type=str, edge_key_type=int, streaming=True, workers=1):
         self.node_type = node_type
         self.edge_key_type = edge_key_type
+        self.streaming = streaming
+        self.workers = workers
         self.edge_ids = {}
 
-    def __call__(self, path: str = None, string: str = None):
-        if path is not None:
-            self.mtx = MatrixMarket(file=path)
+    def __call__(self, path: str = None, string: str = None,
+                 mtx: MatrixMarket = None):
+        if mtx is not None:
+            self.mtx = mtx
+        elif path is not None:
+            self.mtx = MatrixMarket(file=path, streaming=self.streaming,
+                                    workers=self.workers)
         elif string is not None:
-            self.mtx = MatrixMarket.from_string(string)
+            self.mtx = MatrixMarket.from_string(string,
+                                                streaming=self.streaming)
 
         if self.mtx.symmetry in (self.mtx.SYMMETRY_GENERAL,):
             graph = DiGraph()
@@ -39,21 +57,87 @@ class MatrixMarketReader:
             raise ValueError(f"Unsupported symmetry '{self.mtx.symmetry}'")
 
         if self.mtx.format == self.mtx.FORMAT_COORDINATE:
-            for coordinate in self.mtx.coordinates:
-                source = self.node_type(coordinate[0])
-                target = self.node_type(coordinate[1])
-                if self.mtx.field == self.mtx.FIELD_PATTERN:
-                    graph.add_edge(source, target)
-                else:
-                    graph.add_edge(source, target,
-                                   weight=coordinate[2])
+            rows, columns, values = self.mtx.coo
+            sources = map(self.node_type, rows.tolist())
+            targets = map(self.node_type, columns.tolist())
+            if values is None:
+                graph.add_edges_from(zip(sources, targets))
+            else:
+                graph.add_weighted_edges_from(
+                    zip(sources, targets, values.tolist())
+                )
         elif self.mtx.format == self.mtx.FORMAT_ARRAY:
-            raise NotImplementedError
+            dense = self.mtx.values
+            rows, columns = np.nonzero(dense)
+            if not graph.is_directed():
+                lower = rows >= columns
+                rows = rows[lower]
+                columns = columns[lower]
+            values = dense[rows, columns]
+            sources = map(self.node_type, (rows + 1).tolist())
+            targets = map(self.node_type, (columns + 1).tolist())
+            graph.add_nodes_from(map(self.node_type, range(1, self.mtx.rows + 1)))
+            graph.add_weighted_edges_from(zip(sources, targets, values.tolist()))
         else:
             raise ValueError(f"Unsupported MatrixMarket "
                              f"format '{self.mtx.format}'.")
         return graph
 
+    def compact(self, path: str = None, string: str = None,
+                mtx: MatrixMarket = None) -> CompactGraph:
+        if mtx is None and path is not None:
+            mtx = MatrixMarket(file=path, streaming=True, workers=self.workers)
+        elif mtx is None and string is not None:
+            mtx = MatrixMarket.from_string(string)
+        if mtx.format != mtx.FORMAT_COORDINATE:
+            self.mtx = mtx
+            return CompactGraph.from_networkx(self(mtx=mtx))
+        self.mtx = mtx
+
+        # Only indices that occur in an entry become nodes, same as when the
+        # entries are added to a networkx graph one by one.
+        rows, columns, values = mtx.coo
+        labels, endpoints = np.unique(np.concatenate((rows, columns)),
+                                      return_inverse=True)
+        endpoints = endpoints.reshape(-1).astype(index_dtype(len(labels)))
+        if self.node_type is str:
+            labels = labels.astype(str)
+        elif self.node_type is not int:
+            labels = np.array([self.node_type(label) for label in labels.tolist()], dtype=object)
+        if values is not None and values.dtype.kind == 'c':
+            raise ValueError("Complex weights are not supported by CompactGraph.")
+        return CompactGraph.from_edges(
+            endpoints[:len(rows)], endpoints[len(rows):], values, len(labels),
+            mtx.symmetry == mtx.SYMMETRY_GENERAL, labels
+        )
+
+
+    def statistics(self, path: str = None, string: str = None) -> EdgeStatistics:
+        # Single streaming pass over the entries, no graph is built.
+        if path is not None:
+            source = open_raw(path)
+            overlap = is_compressed(path)
+        else:
+            source = BytesIO(string.encode())
+            overlap = False
+
+        mtx = MatrixMarket(streaming=True)
+        with source:
+            mtx.parse_preamble(source)
+            if mtx.format != mtx.FORMAT_COORDINATE:
+                mtx.fill(mtx.stream_blocks(source, overlap))
+                self.mtx = mtx
+                return EdgeStatistics.from_compact(self.compact(mtx=mtx))
+
+            if mtx.field == mtx.FIELD_COMPLEX:
+                raise ValueError("Complex weights are not supported by EdgeStatistics.")
+            self.mtx = mtx
+            statistics = EdgeStatistics(mtx.symmetry == mtx.SYMMETRY_GENERAL,
+                                        mtx.value_dtype is not None)
+            for rows, columns, values in mtx.stream_coordinates(source, overlap):
+                statistics.update(rows, columns, values)
+        return statistics.finish()
+
 
 class MatrixMarket:
     MMID = '%%MatrixMarket'
@@ -76,7 +160,11 @@ class MatrixMarket:
     VALID_SYMMETRY = (SYMMETRY_GENERAL, SYMMETRY_HERMITIAN,
                       SYMMETRY_SKEWSYMMETRIC, SYMMETRY_SYMMETRIC)
 
-    def __init__(self, file: str = None):
+    def __init__(self, file: str = None, streaming=True,
+                 chunk_size=DEFAULT_CHUNK_SIZE, workers=1):
+        self.streaming = streaming
+        self.chunk_size = chunk_size
+        self.workers = workers
         self._mmid = None
         self._matrix = None
         self._format = None
@@ -88,7 +176,10 @@ class MatrixMarket:
         self._coordinates: List[
             Tuple[int, int, Union[int, float, complex, bool]]
         ] = None
-        self._values = List[Union[int, float, complex]]
+        self._values: Optional[Union[np.ndarray, List[Union[int, float, complex]]]] = None
+        self._row_indices: Optional[np.ndarray] = None
+        self._column_indices: Optional[np.ndarray] = None
+        self._entry_values: Optional[np.ndarray] = None
         if file:
             self.from_file(file)
 
@@ -137,41 +228,251 @@ class MatrixMarket:
     def entries(self) -> int:
         return self._entries
 
+    @property
+    def entry_width(self) -> int:
+        value_width = 2 if self._field == self.FIELD_COMPLEX else 1
+        if self._format == self.FORMAT_ARRAY:
+            return value_width
+        if self._field == self.FIELD_PATTERN:
+            return 2
+        return 2 + value_width
+
+    @property
+    def token_dtype(self) -> np.dtype:
+        if self._field in (self.FIELD_REAL, self.FIELD_COMPLEX):
+            return np.dtype(np.float64)
+        return np.dtype(np.int64)
+
+    @property
+    def value_dtype(self) -> Optional[np.dtype]:
+        if self._field == self.FIELD_INTEGER:
+            return np.dtype(np.int64)
+        elif self._field == self.FIELD_REAL:
+            return np.dtype(np.float64)
+        elif self._field == self.FIELD_COMPLEX:
+            return np.dtype(np.complex128)
+        elif self._field == self.FIELD_PATTERN:
+            return None
+        else:
+            raise ValueError(f"Invalid field type '{self._field}'")
+
     @property
     def coordinates(self):
+        if self._coordinates is None and self._row_indices is not None:
+            rows = self._row_indices.tolist()
+            columns = self._column_indices.tolist()
+            if self._entry_values is None:
+                self._coordinates = [(row, column, True)
+                                     for row, column in zip(rows, columns)]
+            else:
+                self._coordinates = list(
+                    zip(rows, columns, self._entry_values.tolist())
+                )
         return self._coordinates
 
     @property
-    def values(self):
-        raise NotImplementedError
+    def coo(self) -> Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]:
+        if self._row_indices is None and self._coordinates is not None:
+            dtype = index_dtype(max(self.rows, self.columns))
+            self._row_indices = np.fromiter(
+                (entry[0] for entry in self._coordinates), dtype=dtype,
+                count=len(self._coordinates))
+            self._column_indices = np.fromiter(
+                (entry[1] for entry in self._coordinates), dtype=dtype,
+                count=len(self._coordinates))
+            if self.value_dtype is not None:
+                self._entry_values = np.array(
+                    [entry[2] for entry in self._coordinates],
+                    dtype=self.value_dtype)
+        return self._row_indices, self._column_indices, self._entry_values
+
+    @property
+    def values(self) -> Optional[np.ndarray]:
+        if isinstance(self._values, list):
+            self._values = self.assemble_dense(
+                np.array(self._values, dtype=self.value_dtype)
+            )
         return self._values
 
     @staticmethod
-    def from_string(string: str) -> MatrixMarket:
-        mtx = MatrixMarket()
-        mtx.parse_lines(string.splitlines())
+    def from_string(string: str, streaming=True) -> MatrixMarket:
+        mtx = MatrixMarket(streaming=streaming)
+        if streaming:
+            mtx.parse_stream(BytesIO(string.encode()))
+        else:
+            mtx.parse_lines(string.splitlines())
         return mtx
 
-    def from_file(self, source: Union[TextIOBase, str], parser=None):
+    def from_file(self, source: Union[TextIOBase, BinaryIO, str], parser=None):
+        compressed = not hasattr(source, "read") and is_compressed(source)
+        if self.streaming and self.workers > 1 and \
+                not hasattr(source, "read") and not compressed:
+            self.parse_parallel(source)
+            return
+
         close_source = False
         if not hasattr(source, "read"):
-            source: TextIOBase = open(source, 'r')
+            source = open_raw(source)
             close_source = True
 
         try:
-            self.parse_lines(source.readlines())
+            if self.streaming and not isinstance(source, TextIOBase):
+                self.parse_stream(source, overlap=compressed)
+            else:
+                lines = source.readlines()
+                if lines and isinstance(lines[0], bytes):
+                    lines = [line.decode() for line in lines]
+                self.parse_lines(lines)
         finally:
             if close_source:
                 source.close()
 
-    def parse_lines(self, lines: List[str]):
-        i = 0
+    def parse_preamble(self, source: BinaryIO):
+        header = source.readline().decode()
+        self.parse_header(header)
+
+        line = source.readline()
+        while line.startswith(b'%'):
+            line = source.readline()
+        self.parse_size(line.decode())
+
+    def parse_stream(self, source: BinaryIO, overlap=False):
+        self.parse_preamble(source)
+        self.fill(self.stream_blocks(source, overlap))
+
+    def stream_blocks(self, source: BinaryIO, overlap=False) -> Iterator[np.ndarray]:
+        # Tokenized body blocks of a source positioned right after the preamble.
+        chunks = iter_chunks(source, self.chunk_size)
+        if overlap:
+            chunks = prefetch(chunks)
+        for chunk in chunks:
+            yield parse_chunk(chunk, self.entry_width, dtype=self.token_dtype)
+
+    def stream_coordinates(self, source: BinaryIO, overlap=False) -> \
+            Iterator[Tuple[np.ndarray, np.ndarray, Optional[np.ndarray]]]:
+        # Same entries as 'coo', one block at a time, without keeping them.
+        if self.format != self.FORMAT_COORDINATE:
+            raise ValueError(f"Only '{self.FORMAT_COORDINATE}' entries can be streamed.")
+        width = self.entry_width
+        remaining = self.entries
+        for block in self.stream_blocks(source, overlap):
+            block = block[:remaining]
+            remaining -= len(block)
+            rows = block[:, 0].astype(np.int64)
+            columns = block[:, 1].astype(np.int64)
+            if width == 2:
+                values = None
+            elif width == 4:
+                values = block[:, 2] + 1j * block[:, 3]
+            else:
+                values = block[:, 2]
+            yield rows, columns, values
+            if remaining == 0:
+                break
+
+        if remaining > 0:
+            raise ValueError(f"Missing {remaining} entries.")
+
+    def parse_parallel(self, path: str):
+        # The body is split at line boundaries into one byte range per worker;
+        # the ranges are tokenized in separate processes and stitched back in
+        # file order.
+        with open(path, 'rb') as source:
+            self.parse_preamble(source)
+            start = source.tell()
+        blocks = parse_parallel(path, start, self.entry_width, self.workers,
+                                dtype=self.token_dtype, chunk_size=self.chunk_size)
+        parsed = sum(len(block) for block in blocks)
+        if parsed != self.entries:
+            raise ValueError(f"Parsed {parsed} entries from {len(blocks)} "
+                             f"ranges, expected {self.entries}.")
+        self.fill(blocks)
+
+    def fill(self, blocks: Iterable[np.ndarray]):
+        if self.format == self.FORMAT_COORDINATE:
+            self.fill_coordinates(blocks)
+        elif self.format == self.FORMAT_ARRAY:
+            self.fill_array(blocks)
+        else:
+            raise ValueError(f"Invalid format '{self.format}'")
+
+    def fill_array(self, blocks: Iterable[np.ndarray]):
+        width = self.entry_width
+        flat = np.empty((self.entries, width), dtype=self.token_dtype)
+
+        filled = 0
+        for block in blocks:
+            block = block[:self.entries - filled]
+            flat[filled:filled + len(block)] = block
+            filled += len(block)
+            if filled == self.entries:
+                break
+
+        if filled < self.entries:
+            raise ValueError(f"Missing {self.entries - filled} entries.")
+
+        if width == 2:
+            flat = flat[:, 0] + 1j * flat[:, 1]
+        self._values = self.assemble_dense(flat.reshape(-1))
+
+    def assemble_dense(self, flat: np.ndarray) -> np.ndarray:
+        # Array entries are listed column by column; symmetric storage keeps
+        # only the lower triangle (without the diagonal when skew-symmetric).
+        if self.symmetry == self.SYMMETRY_GENERAL:
+            return flat.reshape((self.rows, self.columns), order='F')
+
+        skew = self.symmetry == self.SYMMETRY_SKEWSYMMETRIC
+        columns, rows = np.triu_indices(self.rows, k=1 if skew else 0)
+        dense = np.zeros((self.rows, self.columns), dtype=flat.dtype)
+        if skew:
+            dense[columns, rows] = -flat
+        elif self.symmetry == self.SYMMETRY_HERMITIAN:
+            dense[columns, rows] = np.conj(flat)
+        else:
+            dense[columns, rows] = flat
+        dense[rows, columns] = flat
+        return dense
+
+    def fill_coordinates(self, blocks: Iterable[np.ndarray]):
+        width = self.entry_width
+        value_dtype = self.value_dtype
+        dtype = index_dtype(max(self.rows, self.columns))
+
+        rows = np.empty(self.entries, dtype=dtype)
+        columns = np.empty(self.entries, dtype=dtype)
+        values = None if value_dtype is None \
+            else np.empty(self.entries, dtype=value_dtype)
+
+        filled = 0
+        for block in blocks:
+            block = block[:self.entries - filled]
+            end = filled + len(block)
+            rows[filled:end] = block[:, 0]
+            columns[filled:end] = block[:, 1]
+            if value_dtype is not None:
+                if width == 4:
+                    values[filled:end].real = block[:, 2]
+                    values[filled:end].imag = block[:, 3]
+                else:
+                    values[filled:end] = block[:, 2]
+            filled = end
+            if filled == self.entries:
+                break
+
+        if filled < self.entries:
+            raise ValueError(f"Missing {self.entries - filled} entries.")
+
+        self._row_indices = rows
+        self._column_indices = columns
+        self._entry_values = values
+
+    def parse_header(self, header: str):
         mmid, matrix, _format, field, symmetry = \
-            [str(part.strip()) for part in lines[i].split()]
+            [str(part.strip()) for part in header.split()]
         if mmid not in self.VALID_MMID:
             raise ValueError('source is not in Matrix Market format')
         if matrix not in self.VALID_MATRIX:
-            raise ValueError("Problem reading file header: " + lines[i])
+            raise ValueError("Problem reading file header: " + header)
         if _format not in self.VALID_FORMAT:
             raise ValueError(f"Invalid format '{_format}'")
         if field not in self.VALID_FIELD:
@@ -185,31 +486,47 @@ class MatrixMarket:
         self._format = _format
         self._field = field
         self._symmetry = symmetry
-        i += 1
 
-        while lines[i].startswith('%'):
-            i += 1
-
-        line = lines[i].split()
+    def parse_size(self, size: str):
+        line = size.split()
         if self.format == self.FORMAT_ARRAY:
-            self._values = list()
             if not len(line) == 2:
                 raise ValueError("Header line not of length 2.")
             rows, cols = map(int, line)
-            entries = rows * cols
+            if self.symmetry == self.SYMMETRY_GENERAL:
+                entries = rows * cols
+            elif rows != cols:
+                raise ValueError("Symmetric matrices must be square.")
+            elif self.symmetry == self.SYMMETRY_SKEWSYMMETRIC:
+                entries = rows * (rows - 1) // 2
+            else:
+                entries = rows * (rows + 1) // 2
         elif self.format == self.FORMAT_COORDINATE:
-            self._coordinates = list()
             if not len(line) == 3:
                 raise ValueError("Header line not of length 3.")
             rows, cols, entries = map(int, line)
         else:
-            raise ValueError(f"Invalid format '{_format}'")
+            raise ValueError(f"Invalid format '{self.format}'")
         self._rows = rows
         self._columns = cols
         self._entries = entries
 
-        len_expected = i + self.entries
+    def parse_lines(self, lines: List[str]):
+        i = 0
+        self.parse_header(lines[i])
+        i += 1
+
+        while lines[i].startswith('%'):
+            i += 1
+
+        self.parse_size(lines[i])
+        if self.format == self.FORMAT_ARRAY:
+            self._values = list()
+        else:
+            self._coordinates = list()
+
         i += 1
+        len_expected = i + self.entries
         try:
             for entry_index in range(i, len_expected):
                 self.process_line(lines[entry_index])
@@ -243,7 +560,12 @@ class MatrixMarket:
                 ))
 
         elif self.format == self.FORMAT_ARRAY:
-            raise NotImplementedError
+            if self.field_type == complex:
+                self.validate_entry_items(items, 2)
+                self._values.append(complex(float(items[0]), float(items[1])))
+            else:
+                self.validate_entry_items(items, 1)
+                self._values.append(self.field_type(items[0]))
         else:
             raise ValueError(f"Invalid format '{self.format}'")
 
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from algorithms.components import union_find_labels
+from algorithms.degrees import Degrees
+from compact_graph import CompactGraph
+
+KEY_BITS = 32
+
+
+def last_unique(keys: np.ndarray, weights: Optional[np.ndarray]) -> \
+        Tuple[np.ndarray, Optional[np.ndarray]]:
+    # Repeated edges keep the weight of their last occurrence, same as
+    # adding them to a networkx graph one by one.
+    unique, first = np.unique(keys[::-1], return_index=True)
+    if weights is None:
+        return unique, None
+    return unique, weights[::-1][first]
+
+
+class EdgeStatistics:
+    # Counts that only need the edge stream. Every block is reduced to packed
+    # (source, target) keys, so the only per-edge state is one int64 key (and
+    # weight) per distinct edge, instead of a whole graph.
+    def __init__(self, directed: bool, weighted: bool,
+                 nodes: Optional[np.ndarray] = None):
+        self._directed = directed
+        self._weighted = weighted
+        self._nodes = nodes
+        self._entry_count = 0
+        self._keys: List[np.ndarray] = []
+        self._weights: List[np.ndarray] = []
+        self._finished = False
+
+        self._node_count = None
+        self._edge_count = None
+        self._self_loop_count = None
+        self._duplicate_count = None
+        self._edge_weights = None
+        self._degrees = None
+        self._component_count = None
+
+    @staticmethod
+    def from_compact(graph: CompactGraph) -> EdgeStatistics:
+        statistics = EdgeStatistics(graph.directed, graph.weighted,
+                                    nodes=np.arange(graph.node_count))
+        statistics.update(*graph.edges())
+        return statistics.finish()
+
+    @property
+    def directed(self) -> bool:
+        return self._directed
+
+    @property
+    def weighted(self) -> bool:
+        return self._weighted
+
+    @property
+    def entry_count(self) -> int:
+        return self._entry_count
+
+    def update(self, sources: np.ndarray, targets: np.ndarray,
+               weights: Optional[np.ndarray] = None):
+        if self._finished:
+            raise ValueError("Statistics are already finished.")
+        if len(sources) == 0:
+            return
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+        if sources.min() < 0 or targets.min() < 0 or \
+                max(sources.max(), targets.max()) >> KEY_BITS:
+            raise ValueError(f"Node ids must fit into {KEY_BITS} bits.")
+        if not self.directed:
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        if self.weighted:
+            if weights is None:
+                raise ValueError("Weighted statistics need a weight for every edge.")
+            weights = np.asarray(weights, dtype=np.float64)
+        else:
+            weights = None
+
+        keys, weights = last_unique((sources << KEY_BITS) | targets, weights)
+        self._entry_count += len(sources)
+        self._keys.append(keys)
+        if weights is not None:
+            self._weights.append(weights)
+
+    def finish(self) -> EdgeStatistics:
+        if self._finished:
+            return self
+        self._finished = True
+
+        keys = np.concatenate(self._keys) if self._keys else np.empty(0, dtype=np.int64)
+        weights = np.concatenate(self._weights) if self._weights else None
+        self._keys = []
+        self._weights = []
+        keys, weights = last_unique(keys, weights)
+
+        sources = keys >> KEY_BITS
+        targets = keys & ((1 << KEY_BITS) - 1)
+        endpoints = np.concatenate((sources, targets))
+        if self._nodes is not None:
+            endpoints = np.concatenate((endpoints, np.asarray(self._nodes, dtype=np.int64)))
+        labels, inverse = np.unique(endpoints, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        sources = inverse[:len(keys)]
+        targets = inverse[len(keys):2 * len(keys)]
+        node_count = len(labels)
+
+        self._node_count = node_count
+        self._edge_count = len(keys)
+        self._self_loop_count = int(np.count_nonzero(sources == targets))
+        self._duplicate_count = self._entry_count - len(keys)
+        self._edge_weights = weights
+        self._degrees = Degrees(sources, targets, node_count, self.directed)
+        self._component_count = int(union_find_labels(sources, targets, node_count).max(initial=-1)) + 1
+        return self
+
+    def _finished_value(self, value):
+        if not self._finished:
+            raise ValueError("Statistics are not finished yet, call 'finish' first.")
+        return value
+
+    @property
+    def node_count(self) -> int:
+        return self._finished_value(self._node_count)
+
+    @property
+    def edge_count(self) -> Union[int, Tuple[int, int]]:
+        edge_count = self._finished_value(self._edge_count)
+        return (edge_count, edge_count) if self.directed else edge_count
+
+    @property
+    def self_loop_count(self) -> int:
+        return self._finished_value(self._self_loop_count)
+
+    @property
+    def duplicate_count(self) -> int:
+        return self._finished_value(self._duplicate_count)
+
+    @property
+    def edge_weights(self) -> Optional[np.ndarray]:
+        return self._finished_value(self._edge_weights)
+
+    @property
+    def weight_sum(self) -> Optional[float]:
+        edge_weights = self.edge_weights
+        return None if edge_weights is None else float(edge_weights.sum())
+
+    @property
+    def weak_component_count(self) -> int:
+        return self._finished_value(self._component_count)
+
+    @property
+    def degrees(self) -> Degrees:
+        return self._finished_value(self._degrees)
+
+    @property
+    def degree(self) -> np.ndarray:
+        return self.degrees.degree
+
+    @property
+    def in_degree(self) -> np.ndarray:
+        return self.degrees.in_degree
+
+    @property
+    def out_degree(self) -> np.ndarray:
+        return self.degrees.out_degree
+
+    @property
+    def avg_edge_count(self) -> Union[float, Tuple[float, float]]:
+        return self.degrees.average
+
+    @property
+    def avg_strength(self) -> Optional[Union[float, Tuple[float, float]]]:
+        if not self.weighted:
+            return None
+        avg_strength = self.weight_sum / self._finished_value(self._edge_count)
+        return (avg_strength, avg_strength) if self.directed else avg_strength
+
+    @property
+    def degree_distribution(self) -> Union[Dict[int, int], Tuple[Dict[int, int], Dict[int, int]]]:
+        return self.degrees.distribution
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import warnings
+from multiprocessing import Pool
+from os import path as os_path
+from queue import Empty, Queue
+from threading import Event, Thread
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 1 << 24
+PREFETCH_DEPTH = 2
+NEWLINE = b'\n'
+
+T = TypeVar('T')
+
+
+def iter_chunks(file: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                limit: Optional[int] = None) -> Iterator[bytes]:
+    # Yields blocks of roughly 'chunk_size' bytes which always end on a line
+    # boundary, so every block can be tokenized on its own. With 'limit' at
+    # most that many bytes are consumed from the current position.
+    remainder = b''
+    while True:
+        if limit is None:
+            block = file.read(chunk_size)
+        else:
+            block = file.read(min(chunk_size, limit))
+            limit -= len(block)
+        if not block:
+            break
+        if remainder:
+            block = remainder + block
+        cut = block.rfind(NEWLINE) + 1
+        if cut == 0:
+            remainder = block
+            continue
+        remainder = block[cut:]
+        yield block[:cut]
+    if remainder.strip():
+        yield remainder
+
+
+def prefetch(items: Iterable[T], depth: int = PREFETCH_DEPTH) -> Iterator[T]:
+    # Pulls from 'items' on a background thread, so reading (and, for
+    # compressed input, decompressing, which releases the GIL) the next chunk
+    # overlaps with tokenizing the current one.
+    queue: Queue = Queue(maxsize=depth)
+    stop = Event()
+    done = object()
+
+    def produce():
+        try:
+            for item in items:
+                if stop.is_set():
+                    return
+                queue.put((item, None))
+        except BaseException as error:
+            queue.put((None, error))
+        else:
+            queue.put((done, None))
+
+    thread = Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = queue.get()
+            if error is not None:
+                raise error
+            if item is done:
+                break
+            yield item
+    finally:
+        # The consumer may stop early; unblock the producer and wait for it,
+        # so the source is not read after the caller closes it.
+        stop.set()
+        while thread.is_alive():
+            try:
+                queue.get_nowait()
+            except Empty:
+                pass
+            thread.join(timeout=0.01)
+
+
+def strip_comments(chunk: bytes, comments: bytes) -> bytes:
+    if comments not in chunk:
+        return chunk
+    return NEWLINE.join(
+        line for line in chunk.split(NEWLINE)
+        if not line.lstrip().startswith(comments)
+    )
+
+
+def parse_chunk(chunk: bytes, columns: int, dtype=np.float64,
+                comments: Optional[bytes] = None) -> np.ndarray:
+    if comments is not None:
+        chunk = strip_comments(chunk, comments)
+    # numpy 2 raises on the first non-numeric token, numpy 1 only warns and
+    # returns what it parsed before it, so the warning is an error too.
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', DeprecationWarning)
+            values = np.fromstring(chunk, dtype=dtype, sep=' ')
+    except (ValueError, DeprecationWarning):
+        raise ValueError("Chunk contains non-numeric entries.")
+    if values.size % columns != 0:
+        raise ValueError(f"Expected {columns} items for every entry, "
+                         f"got {values.size} items in total.")
+    return values.reshape(-1, columns)
+
+
+def index_dtype(upper_bound: int) -> np.dtype:
+    if upper_bound < np.iinfo(np.int32).max:
+        return np.dtype(np.int32)
+    return np.dtype(np.int64)
+
+
+def split_ranges(path: str, start: int, parts: int) -> List[Tuple[int, int]]:
+    # Cuts [start, end of file) into up to 'parts' byte ranges, moving every
+    # inner boundary forward to the beginning of the next line.
+    size = os_path.getsize(path)
+    bounds = [start]
+    with open(path, 'rb') as file:
+        for part in range(1, parts):
+            position = start + (size - start) * part // parts
+            if position <= bounds[-1]:
+                continue
+            file.seek(position - 1)
+            file.readline()
+            position = file.tell()
+            if bounds[-1] < position < size:
+                bounds.append(position)
+    bounds.append(size)
+    return [(begin, end) for begin, end in zip(bounds, bounds[1:]) if end > begin]
+
+
+def parse_range(path: str, start: int, end: int, columns: int, dtype=np.float64,
+                comments: Optional[bytes] = None,
+                chunk_size: int = DEFAULT_CHUNK_SIZE) -> np.ndarray:
+    blocks = []
+    with open(path, 'rb') as file:
+        file.seek(start)
+        for chunk in iter_chunks(file, chunk_size, limit=end - start):
+            blocks.append(parse_chunk(chunk, columns, dtype=dtype, comments=comments))
+    if not blocks:
+        return np.empty((0, columns), dtype=dtype)
+    return np.concatenate(blocks) if len(blocks) > 1 else blocks[0]
+
+
+def parse_parallel(path: str, start: int, columns: int, workers: int, dtype=np.float64,
+                   comments: Optional[bytes] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[np.ndarray]:
+    # Blocks come back in file order.
+    ranges = split_ranges(path, start, workers)
+    if len(ranges) <= 1:
+        return [parse_range(path, begin, end, columns, dtype, comments, chunk_size)
+                for begin, end in ranges]
+    with Pool(min(workers, len(ranges))) as pool:
+        return pool.starmap(parse_range, [
+            (path, begin, end, columns, dtype, comments, chunk_size)
+            for begin, end in ranges
+        ])
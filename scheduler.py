@@ -0,0 +1,145 @@
+from datetime import datetime
+from multiprocessing import Pool
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from graph_measures import GraphMeasures, MeasureError
+
+
+class Task(NamedTuple):
+    # Measures computed together in one worker, they share intermediate
+    # results (triangles, component masks) not worth sending between
+    # processes.
+    measures: Tuple[str, ...]
+    # Tasks whose measures, when they are scheduled as well, are seeded into
+    # the worker first, so this one reuses them instead of recomputing.
+    after: Tuple[str, ...] = ()
+
+
+# The expensive computations behind the measures; everything else is cheap
+# once these are known and is left to the writers.
+TASKS: Dict[str, Task] = {
+    'sweep': Task(('sweep',)),
+    'extremes': Task(('extremes',), after=('sweep',)),
+    'estimates': Task(('shortest_path_length_estimate', 'global_efficiency_estimate'), after=('sweep',)),
+    'top_closeness': Task(('top10_central_closeness',), after=('sweep',)),
+    'betweenness': Task(('betweenness_centrality', 'betweenness_samples')),
+    'clustering': Task(('global_clustering_coefficient', 'avg_clustering_coefficient',
+                        'avg_weighted_clustering_coefficient')),
+    'communities': Task(('community_labels',)),
+}
+
+# The task each measure needs, directly or through the measures it is
+# derived from.
+PROVIDERS: Dict[str, str] = {
+    'sweep': 'sweep',
+    'shortest_path_length': 'sweep',
+    'global_efficiency': 'sweep',
+    'closeness_centrality': 'sweep',
+    'avg_closeness_centrality': 'sweep',
+    'extremes': 'extremes',
+    'diameter': 'extremes',
+    'eccentricity': 'extremes',
+    'radius': 'extremes',
+    'center': 'extremes',
+    'periphery': 'extremes',
+    'shortest_path_length_estimate': 'estimates',
+    'global_efficiency_estimate': 'estimates',
+    'top10_central_closeness': 'top_closeness',
+    'betweenness_centrality': 'betweenness',
+    'betweenness_samples': 'betweenness',
+    'avg_betweenness_centrality': 'betweenness',
+    'top10_central_betweenness': 'betweenness',
+    'global_clustering_coefficient': 'clustering',
+    'avg_clustering_coefficient': 'clustering',
+    'avg_weighted_clustering_coefficient': 'clustering',
+    'community_labels': 'communities',
+    'top10_communities': 'communities',
+    'modularity': 'communities',
+    'top10_community_measures': 'communities',
+}
+
+
+def plan(measures: Iterable[str]) -> List[List[str]]:
+    # Distinct tasks behind 'measures', in waves: every task runs after the
+    # scheduled tasks it reuses.
+    tasks = set()
+    for measure in measures:
+        if not hasattr(GraphMeasures, measure):
+            raise ValueError(f"Invalid measure {measure}.")
+        if measure in PROVIDERS:
+            tasks.add(PROVIDERS[measure])
+
+    waves = []
+    done = set()
+    while tasks:
+        wave = sorted(task for task in tasks if set(TASKS[task].after) & tasks <= done)
+        waves.append(wave)
+        done.update(wave)
+        tasks.difference_update(wave)
+    return waves
+
+
+shared = {}
+
+
+def share_measures(measures: GraphMeasures):
+    # Workers are daemons and cannot start pools of their own.
+    measures.workers = 1
+    shared['measures'] = measures
+
+
+def run_task(measures: GraphMeasures, task: str, seeds: Dict[str, Any]) -> Dict[str, Any]:
+    measures.seed_measures(seeds)
+    values = {}
+    for measure in TASKS[task].measures:
+        try:
+            values[measure] = getattr(measures, measure)
+        except MeasureError:
+            # Not defined for this graph, e.g. weighted clustering.
+            pass
+    return values
+
+
+def shared_task(arguments: Tuple[str, Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+    task, seeds = arguments
+    return task, run_task(shared['measures'], task, seeds)
+
+
+def compute(measures: GraphMeasures, names: Iterable[str], workers: Optional[int] = 1):
+    # Runs every task behind 'names' once, on 'workers' processes (all CPUs
+    # for None), and seeds the results into 'measures'.
+    waves = plan(names)
+    if workers == 1:
+        for wave in waves:
+            for task in wave:
+                run_task(measures, task, {})
+        return
+
+    results: Dict[str, Dict[str, Any]] = {}
+
+    def seeds(task: str) -> Dict[str, Any]:
+        return {measure: value for after in TASKS[task].after if after in results
+                for measure, value in results[after].items()}
+
+    # Loaded and fingerprinted once here, forked workers share both.
+    measures.compact
+    if measures.cache is not None:
+        measures.fingerprint
+    with Pool(workers, initializer=share_measures, initargs=(measures,)) as pool:
+        for wave in waves:
+            for task, values in pool.imap_unordered(shared_task, [(task, seeds(task)) for task in wave]):
+                results[task] = values
+                measures.seed_measures(values)
+
+
+def run_writers(measures: GraphMeasures, name: str,
+                writers: Dict[Callable[[GraphMeasures, str], None], Callable[[GraphMeasures], Tuple[str, ...]]],
+                workers: Optional[int] = 1):
+    # 'writers' maps every writer to the measures it reads; their shared
+    # computations run once, then the writers only format the results.
+    names = [measure for dependencies in writers.values() for measure in dependencies(measures)]
+    print(f"{datetime.now()} - Graph {name}: STARTED - measures")
+    compute(measures, names, workers)
+    print(f"{datetime.now()} - Graph {name}: FINISHED - measures")
+    for writer in writers:
+        writer(measures, name)
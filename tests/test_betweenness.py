@@ -0,0 +1,66 @@
+from typing import Union
+
+import networkx as nx
+import numpy as np
+import pytest
+from networkx import Graph, DiGraph
+
+from algorithms import centrality
+from compact_graph import CompactGraph
+from graph_measures import GraphMeasures
+
+graphs = [
+    nx.karate_club_graph(),
+    nx.gnp_random_graph(200, 0.03, seed=4),
+    nx.gnp_random_graph(150, 0.04, seed=6, directed=True),
+]
+
+ids = [
+    'karate',
+    'gnp',
+    'gnp_directed',
+]
+
+
+class TestBetweenness:
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_exact_matches_networkx(self, graph: Union[Graph, DiGraph]):
+        measures = GraphMeasures(graph)
+        expected = nx.betweenness_centrality(graph)
+        actual = measures.betweenness_centrality
+        labels = measures.compact.labels_of(np.arange(measures.node_count))
+        assert np.allclose(actual, [expected[node] for node in labels])
+        assert measures.betweenness_samples is None
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_parallel_weighted_matches_networkx(self, graph: Union[Graph, DiGraph]):
+        graph = graph.copy()
+        for source, target, data in graph.edges(data=True):
+            data['weight'] = float((source * 7 + target * 3) % 4 + 1) / 2
+        measures = GraphMeasures(graph, weighted_betweenness=True, workers=3)
+        expected = nx.betweenness_centrality(graph, weight='weight')
+        labels = measures.compact.labels_of(np.arange(measures.node_count))
+        assert np.allclose(measures.betweenness_centrality, [expected[node] for node in labels])
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_approximate_within_bound(self, graph: Union[Graph, DiGraph]):
+        epsilon = 0.05
+        compact = CompactGraph.from_networkx(graph)
+        exact = centrality.betweenness_centrality(compact)
+        approximate, samples = centrality.approximate_betweenness_centrality(compact, epsilon, seed=7)
+        assert samples == centrality.betweenness_sample_size(
+            centrality.vertex_diameter_bound(compact), epsilon, centrality.DEFAULT_DELTA
+        )
+        node_count = compact.node_count
+        assert np.abs(approximate - exact).max() <= epsilon * node_count / (node_count - 2)
+
+    def test_shared_vector(self):
+        measures = GraphMeasures(graphs[1], betweenness_epsilon=0.05, seed=3)
+        measures.top10_central_betweenness
+        vector = measures.betweenness_centrality
+        assert measures.avg_betweenness_centrality == pytest.approx(float(np.mean(vector)))
+        assert measures.betweenness_centrality is vector
+        assert measures.betweenness_samples > 0
+
+        again = GraphMeasures(graphs[1], betweenness_epsilon=0.05, seed=3)
+        assert again.top10_central_betweenness == measures.top10_central_betweenness
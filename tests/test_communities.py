@@ -0,0 +1,125 @@
+from typing import Tuple, Union
+
+import networkx as nx
+import numpy as np
+import pytest
+from networkx import Graph, DiGraph
+
+from algorithms import communities
+from compact_graph import CompactGraph
+from graph_measures import GraphMeasures
+from paths import raw_usair97
+from utils import load_raw
+
+graphs = [
+    nx.karate_club_graph(),
+    nx.gnp_random_graph(300, 0.02, seed=1),
+    nx.gnp_random_graph(300, 0.02, seed=2, directed=True),
+    load_raw(raw_usair97),
+]
+
+ids = [
+    'karate',
+    'gnp',
+    'gnp_directed',
+    'usair97',
+]
+
+# Modularity of the networkx Louvain implementation (networkx 3, seed 1),
+# unweighted and weighted; it is not available in the pinned networkx.
+louvain_modularity = [
+    (0.4188, 0.4439),
+    (0.3659, 0.3659),
+    (0.2567, 0.2567),
+    (0.3603, 0.2003),
+]
+
+
+class TestCommunities:
+    @pytest.mark.parametrize('weighted', (False, True), ids=('unweighted', 'weighted'))
+    @pytest.mark.parametrize('graph, louvain', list(zip(graphs, louvain_modularity)), ids=ids)
+    def test_modularity_matches_networkx(self, graph: Union[Graph, DiGraph], louvain: Tuple[float, float],
+                                         weighted: bool):
+        compact = CompactGraph.from_networkx(graph)
+        labels = communities.leiden(compact, weighted=weighted, seed=1)
+        partition = [set(compact.labels_of(members)) for members in communities.community_members(labels)]
+        weight = 'weight' if weighted else None
+        expected = nx.community.modularity(graph, partition, weight=weight)
+        assert communities.modularity(compact, labels, weighted=weighted) == pytest.approx(expected)
+        # At least as good as the networkx Louvain implementation, give or take;
+        # the karate club has no weights in the pinned networkx.
+        assert expected >= louvain[weighted and nx.is_weighted(graph)] - 0.02
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_communities_are_connected(self, graph: Union[Graph, DiGraph]):
+        compact = CompactGraph.from_networkx(graph)
+        labels = communities.leiden(compact, seed=2)
+        undirected = graph.to_undirected()
+        for members in communities.community_members(labels):
+            assert nx.is_connected(undirected.subgraph(compact.labels_of(members)))
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_seed_is_reproducible(self, graph: Union[Graph, DiGraph]):
+        compact = CompactGraph.from_networkx(graph)
+        labels = communities.leiden(compact, seed=3)
+        assert np.array_equal(labels, communities.leiden(compact, seed=3))
+        sizes = np.bincount(labels)
+        assert (sizes[:-1] >= sizes[1:]).all()
+
+    def test_measures_share_labels(self):
+        measures = GraphMeasures(nx.karate_club_graph())
+        labels = measures.community_labels
+        assert set().union(*measures.top10_communities) == set(range(34))
+        assert [len(community) for community in measures.top10_communities] == \
+               [c_measures.node_count for c_measures in measures.top10_community_measures]
+        assert measures.modularity > 0.4
+        assert measures.community_labels is labels
+
+
+# Undirected graphs with sorted adjacency, where networkx breaks betweenness
+# ties in node order as well.
+girvan_newman_graphs = [
+    nx.karate_club_graph(),
+    nx.gnp_random_graph(80, 0.06, seed=2),
+]
+
+girvan_newman_ids = [
+    'karate',
+    'gnp',
+]
+
+
+class TestGirvanNewman:
+    @pytest.mark.parametrize('graph', girvan_newman_graphs, ids=girvan_newman_ids)
+    def test_levels_match_networkx(self, graph: Graph):
+        compact = CompactGraph.from_networkx(graph)
+        dendrogram = communities.girvan_newman(compact)
+        levels = list(nx.community.girvan_newman(graph))
+        assert dendrogram.counts == [len(level) for level in levels]
+        for level in levels:
+            labels = dendrogram.labels(len(level))
+            actual = {frozenset(compact.labels_of(members)) for members in communities.community_members(labels)}
+            assert actual == {frozenset(community) for community in level}
+
+    @pytest.mark.parametrize('graph', girvan_newman_graphs, ids=girvan_newman_ids)
+    def test_partial_run_and_workers(self, graph: Graph):
+        compact = CompactGraph.from_networkx(graph)
+        full = communities.girvan_newman(compact)
+        partial = communities.girvan_newman(compact, 6, workers=2)
+        assert max(partial.counts) == 6
+        for count in range(1, 7):
+            assert np.array_equal(partial.labels(count), full.labels(count))
+        with pytest.raises(ValueError):
+            partial.labels(7)
+
+    def test_measures_use_dendrogram(self):
+        graph = nx.karate_club_graph()
+        measures = GraphMeasures(graph, community_algorithm=communities.GIRVAN_NEWMAN)
+        expected = nx.community.girvan_newman(graph)
+        level = next(level for level in expected if len(level) >= 10)
+        assert {frozenset(community) for community in level} >= \
+               {frozenset(community) for community in measures.top10_communities}
+        assert measures.modularity == pytest.approx(
+            nx.community.modularity(graph, level, weight='weight'))
+        with pytest.raises(ValueError):
+            GraphMeasures(graph, community_algorithm='spectral')
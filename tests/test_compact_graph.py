@@ -0,0 +1,271 @@
+from collections import Counter
+from math import isclose
+from pathlib import Path
+from typing import Union
+
+import networkx as nx
+import numpy as np
+import pytest
+from networkx import Graph, DiGraph
+
+from algorithms import sampling
+from algorithms.components import ComponentIndex
+from algorithms.traversal import UNREACHED, bfs_distances, multi_source_bfs, popcount, word_bits
+from compact_graph import CompactGraph
+from graph_measures import GraphMeasures, global_efficiency_directional
+from measure_cache import MeasureCache
+
+graphs = [
+    nx.karate_club_graph(),
+    nx.gnp_random_graph(80, 0.04, seed=1),
+    nx.gnp_random_graph(60, 0.05, seed=3, directed=True),
+]
+for graph in graphs:
+    for _, _, data in graph.edges(data=True):
+        data.pop('weight', None)
+
+ids = [
+    'karate',
+    'gnp',
+    'gnp_directed',
+]
+
+
+class TestCompactGraph:
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_round_trip(self, graph: Union[Graph, DiGraph]):
+        compact = CompactGraph.from_networkx(graph)
+        assert compact.indices.dtype == np.int32
+        assert compact.node_count == graph.number_of_nodes()
+        assert compact.edge_count == graph.number_of_edges()
+        restored = compact.to_networkx()
+        assert restored.number_of_edges() == graph.number_of_edges()
+        assert all(restored.has_edge(source, target) for source, target in graph.edges)
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_degrees(self, graph: Union[Graph, DiGraph]):
+        compact = CompactGraph.from_networkx(graph)
+        labels = compact.labels_of(np.arange(compact.node_count))
+        assert compact.degree().tolist() == [graph.degree(node) for node in labels]
+        if graph.is_directed():
+            assert compact.in_degree().tolist() == [graph.in_degree(node) for node in labels]
+            assert compact.out_degree().tolist() == [graph.out_degree(node) for node in labels]
+
+    @pytest.mark.parametrize('measure', [
+        'node_count',
+        'edge_count',
+        'avg_edge_count',
+        'component_count',
+        'diameter',
+        'eccentricity',
+        'global_efficiency',
+        'global_clustering_coefficient',
+        'avg_clustering_coefficient',
+        'degree_assortativity',
+        'degree_distribution',
+        'avg_closeness_centrality',
+        'avg_betweenness_centrality',
+    ])
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_measures_match_networkx(self, graph: Union[Graph, DiGraph], measure: str):
+        expected = getattr(GraphMeasures(graph), measure)
+        actual = getattr(GraphMeasures(CompactGraph.from_networkx(graph)), measure)
+        if isinstance(expected, float):
+            assert isclose(actual, expected, rel_tol=1e-9)
+        else:
+            assert actual == expected
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_top10_labels(self, graph: Union[Graph, DiGraph]):
+        expected = GraphMeasures(graph)
+        actual = GraphMeasures(CompactGraph.from_networkx(graph))
+        for measure in ('top10_central_degree', 'top10_central_betweenness', 'top10_central_closeness'):
+            expected_top = getattr(expected, measure)
+            actual_top = getattr(actual, measure)
+            assert [node for node, _ in actual_top] == [node for node, _ in expected_top]
+            for (_, actual_value), (_, expected_value) in zip(actual_top, expected_top):
+                assert isclose(actual_value, expected_value, rel_tol=1e-9)
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_extremes_match_networkx(self, graph: Union[Graph, DiGraph]):
+        components = nx.strongly_connected_components(graph) if graph.is_directed() \
+            else nx.connected_components(graph)
+        largest_component = graph.subgraph(max(components, key=len))
+        eccentricities = nx.eccentricity(largest_component)
+        measures = GraphMeasures(CompactGraph.from_networkx(graph))
+        assert measures.diameter == nx.diameter(largest_component, e=eccentricities)
+        assert measures.radius == nx.radius(largest_component, e=eccentricities)
+        assert sorted(measures.center) == sorted(nx.center(largest_component, e=eccentricities))
+        assert sorted(measures.periphery) == sorted(nx.periphery(largest_component, e=eccentricities))
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_sweep_matches_networkx(self, graph: Union[Graph, DiGraph]):
+        components = nx.weakly_connected_components(graph) if graph.is_directed() \
+            else nx.connected_components(graph)
+        largest_component = graph.subgraph(max(components, key=len))
+        closeness = nx.closeness_centrality(graph)
+        measures = GraphMeasures(graph)
+        lengths = [length for _, targets in nx.all_pairs_shortest_path_length(largest_component)
+                   for length in targets.values() if length > 0]
+        size = len(largest_component)
+        assert isclose(measures.shortest_path_length, sum(lengths) / (size * (size - 1)), rel_tol=1e-9)
+        sweep = measures.sweep
+        assert isclose(measures.global_efficiency, global_efficiency_directional(graph), rel_tol=1e-9)
+        assert isclose(measures.avg_closeness_centrality, np.mean(list(closeness.values())), rel_tol=1e-9)
+        assert measures.diameter == max(nx.eccentricity(
+            graph.subgraph(max(nx.strongly_connected_components(graph), key=len))
+            if graph.is_directed() else largest_component
+        ).values())
+        assert measures.radius == min(nx.eccentricity(
+            graph.subgraph(max(nx.strongly_connected_components(graph), key=len))
+            if graph.is_directed() else largest_component
+        ).values())
+        assert measures.sweep is sweep
+
+    def test_directed_path_length_counts_unreachable_pairs(self):
+        # As networkx 2.4 on the largest weak component: 0 -> 1 -> 2 has
+        # distances 1, 1 and 2 over its 6 ordered pairs, 3 is left out.
+        graph = nx.DiGraph([(0, 1), (1, 2), (3, 4)])
+        measures = GraphMeasures(CompactGraph.from_networkx(graph))
+        assert measures.shortest_path_length == pytest.approx(4 / 6)
+        assert measures.shortest_path_length_estimate.value == pytest.approx(4 / 6)
+        estimate = sampling.average_shortest_path_length(
+            measures.compact, measures.component_index.largest_mask(False), relative_error=0)
+        assert estimate.exact and estimate.value == pytest.approx(4 / 6)
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_top_closeness_matches_networkx(self, graph: Union[Graph, DiGraph]):
+        expected = nx.closeness_centrality(graph)
+        top = GraphMeasures(CompactGraph.from_networkx(graph)).top10_central_closeness
+        assert [node for node, _ in top] == [node for node, _ in
+                                             sorted(expected.items(), key=lambda item: -item[1])[:10]]
+        for node, value in top:
+            assert isclose(value, expected[node], rel_tol=1e-9)
+
+    @pytest.mark.parametrize('weighted', (False, True), ids=('unweighted', 'weighted'))
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_clustering_matches_networkx(self, graph: Union[Graph, DiGraph], weighted: bool):
+        graph = graph.copy()
+        graph.add_edge(0, 0)
+        if weighted:
+            for source, target, data in graph.edges(data=True):
+                data['weight'] = float((source * 7 + target * 3) % 5 + 1)
+        measures = GraphMeasures(CompactGraph.from_networkx(graph))
+        weight = 'weight' if weighted else None
+        assert isclose(measures.global_clustering_coefficient, nx.transitivity(graph), rel_tol=1e-9)
+        assert isclose(measures.avg_clustering_coefficient, nx.average_clustering(graph), rel_tol=1e-9)
+        labels = measures.compact.labels_of(np.arange(measures.node_count))
+        triangles = nx.triangles(graph.to_undirected())
+        assert measures.triangles.counts().tolist() == [triangles[node] for node in labels]
+        if weighted:
+            assert isclose(measures.avg_weighted_clustering_coefficient,
+                           nx.average_clustering(graph, weight=weight), rel_tol=1e-9)
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_degree_statistics_match_networkx(self, graph: Union[Graph, DiGraph]):
+        graph = graph.copy()
+        graph.add_edge(0, 0)
+        measures = GraphMeasures(CompactGraph.from_networkx(graph))
+        assert isclose(measures.degree_assortativity, nx.degree_assortativity_coefficient(graph), rel_tol=1e-9)
+        if graph.is_directed():
+            for (x, y), assortativity in measures.directed_degree_assortativity.items():
+                assert isclose(assortativity, nx.degree_assortativity_coefficient(graph, x=x, y=y), rel_tol=1e-9)
+            assert measures.degree_distribution == (
+                dict(Counter(degree for _, degree in graph.in_degree())),
+                dict(Counter(degree for _, degree in graph.out_degree()))
+            )
+            assert measures.avg_edge_count == pytest.approx(
+                (np.mean([degree for _, degree in graph.in_degree()]),
+                 np.mean([degree for _, degree in graph.out_degree()])))
+        else:
+            assert measures.degree_distribution == dict(Counter(degree for _, degree in graph.degree()))
+            assert measures.avg_edge_count == pytest.approx(np.mean([degree for _, degree in graph.degree()]))
+            assert measures.degree_arrays.moment(2) == pytest.approx(
+                np.mean([degree ** 2 for _, degree in graph.degree()]))
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_component_index_matches_networkx(self, graph: Union[Graph, DiGraph]):
+        compact = CompactGraph.from_networkx(graph)
+        index = ComponentIndex(compact)
+        for strong in (False, True):
+            if strong and graph.is_directed():
+                expected = list(nx.strongly_connected_components(graph))
+            else:
+                expected = list(nx.weakly_connected_components(graph) if graph.is_directed()
+                                else nx.connected_components(graph))
+            labels = index.labels(strong)
+            actual = {frozenset(compact.labels_of(np.flatnonzero(labels == label)))
+                      for label in range(index.count(strong))}
+            assert actual == {frozenset(component) for component in expected}
+            assert index.sizes(strong).sum() == compact.node_count
+            largest = index.largest_mask(strong)
+            assert largest.sum() == max(len(component) for component in expected)
+            assert index.largest_mask(strong) is largest
+        measures = GraphMeasures(graph)
+        if graph.is_directed():
+            assert measures.strongly_connected == nx.is_strongly_connected(graph)
+            dag = index.condensation
+            expected = nx.condensation(graph)
+            assert dag.node_count == expected.number_of_nodes()
+            assert dag.edge_count == expected.number_of_edges()
+            sources, targets, _ = dag.edges()
+            assert (sources > targets).all()
+        else:
+            assert measures.connected == nx.is_connected(graph)
+            with pytest.raises(ValueError):
+                index.condensation
+
+    def test_child_measures_keep_settings(self, tmp_path: Path):
+        graph = nx.disjoint_union(nx.karate_club_graph(), nx.path_graph(3))
+        measures = GraphMeasures(CompactGraph.from_networkx(graph), relative_error=0.05, seed=7,
+                                 betweenness_epsilon=0.1, workers=2, distance_weights='strength',
+                                 cache=MeasureCache(tmp_path))
+        settings = ('relative_error', 'confidence', 'time_budget', 'seed', 'betweenness_epsilon',
+                    'betweenness_delta', 'weighted_betweenness', 'workers', 'community_algorithm',
+                    'distance_weights', 'cache')
+        children = (measures.largest_component_measures,) + measures.top10_community_measures
+        assert measures.largest_component_measures is not measures
+        for child in children:
+            for setting in settings:
+                assert getattr(child, setting) == getattr(measures, setting)
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_multi_source_bfs_matches_bfs(self, graph: Union[Graph, DiGraph]):
+        compact = CompactGraph.from_networkx(graph)
+        # More sources than one word holds, in no particular order.
+        sources = np.random.default_rng(0).permutation(compact.node_count)[:70]
+        expected = np.array([bfs_distances(compact.indptr, compact.indices, source) for source in sources])
+        actual = np.full(expected.shape, UNREACHED, dtype=np.int64)
+        actual[np.arange(len(sources)), sources] = 0
+        for level, nodes, words in multi_source_bfs(compact.indptr, compact.indices, sources):
+            bits = word_bits(words, len(sources))
+            assert (popcount(words) == bits.sum(axis=1)).all()
+            for node, reached in zip(nodes, bits):
+                actual[reached, node] = level
+        assert np.array_equal(actual, expected)
+
+    @pytest.mark.parametrize('mode', ('distance', 'strength'))
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_weighted_distances_match_networkx(self, graph: Union[Graph, DiGraph], mode: str):
+        graph = graph.copy()
+        for source, target, data in graph.edges(data=True):
+            data['weight'] = float((source * 7 + target * 3) % 5 + 1) / 4
+        measures = GraphMeasures(CompactGraph.from_networkx(graph), distance_weights=mode, workers=2)
+        lengths = graph.copy()
+        if mode == 'strength':
+            for _, _, data in lengths.edges(data=True):
+                data['weight'] = 1 / data['weight']
+        components = nx.strongly_connected_components(lengths) if graph.is_directed() \
+            else nx.connected_components(lengths)
+        largest = lengths.subgraph(max(components, key=len))
+        assert isclose(measures.diameter, nx.diameter(largest, weight='weight'), rel_tol=1e-9)
+        assert isclose(measures.radius, nx.radius(largest, weight='weight'), rel_tol=1e-9)
+        if not graph.is_directed():
+            assert isclose(measures.shortest_path_length,
+                           nx.average_shortest_path_length(largest, weight='weight'), rel_tol=1e-9)
+        closeness = nx.closeness_centrality(lengths, distance='weight')
+        assert isclose(measures.avg_closeness_centrality, np.mean(list(closeness.values())), rel_tol=1e-9)
+        assert [node for node, _ in measures.top10_central_closeness] == \
+               [node for node, _ in sorted(closeness.items(), key=lambda item: -item[1])[:10]]
+        with pytest.raises(ValueError):
+            GraphMeasures(graph, distance_weights='hops')
@@ -0,0 +1,62 @@
+from os import utime
+from pathlib import Path
+
+from convert import convert_all, load_manifest, STATUS_CONVERTED, STATUS_SKIPPED
+from paths import suffix_csr, suffix_graphml
+
+POWER_HEAD = \
+    '%%MatrixMarket matrix coordinate pattern symmetric\n' \
+    '4 4 3\n' \
+    '2 1\n' \
+    '3 2\n' \
+    '4 3\n'
+
+
+class TestConvert:
+    def setup_raw(self, tmp_path: Path) -> Path:
+        raw = tmp_path / 'raw'
+        raw.mkdir()
+        (raw / 'small.mtx').write_text(POWER_HEAD)
+        (raw / 'flights.edges').write_text('% asym unweighted\n% 2 3 3\n1 2\n2 3\n')
+        (raw / 'notes.txt').write_text('ignored')
+        processed = tmp_path / 'processed'
+        processed.mkdir()
+        return raw
+
+    def test_warm_run_skips(self, tmp_path: Path):
+        raw = self.setup_raw(tmp_path)
+        processed = tmp_path / 'processed'
+
+        statuses = convert_all(raw, processed, suffix_csr, workers=2)
+        assert statuses == {'small.csr': STATUS_CONVERTED, 'flights.csr': STATUS_CONVERTED}
+        assert (processed / 'small.csr').exists()
+        assert (processed / 'flights.csr').exists()
+
+        statuses = convert_all(raw, processed, suffix_csr, workers=2)
+        assert statuses == {'small.csr': STATUS_SKIPPED, 'flights.csr': STATUS_SKIPPED}
+        assert load_manifest(processed / 'manifest.json')['small.csr']['status'] == STATUS_SKIPPED
+
+    def test_formats_tracked_separately(self, tmp_path: Path):
+        raw = self.setup_raw(tmp_path)
+        raw.joinpath('flights.edges').unlink()
+        processed = tmp_path / 'processed'
+
+        convert_all(raw, processed, suffix_csr, workers=1)
+        statuses = convert_all(raw, processed, suffix_graphml, workers=1)
+        assert statuses == {'small.graphml': STATUS_CONVERTED}
+
+    def test_touched_and_modified(self, tmp_path: Path):
+        raw = self.setup_raw(tmp_path)
+        raw.joinpath('flights.edges').unlink()
+        processed = tmp_path / 'processed'
+        mtx = raw / 'small.mtx'
+        convert_all(raw, processed, suffix_csr, workers=1)
+
+        utime(mtx, ns=(0, 10**9))
+        assert convert_all(raw, processed, suffix_csr, workers=1) == {'small.csr': STATUS_SKIPPED}
+
+        mtx.write_text(POWER_HEAD.replace('4 3\n', '4 1\n'))
+        assert convert_all(raw, processed, suffix_csr, workers=1) == {'small.csr': STATUS_CONVERTED}
+
+        (processed / 'small.csr').unlink()
+        assert convert_all(raw, processed, suffix_csr, workers=1) == {'small.csr': STATUS_CONVERTED}
@@ -9,7 +9,7 @@ from graph_measures import GraphMeasures, MeasureError
 from paths import processed_openflights, processed_power, \
     processed_roadmap_pa, processed_roadnet_ca, \
     processed_usair97
-from utils import load_graphml
+from utils import load_processed
 
 ids = [
     'openflights',
@@ -50,7 +50,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_basic_measures(self, graph_path: Path, expected: Any):
-        measure = GraphMeasures(load_graphml(graph_path))
+        measure = GraphMeasures(load_processed(graph_path))
         if measure.directed:
             measure.strongly_connected
             measure.weakly_connected
@@ -71,7 +71,7 @@ class TestGraphProperties:
         (processed_usair97, 332)
     ], ids=ids)
     def test_node_count(self, graph_path: Path, expected: int):
-        measure = GraphMeasures(load_graphml(graph_path))
+        measure = GraphMeasures(load_processed(graph_path))
         assert isclose(measure.node_count, expected, rel_tol=0.1)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -82,7 +82,7 @@ class TestGraphProperties:
         (processed_usair97, 2.1e3)
     ], ids=ids)
     def test_edge_count(self, graph_path: Path, expected: int):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isclose(measures.edge_count, expected, rel_tol=0.1)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -93,7 +93,7 @@ class TestGraphProperties:
         (processed_usair97, 12)
     ], ids=ids)
     def test_avg_edge_count(self, graph_path: Path, expected: Any):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         if measures.directed:
             assert trunc(sum(measures.avg_edge_count)) == expected
         else:
@@ -107,7 +107,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_avg_strength(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         if measures.weighted:
             if measures.directed:
                 avg_strength_in, avg_strength_out = measures.avg_strength
@@ -127,7 +127,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_component_count(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.component_count, int)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -138,7 +138,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_largest_component_measures(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.largest_component_measures.node_count, int)
         assert isinstance(measures.largest_component_measures.edge_count, int)
         if measures.largest_component_measures.directed:
@@ -154,7 +154,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_shortest_path_length(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.shortest_path_length, (int, float))
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -165,7 +165,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_diameter(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.diameter, int)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -176,7 +176,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_eccentricity(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.eccentricity, (int, float))
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -187,7 +187,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_global_efficiency(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.global_efficiency, float)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -198,7 +198,7 @@ class TestGraphProperties:
         (processed_usair97, 0.396392)
     ], ids=ids)
     def test_global_clustering_coefficient(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isclose(measures.global_clustering_coefficient, expected, rel_tol=0.12)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -209,7 +209,7 @@ class TestGraphProperties:
         (processed_usair97, 0.625217)
     ], ids=ids)
     def test_avg_clustering_coefficient(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isclose(measures.avg_clustering_coefficient, expected, rel_tol=0.12)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -221,7 +221,7 @@ class TestGraphProperties:
 
     ], ids=ids)
     def test_degree_assortativity(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.degree_assortativity, float)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -232,7 +232,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_degree_distribution(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         if measures.directed:
             assert isinstance(measures.degree_distribution, tuple)
             assert len(measures.degree_distribution) == 2
@@ -258,7 +258,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_top10_central_degree(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         dc = measures.top10_central_degree
         assert len(dc) == 10
         for item in dc:
@@ -274,7 +274,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_top10_central_betweenness(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         bc = measures.top10_central_betweenness
         assert len(bc) == 10
         for item in bc:
@@ -290,7 +290,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_top10_central_closeness(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         cc = measures.top10_central_closeness
         assert len(cc) == 10
         for item in cc:
@@ -306,7 +306,7 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_avg_closeness_centrality(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.avg_closeness_centrality, float)
 
     @pytest.mark.parametrize('graph_path, expected', [
@@ -317,5 +317,5 @@ class TestGraphProperties:
         (processed_usair97, None)
     ], ids=ids)
     def test_avg_betweenness_centrality(self, graph_path: Path, expected):
-        measures = GraphMeasures(load_graphml(graph_path))
+        measures = GraphMeasures(load_processed(graph_path))
         assert isinstance(measures.avg_betweenness_centrality, float)
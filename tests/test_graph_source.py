@@ -0,0 +1,87 @@
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from graph_measures import GraphMeasures
+from graph_source import GraphSource, REPRESENTATION_COMPACT, REPRESENTATION_NETWORKX, \
+    REPRESENTATION_STATISTICS
+from paths import raw_openflights, raw_power, raw_usair97
+from utils import load_raw, load_raw_compact
+
+raw_paths = [
+    raw_openflights,
+    raw_power,
+    raw_usair97,
+]
+
+ids = [
+    'openflights',
+    'power',
+    'usair97',
+]
+
+
+class TestGraphSource:
+    @pytest.mark.parametrize('raw_path', raw_paths, ids=ids)
+    def test_degree_measures_load_statistics_only(self, raw_path: Path):
+        source = GraphSource(raw_path, verbose=False)
+        lazy = GraphMeasures(source)
+        expected = GraphMeasures(load_raw(raw_path))
+        for measure in ('directed', 'weighted', 'node_count', 'edge_count',
+                        'avg_edge_count', 'degree_distribution'):
+            assert getattr(lazy, measure) == pytest.approx(getattr(expected, measure))
+        assert source.loaded(REPRESENTATION_STATISTICS)
+        assert not source.loaded(REPRESENTATION_COMPACT)
+        assert not source.loaded(REPRESENTATION_NETWORKX)
+
+    @pytest.mark.parametrize('raw_path', raw_paths, ids=ids)
+    def test_adjacency_loads_compact(self, tmp_path: Path, raw_path: Path):
+        processed_path = tmp_path / f"{raw_path.stem}.csr"
+        load_raw_compact(raw_path).to_binary().dump(processed_path)
+        source = GraphSource(processed_path, verbose=False)
+        lazy = GraphMeasures(source)
+        expected = GraphMeasures(load_raw_compact(raw_path))
+        assert lazy.degree_assortativity == pytest.approx(expected.degree_assortativity)
+        assert lazy.node_count == expected.node_count
+        assert source.loaded(REPRESENTATION_COMPACT)
+        assert not source.loaded(REPRESENTATION_NETWORKX)
+        assert source.reports[REPRESENTATION_COMPACT].seconds >= 0
+
+    def test_custom_loader(self):
+        calls = []
+
+        def loader(path: Path):
+            calls.append(path)
+            return load_raw_compact(path)
+
+        source = GraphSource(raw_usair97, loaders={REPRESENTATION_COMPACT: loader}, verbose=False)
+        assert GraphMeasures(source).global_clustering_coefficient > 0
+        assert calls == [raw_usair97]
+
+    def test_memory_is_profiled_on_request(self):
+        source = GraphSource(raw_usair97, verbose=False)
+        source.compact
+        report = source.reports[REPRESENTATION_COMPACT]
+        assert report.allocated is None and report.peak is None
+        assert not tracemalloc.is_tracing()
+
+        source = GraphSource(raw_usair97, verbose=False, profile=True)
+        source.compact
+        report = source.reports[REPRESENTATION_COMPACT]
+        assert report.allocated > 0 and report.peak >= report.allocated
+        assert not tracemalloc.is_tracing()
+
+        # The caller's tracer keeps running with its peak untouched.
+        tracemalloc.start()
+        try:
+            ballast = bytearray(1 << 26)
+            del ballast
+            _, peak = tracemalloc.get_traced_memory()
+            source = GraphSource(raw_usair97, verbose=False, profile=True)
+            source.statistics
+            assert tracemalloc.is_tracing()
+            assert tracemalloc.get_traced_memory()[1] == peak
+            assert source.reports[REPRESENTATION_STATISTICS].peak is None
+        finally:
+            tracemalloc.stop()
@@ -0,0 +1,117 @@
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Tuple
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from algorithms.sampling import Estimate
+from compact_graph import CompactGraph
+from graph_measures import GraphMeasures
+from graph_source import GraphSource, REPRESENTATION_COMPACT
+from measure_cache import MeasureCache, graph_fingerprint
+from paths import raw_usair97
+
+PROCESSES = 8
+PUTS = 20
+
+
+def put_many(arguments: Tuple[Path, int]):
+    directory, process = arguments
+    cache = MeasureCache(directory)
+    for put in range(PUTS):
+        cache.put('graph', f"{process}-{put}", {}, np.full(10, put))
+        assert cache.get('graph', f"{process}-{put}", {}) is not None
+
+
+class TestMeasureCache:
+    def test_round_trip(self, tmp_path: Path):
+        cache = MeasureCache(tmp_path)
+        values = {
+            'vector': np.arange(10, dtype=np.float64),
+            'scalar': 0.5,
+            'top': [('a', 1.0), ('b', 0.5)],
+            'estimate': Estimate(1.0, 0.9, 1.1, 0.95, 10, 100),
+        }
+        for measure, value in values.items():
+            cache.put('graph', measure, {'seed': 0}, value)
+        assert len(cache) == len(values)
+        assert np.array_equal(cache.get('graph', 'vector', {'seed': 0}), values['vector'])
+        for measure in ('scalar', 'top', 'estimate'):
+            assert cache.get('graph', measure, {'seed': 0}) == values[measure]
+        assert cache.get('graph', 'scalar', {'seed': 1}) is None
+        assert cache.get('other', 'scalar', {'seed': 0}) is None
+        assert sorted(path.suffix for path in tmp_path.iterdir()) == \
+               ['.json', '.lock', '.npy', '.pickle', '.pickle', '.pickle']
+
+    def test_eviction_and_invalidation(self, tmp_path: Path):
+        cache = MeasureCache(tmp_path, max_bytes=2000)
+        for measure in ('first', 'second', 'third'):
+            cache.put('graph', measure, {}, np.zeros(100))
+        # Only two vectors of 928 bytes fit, the least recently used goes.
+        assert cache.get('graph', 'first', {}) is None
+        cache.get('graph', 'second', {})
+        cache.put('graph', 'fourth', {}, np.zeros(100))
+        assert cache.get('graph', 'third', {}) is None
+        assert cache.get('graph', 'second', {}) is not None
+        assert cache.size <= 2000
+        cache.put('graph', 'huge', {}, np.zeros(1000))
+        assert cache.get('graph', 'huge', {}) is None
+
+        cache.put('other', 'second', {}, 1.0)
+        assert cache.invalidate(measure='second') == 2
+        assert cache.invalidate(graph='graph') == 1
+        assert len(cache) == 0
+        assert sorted(path.name for path in tmp_path.iterdir()) == ['index.json', 'index.lock']
+
+    def test_processes_share_directory(self, tmp_path: Path):
+        with Pool(PROCESSES) as pool:
+            pool.map(put_many, [(tmp_path, process) for process in range(PROCESSES)])
+        cache = MeasureCache(tmp_path)
+        assert len(cache) == PROCESSES * PUTS
+        assert len(list(tmp_path.glob('*.npy'))) == PROCESSES * PUTS
+        assert cache.load_index()['uses'] == 2 * PROCESSES * PUTS
+
+    def test_orphans_are_removed(self, tmp_path: Path):
+        cache = MeasureCache(tmp_path)
+        cache.put('graph', 'kept', {}, np.zeros(10))
+        (tmp_path / f"{'0' * 64}.npy").write_bytes(b'')
+        (tmp_path / f"{'1' * 64}.pickle").write_bytes(b'')
+        assert cache.invalidate(measure='other') == 0
+        assert sorted(path.suffix for path in tmp_path.iterdir()) == ['.json', '.lock', '.npy']
+        assert cache.get('graph', 'kept', {}) is not None
+
+    def test_measures_load_from_cache(self, tmp_path: Path):
+        cache = MeasureCache(tmp_path)
+        graph = nx.karate_club_graph()
+        measures = GraphMeasures(graph, cache=cache)
+        expected = measures.avg_clustering_coefficient
+        labels = measures.community_labels
+        fingerprint = graph_fingerprint(CompactGraph.from_networkx(graph))
+        assert measures.fingerprint == fingerprint
+        assert cache.get(fingerprint, 'avg_clustering_coefficient', {}) == expected
+
+        # Stored values are returned as they are, without recomputing.
+        cache.put(fingerprint, 'avg_clustering_coefficient', {}, 0.25)
+        cached = GraphMeasures(graph, cache=cache)
+        assert cached.avg_clustering_coefficient == 0.25
+        assert np.array_equal(cached.community_labels, labels)
+        GraphMeasures(graph, cache=cache, seed=5).community_labels
+        assert len(cache) == 3
+        assert GraphMeasures(graph).avg_clustering_coefficient == pytest.approx(expected)
+
+    def test_source_is_not_loaded_on_hit(self, tmp_path: Path):
+        cache = MeasureCache(tmp_path / 'cache')
+        path = tmp_path / f"{raw_usair97.name}"
+        path.write_bytes(raw_usair97.read_bytes())
+        expected = GraphMeasures(GraphSource(path, verbose=False), cache=cache).top10_central_closeness
+
+        source = GraphSource(path, verbose=False)
+        measures = GraphMeasures(source, cache=cache)
+        assert measures.top10_central_closeness == expected
+        assert not source.loaded(REPRESENTATION_COMPACT)
+
+        with path.open('a') as file:
+            file.write('% changed\n')
+        assert GraphMeasures(GraphSource(path, verbose=False), cache=cache).fingerprint != measures.fingerprint
@@ -0,0 +1,239 @@
+import bz2
+import gzip
+import lzma
+import tarfile
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from paths import raw_openflights, raw_power, raw_usair97
+from readers.compression import dataset_stem, dataset_suffix, detect_compression
+from readers.edges import EdgesReader, read_edges
+from graph_measures import GraphMeasures, MeasureError
+from readers.matrix_market import MatrixMarket, MatrixMarketReader
+from readers.tokenizer import parse_chunk
+from utils import load_raw, load_raw_statistics
+
+ids = [
+    'power',
+    'usair97',
+]
+
+
+def fromstring_numpy_1(string, dtype=float, sep=''):
+    # np.fromstring of numpy 1: a warning and the values parsed before the
+    # first non-numeric token.
+    values = []
+    for token in string.split():
+        try:
+            values.append(float(token))
+        except ValueError:
+            warnings.warn('string or file could not be read to its end', DeprecationWarning)
+            break
+    return np.array(values, dtype=dtype)
+
+
+class TestMatrixMarket:
+    @pytest.mark.parametrize('mtx_path, expected', [
+        (raw_power, 6594),
+        (raw_usair97, 2126)
+    ], ids=ids)
+    def test_streaming_matches_lines(self, mtx_path: Path, expected: int):
+        streamed = MatrixMarket(mtx_path.as_posix(), chunk_size=97)
+        lines = MatrixMarket(mtx_path.as_posix(), streaming=False)
+        rows, columns, values = streamed.coo
+        assert len(rows) == len(columns) == expected
+        assert streamed.coordinates == lines.coordinates
+
+    @pytest.mark.parametrize('mtx_path', [raw_power, raw_usair97], ids=ids)
+    def test_parallel_matches_streaming(self, mtx_path: Path):
+        streamed = MatrixMarket(mtx_path.as_posix())
+        parallel = MatrixMarket(mtx_path.as_posix(), workers=3, chunk_size=1021)
+        for expected, actual in zip(streamed.coo, parallel.coo):
+            assert np.array_equal(expected, actual)
+
+    def test_streaming_complex(self):
+        mtx = MatrixMarket.from_string(
+            "%%MatrixMarket matrix coordinate complex general\n"
+            "% comment\n"
+            "3 3 2\n"
+            "1 2 1.5 -2\n"
+            "3 1 0 1\n"
+        )
+        rows, columns, values = mtx.coo
+        assert rows.tolist() == [1, 3]
+        assert columns.tolist() == [2, 1]
+        assert np.array_equal(values, np.array([1.5 - 2j, 1j]))
+
+    def test_streaming_missing_entries(self):
+        with pytest.raises(ValueError):
+            MatrixMarket.from_string(
+                "%%MatrixMarket matrix coordinate pattern symmetric\n"
+                "3 3 3\n"
+                "1 2\n"
+                "2 3\n"
+            )
+
+    @pytest.mark.parametrize('numpy_1', [False, True], ids=['numpy', 'numpy_1'])
+    def test_non_numeric_chunk(self, monkeypatch, numpy_1: bool):
+        if numpy_1:
+            # numpy 1 warns and returns the entries before the bad token,
+            # here a whole number of rows.
+            def fromstring(string, dtype=float, sep=''):
+                warnings.warn('string or file could not be read to its end', DeprecationWarning)
+                return np.array([1.0, 2.0])
+            monkeypatch.setattr(np, 'fromstring', fromstring)
+        with pytest.raises(ValueError):
+            parse_chunk(b'1 2\nx 3\n', 2)
+
+    @pytest.mark.parametrize('symmetry, size, body, expected', [
+        ('general', '2 3', '1\n2\n3\n4\n0\n6\n', [[1, 3, 0], [2, 4, 6]]),
+        ('symmetric', '3 3', '1\n2\n3\n4\n0\n6\n', [[1, 2, 3], [2, 4, 0], [3, 0, 6]]),
+        ('skew-symmetric', '3 3', '2\n0\n5\n', [[0, -2, 0], [2, 0, -5], [0, 5, 0]]),
+    ], ids=['general', 'symmetric', 'skew-symmetric'])
+    @pytest.mark.parametrize('streaming', [True, False], ids=['streaming', 'lines'])
+    def test_array_format(self, symmetry: str, size: str, body: str,
+                          expected: list, streaming: bool):
+        mtx = MatrixMarket.from_string(
+            f"%%MatrixMarket matrix array real {symmetry}\n{size}\n{body}",
+            streaming=streaming
+        )
+        assert np.array_equal(mtx.values, np.array(expected, dtype=float))
+
+    def test_array_format_graph(self):
+        graph = MatrixMarketReader()(string=(
+            "%%MatrixMarket matrix array real symmetric\n"
+            "3 3\n"
+            "0\n.5\n0\n0\n2\n0\n"
+        ))
+        assert graph.number_of_nodes() == 3
+        assert graph.number_of_edges() == 2
+        assert graph['2']['1']['weight'] == 0.5
+        assert graph['3']['2']['weight'] == 2.0
+
+
+class TestEdges:
+    def test_fast_matches_edgelist(self):
+        fast = read_edges(raw_openflights.as_posix(), comments='%')
+        slow = read_edges(raw_openflights.as_posix(), comments='%', fast=False)
+        assert list(fast.nodes) == list(slow.nodes)
+        assert list(fast.edges) == list(slow.edges)
+
+    def test_parallel_matches_fast(self):
+        fast = EdgesReader(comments='%').compact(raw_openflights.as_posix())
+        parallel = EdgesReader(comments='%', workers=3).compact(raw_openflights.as_posix())
+        assert np.array_equal(fast.indptr, parallel.indptr)
+        assert np.array_equal(fast.indices, parallel.indices)
+
+    def test_weighted_with_timestamps(self, tmp_path: Path):
+        path = tmp_path / 'dynamic.edges'
+        path.write_text('% sym weighted\n'
+                        '% 3 3 3\n'
+                        '1 2 0.5 1000\n'
+                        '% interleaved comment\n'
+                        '2 3 1.5 1001\n'
+                        '3 1 -2 1002\n')
+        graph = EdgesReader(comments='%', chunk_size=7)(path.as_posix())
+        assert graph['1']['2']['weight'] == 0.5
+        assert graph['3']['2']['weight'] == 1.5
+        assert graph['1']['3']['weight'] == -2.0
+
+    @pytest.mark.parametrize('numpy_1', [False, True], ids=['numpy', 'numpy_1'])
+    def test_non_numeric_ids_fall_back(self, tmp_path: Path, monkeypatch, numpy_1: bool):
+        path = tmp_path / 'named.edges'
+        path.write_text('% asym unweighted\n'
+                        '% 3 3 3\n'
+                        '1 2\n'
+                        'hub 1\n'
+                        '2 hub\n')
+        if numpy_1:
+            monkeypatch.setattr(np, 'fromstring', fromstring_numpy_1)
+        fast = read_edges(path.as_posix(), comments='%')
+        slow = read_edges(path.as_posix(), comments='%', fast=False)
+        assert sorted(fast.edges) == sorted(slow.edges) == [('1', '2'), ('2', 'hub'), ('hub', '1')]
+
+    def test_compact(self):
+        graph = read_edges(raw_openflights.as_posix(), comments='%')
+        compact = EdgesReader(comments='%').compact(raw_openflights.as_posix())
+        assert compact.directed
+        assert compact.node_count == graph.number_of_nodes()
+        assert compact.edge_count == graph.number_of_edges()
+
+
+compressors = [
+    ('.gz', gzip.compress),
+    ('.bz2', bz2.compress),
+    ('.xz', lzma.compress),
+]
+compressor_ids = [
+    'gzip',
+    'bz2',
+    'xz',
+]
+
+
+class TestCompression:
+    @pytest.mark.parametrize('suffix, compress', compressors, ids=compressor_ids)
+    @pytest.mark.parametrize('raw_path', [raw_power, raw_openflights], ids=['power', 'openflights'])
+    def test_compressed_matches_plain(self, tmp_path: Path, raw_path: Path, suffix: str, compress):
+        path = tmp_path / f"{raw_path.name}{suffix}"
+        path.write_bytes(compress(raw_path.read_bytes()))
+        assert detect_compression(path) is not None
+        assert dataset_suffix(path) == raw_path.suffix
+        assert dataset_stem(path) == raw_path.stem
+
+        expected = load_raw(raw_path)
+        actual = load_raw(path, workers=2)
+        assert actual.name == expected.name
+        assert list(actual.nodes) == list(expected.nodes)
+        assert list(actual.edges) == list(expected.edges)
+
+    def test_tar_bundle(self, tmp_path: Path):
+        path = tmp_path / 'bundle.tar.gz'
+        with tarfile.open(path, 'w:gz') as archive:
+            archive.add(raw_usair97, arcname=f"usair/{raw_usair97.name}")
+        assert dataset_suffix(path) == '.mtx'
+
+        expected = MatrixMarket(raw_usair97.as_posix())
+        actual = MatrixMarket(path.as_posix(), workers=2)
+        for expected_array, actual_array in zip(expected.coo, actual.coo):
+            assert np.array_equal(expected_array, actual_array)
+
+
+class TestStatistics:
+    @pytest.mark.parametrize('raw_path', [raw_power, raw_usair97, raw_openflights],
+                             ids=['power', 'usair97', 'openflights'])
+    def test_seeded_measures_match_graph(self, raw_path: Path):
+        expected = GraphMeasures(load_raw(raw_path))
+        actual = GraphMeasures.from_statistics(load_raw_statistics(raw_path))
+        measures = ['directed', 'weighted', 'node_count', 'edge_count',
+                    'avg_edge_count', 'degree_distribution']
+        if expected.weighted:
+            measures.append('avg_strength')
+        if not expected.directed:
+            measures.append('component_count')
+        for measure in measures:
+            assert getattr(actual, measure) == pytest.approx(getattr(expected, measure))
+        with pytest.raises(MeasureError):
+            actual.diameter
+
+    def test_duplicates_and_self_loops(self):
+        statistics = MatrixMarketReader().statistics(string=(
+            "%%MatrixMarket matrix coordinate real symmetric\n"
+            "5 5 5\n"
+            "2 1 1.0\n"
+            "1 2 3.0\n"
+            "3 3 2.0\n"
+            "5 4 1.0\n"
+            "4 5 4.0\n"
+        ))
+        assert statistics.entry_count == 5
+        assert statistics.duplicate_count == 2
+        assert statistics.self_loop_count == 1
+        assert statistics.node_count == 5
+        assert statistics.edge_count == 3
+        assert statistics.weak_component_count == 3
+        assert statistics.weight_sum == 9.0
+        assert statistics.degree_distribution == {1: 4, 2: 1}
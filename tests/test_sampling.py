@@ -0,0 +1,58 @@
+from math import isclose
+
+import networkx as nx
+import pytest
+
+from algorithms import distances, sampling
+from compact_graph import CompactGraph
+from graph_measures import GraphMeasures
+
+graphs = [
+    nx.grid_2d_graph(30, 30),
+    nx.gnp_random_graph(400, 0.01, seed=5, directed=True),
+]
+
+ids = [
+    'grid',
+    'gnp_directed',
+]
+
+
+class TestSampling:
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_all_sources_is_exact(self, graph):
+        compact = CompactGraph.from_networkx(graph)
+        sweep = distances.sweep(compact)
+        path_length = sampling.average_shortest_path_length(compact, relative_error=0, seed=1)
+        efficiency = sampling.global_efficiency(compact, relative_error=0, seed=1)
+        assert path_length.exact and efficiency.exact
+        assert isclose(path_length.value, distances.average_shortest_path_length(compact, sweep), rel_tol=1e-9)
+        assert isclose(efficiency.value, distances.global_efficiency(compact, sweep), rel_tol=1e-9)
+        assert path_length.low == path_length.high == path_length.value
+
+    @pytest.mark.parametrize('graph', graphs, ids=ids)
+    def test_interval_covers_exact(self, graph):
+        compact = CompactGraph.from_networkx(graph)
+        sweep = distances.sweep(compact)
+        for estimate, exact in (
+            (sampling.average_shortest_path_length(compact, relative_error=0.05, seed=2),
+             distances.average_shortest_path_length(compact, sweep)),
+            (sampling.global_efficiency(compact, relative_error=0.05, seed=2),
+             distances.global_efficiency(compact, sweep)),
+        ):
+            assert estimate.sources < estimate.population
+            assert estimate.relative_error <= 0.05
+            assert estimate.low <= exact <= estimate.high
+
+    def test_time_budget(self):
+        compact = CompactGraph.from_networkx(graphs[0])
+        estimate = sampling.global_efficiency(compact, relative_error=0, time_budget=0, seed=3)
+        assert estimate.sources == sampling.MIN_SOURCES
+        assert estimate.low < estimate.value < estimate.high
+
+    def test_measures_reuse_sweep(self):
+        measures = GraphMeasures(graphs[0], relative_error=0.05)
+        assert not measures.shortest_path_length_estimate.exact
+        measures.global_efficiency
+        assert measures.global_efficiency_estimate.exact
+        assert measures.global_efficiency_estimate.value == measures.global_efficiency
@@ -0,0 +1,65 @@
+from typing import Any, List, Tuple
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from compact_graph import CompactGraph
+from graph_measures import GraphMeasures
+from scheduler import compute, plan, run_writers
+
+MEASURES = (
+    'shortest_path_length',
+    'diameter',
+    'radius',
+    'avg_closeness_centrality',
+    'top10_central_closeness',
+    'avg_betweenness_centrality',
+    'top10_central_betweenness',
+    'avg_clustering_coefficient',
+    'modularity',
+)
+
+
+class TestScheduler:
+    def test_plan(self):
+        assert plan(['avg_closeness_centrality', 'shortest_path_length', 'top10_central_closeness', 'diameter',
+                     'node_count']) == [['sweep'], ['extremes', 'top_closeness']]
+        assert plan(['top10_central_closeness', 'top10_central_betweenness', 'modularity']) == \
+               [['betweenness', 'communities', 'top_closeness']]
+        assert plan(['node_count']) == []
+        with pytest.raises(ValueError):
+            plan(['closeness'])
+
+    @pytest.mark.parametrize('workers', (1, 2), ids=('in_process', 'pool'))
+    def test_compute_matches_lazy_measures(self, workers: int):
+        graph = nx.gnp_random_graph(80, 0.05, seed=4, directed=True)
+        measures = GraphMeasures(CompactGraph.from_networkx(graph))
+        compute(measures, MEASURES, workers)
+        # Everything expensive is in place before any writer reads it.
+        for measure in ('sweep', 'extremes', 'top10_central_closeness', 'betweenness_centrality',
+                        'avg_clustering_coefficient', 'community_labels'):
+            assert getattr(measures, f"_{measure}") is not None
+        assert measures.workers == 1
+        expected = GraphMeasures(CompactGraph.from_networkx(graph))
+        for measure in MEASURES:
+            assert getattr(measures, measure) == pytest.approx(getattr(expected, measure))
+        assert np.array_equal(measures.betweenness_centrality, expected.betweenness_centrality)
+
+    def test_writers_share_measures(self):
+        measures = GraphMeasures(nx.karate_club_graph())
+        written: List[Tuple[str, Any]] = []
+
+        def write_average(measures: GraphMeasures, name: str):
+            assert measures._sweep is not None
+            written.append((name, measures.avg_closeness_centrality))
+
+        def write_top(measures: GraphMeasures, name: str):
+            written.append((name, measures.top10_central_closeness[0][0]))
+
+        run_writers(measures, 'karate', {
+            write_average: lambda measures: ('avg_closeness_centrality',),
+            write_top: lambda measures: ('top10_central_closeness',),
+        })
+        closeness = nx.closeness_centrality(nx.karate_club_graph())
+        assert written == [('karate', pytest.approx(np.mean(list(closeness.values())))), ('karate', 0)]
@@ -1,10 +1,16 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
 from networkx import is_weighted, is_directed
 
 from paths import raw_openflights, raw_power, raw_roadnet_ca, \
     raw_roadnet_pa, raw_usair97, processed_openflights, \
     processed_power, processed_roadmap_pa, processed_roadnet_ca, \
     processed_usair97
-from utils import load_raw, dump_graphml
+from compact_graph import CompactGraph
+from paths import suffix_csr
+from utils import load_raw, dump_processed, dump_csr, load_csr
 
 
 class TestGraphIO:
@@ -20,7 +26,7 @@ class TestGraphIO:
         assert graph.has_edge('592', '308')
         assert graph.has_edge('551', '375')
         assert graph.has_edge('375', '551') is False
-        dump_graphml(graph, processed_openflights)
+        dump_processed(graph, processed_openflights)
 
     def test_load_power(self):
         path = raw_power
@@ -36,7 +42,7 @@ class TestGraphIO:
         assert graph.has_edge('2475', '1070') is False
         assert graph.has_edge('420', '425') is False
         assert graph.has_edge('465', '4576') is False
-        dump_graphml(graph, processed_power)
+        dump_processed(graph, processed_power)
 
     def test_load_roadnet_ca(self):
         path = raw_roadnet_ca
@@ -48,7 +54,7 @@ class TestGraphIO:
         assert graph.has_edge('3248', '19')
         assert graph.has_edge('108', '8') is False
         assert graph.has_edge('16', '14') is False
-        dump_graphml(graph, processed_roadnet_ca)
+        dump_processed(graph, processed_roadnet_ca)
 
     def test_load_roadnet_pa(self):
         path = raw_roadnet_pa
@@ -63,7 +69,7 @@ class TestGraphIO:
         assert graph.has_edge('783720', '733101') is False
         assert graph.has_edge('290980', '168570') is False
         assert graph.has_edge('98260', '98318') is False
-        dump_graphml(graph, processed_roadmap_pa)
+        dump_processed(graph, processed_roadmap_pa)
 
     def test_load_usair97(self):
         path = raw_usair97
@@ -76,4 +82,28 @@ class TestGraphIO:
         assert graph['119']['95']['weight'] == 0.0323
         assert graph.has_edge('321', '163') is False
         assert graph.has_edge('230', '168') is False
-        dump_graphml(graph, processed_usair97)
+        dump_processed(graph, processed_usair97)
+
+    @pytest.mark.parametrize('raw_path', [
+        raw_openflights,
+        raw_power,
+        raw_usair97
+    ], ids=['openflights', 'power', 'usair97'])
+    def test_csr_round_trip(self, raw_path: Path, tmp_path: Path):
+        graph = load_raw(raw_path)
+        path = tmp_path / f"{raw_path.stem}{suffix_csr}"
+        dump_csr(graph, path)
+
+        binary = load_csr(path)
+        assert isinstance(binary.indices, np.memmap)
+        assert binary.directed == is_directed(graph)
+        assert binary.weighted == is_weighted(graph)
+        assert binary.node_count == graph.number_of_nodes()
+
+        loaded = CompactGraph.from_binary(binary).to_networkx()
+        assert list(loaded.nodes) == list(graph.nodes)
+        assert loaded.number_of_edges() == graph.number_of_edges()
+        assert all(loaded.has_edge(source, target) for source, target in graph.edges)
+        if binary.weighted:
+            for source, target, weight in graph.edges.data('weight'):
+                assert loaded[source][target]['weight'] == weight
@@ -4,21 +4,51 @@ from typing import Union
 from networkx import Graph, DiGraph
 from networkx import read_graphml, write_graphml
 
-from readers.matrix_market import read_mtx
-from readers.edges import read_edges
+from binary_graph import BinaryGraph
+from compact_graph import CompactGraph
+from paths import suffix_graphml, suffix_csr
+from readers.compression import dataset_suffix, dataset_stem
+from readers.matrix_market import read_mtx, MatrixMarketReader
+from readers.edges import read_edges, EdgesReader
+from readers.statistics import EdgeStatistics
 
 
-def load_raw(path: Path) -> Union[Graph, DiGraph]:
-    if path.suffix == '.mtx':
-        graph = read_mtx(path.as_posix())
-    elif path.suffix == '.edges':
-        graph = read_edges(path.as_posix(), comments='%')
+def load_raw(path: Path, workers=1) -> Union[Graph, DiGraph]:
+    # Compressed datasets ('.mtx.gz', '.edges.bz2', '.tar.gz', ...) are
+    # decompressed on the fly by the readers.
+    suffix = dataset_suffix(path)
+    if suffix == '.mtx':
+        graph = read_mtx(path.as_posix(), workers=workers)
+    elif suffix == '.edges':
+        graph = read_edges(path.as_posix(), comments='%', workers=workers)
     else:
         raise ValueError("Usupported format.")
-    graph.name = path.stem
+    graph.name = dataset_stem(path)
     return graph
 
 
+def load_raw_compact(path: Path, workers=1) -> CompactGraph:
+    suffix = dataset_suffix(path)
+    if suffix == '.mtx':
+        graph = MatrixMarketReader(workers=workers).compact(path.as_posix())
+    elif suffix == '.edges':
+        graph = EdgesReader(comments='%', workers=workers).compact(path.as_posix())
+    else:
+        raise ValueError("Usupported format.")
+    graph.name = dataset_stem(path)
+    return graph
+
+
+def load_raw_statistics(path: Path) -> EdgeStatistics:
+    suffix = dataset_suffix(path)
+    if suffix == '.mtx':
+        return MatrixMarketReader().statistics(path.as_posix())
+    elif suffix == '.edges':
+        return EdgesReader(comments='%').statistics(path.as_posix())
+    else:
+        raise ValueError("Usupported format.")
+
+
 def dump_graphml(graph: Graph, path: Path):
     with path.open('wb') as file:
         write_graphml(graph, file)
@@ -28,3 +58,39 @@ def load_graphml(path: Path) -> Graph:
     with path.open('r') as file:
         return read_graphml(file)
 
+
+def dump_csr(graph: Union[Graph, DiGraph], path: Path):
+    CompactGraph.from_networkx(graph).to_binary().dump(path)
+
+
+def load_csr(path: Path) -> BinaryGraph:
+    return BinaryGraph.load(path)
+
+
+def dump_processed(graph: Union[Graph, DiGraph], path: Path):
+    if path.suffix == suffix_graphml:
+        dump_graphml(graph, path)
+    elif path.suffix == suffix_csr:
+        dump_csr(graph, path)
+    else:
+        raise ValueError("Usupported format.")
+
+
+def load_processed(path: Path) -> Union[Graph, DiGraph]:
+    if path.suffix == suffix_graphml:
+        return load_graphml(path)
+    elif path.suffix == suffix_csr:
+        return CompactGraph.from_binary(load_csr(path)).to_networkx()
+    else:
+        raise ValueError("Usupported format.")
+
+
+def load_compact(path: Path) -> CompactGraph:
+    if path.suffix == suffix_graphml:
+        graph = CompactGraph.from_networkx(load_graphml(path))
+    elif path.suffix == suffix_csr:
+        graph = CompactGraph.from_binary(load_csr(path))
+    else:
+        raise ValueError("Usupported format.")
+    graph.name = path.stem
+    return graph